@@ -9,8 +9,12 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Auction.settings")
 
 application = get_asgi_application()
+if settings.ASYNC_VIEWS:
+    application = ASGIStaticFilesHandler(application)
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "tendering.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -137,5 +138,78 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Europe/Kiev"
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+# Unacknowledged tasks, including ones waiting for their ETA, are redelivered
+# after the visibility timeout; settlement ETAs are capped well below it
+CELERY_BROKER_TRANSPORT_OPTIONS = {"visibility_timeout": 60 * 60}
+SETTLEMENT_ETA_LIMIT = 30 * 60
+CELERY_BEAT_SCHEDULE = {
+    "close-expired-lots": {
+        "task": "tendering.tasks.close_expired_lots",
+        "schedule": 300.0,
+    },
+    "rebuild-statistics": {
+        "task": "tendering.tasks.rebuild_statistics",
+        "schedule": 3600.0,
+    },
+    "refresh-dashboard": {
+        "task": "tendering.tasks.refresh_dashboard",
+        "schedule": 30.0,
+    },
+}
+
+REDIS_URL = CELERY_BROKER_URL
+
+CACHES = {
+    "default": {
+        "BACKEND": "tendering.caching.ResilientRedisCache",
+        "LOCATION": os.getenv("CACHE_URL", "redis://localhost:6379/1"),
+        "KEY_PREFIX": "auction",
+        "OPTIONS": {
+            "socket_timeout": 0.1,
+            "socket_connect_timeout": 0.1,
+        },
+    }
+}
+# Anonymous full-page cache for public pages
+PAGE_CACHE_TIMEOUT = 60
+# Lot rows in listings are cached under a version bumped on every change
+LOT_CARD_CACHE_TIMEOUT = 10 * 60
+LOT_VERSION_TIMEOUT = 24 * 60 * 60
+
+# "offset" pages with COUNT(*) and OFFSET, "cursor" pages by keyset
+LISTING_PAGINATION = os.getenv("LISTING_PAGINATION", "offset")
+LISTING_COUNT_LIMIT = 1000
+
+# Serve the index, listings, lot detail and bid API from async views; only
+# worth it under an ASGI server such as uvicorn
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "false").lower() == "true"
+if ASYNC_VIEWS:
+    # WhiteNoise is sync-only and would put every request back on a thread;
+    # Auction/asgi.py serves static files outside the middleware chain
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+
+# Log a possible N+1 when one query shape runs more often than this
+REPEATED_QUERY_THRESHOLD = 10
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# Seconds a worker may hold request metrics before adding them to Redis
+METRICS_FLUSH_INTERVAL = 1
+
+# The index dashboard is served from cache; entries older than the refresh
+# interval are still served while a background task recomputes them
+DASHBOARD_REFRESH_INTERVAL = 30
+DASHBOARD_REFRESH_DEBOUNCE = 5
+DASHBOARD_MAX_AGE = 60 * 60
+
+# Files past the size cap stop being written while they stream in; images are
+# checked by their header before any pixel data is decoded
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "tendering.uploads.LimitedTemporaryFileUploadHandler",
+]
+IMAGE_UPLOAD_MAX_SIZE = 5 * 1024 * 1024
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+# Browsers upload images straight to storage through a signed form POST
+DIRECT_UPLOAD_BACKEND = "tendering.direct_uploads.LocalDirectUpload"
+DIRECT_UPLOAD_EXPIRES = 60 * 60
 
 ADMIN_URL = "admin/"
@@ -0,0 +1,52 @@
+import os
+from collections.abc import Mapping
+
+from django.core.exceptions import ImproperlyConfigured
+
+CONNECTION_MODES = ("persistent", "pool", "pgbouncer")
+
+
+def postgres_database(
+        env: Mapping[str, str] = os.environ,
+        default_mode: str = "persistent",
+) -> dict:
+    # persistent: each worker thread keeps its connection for
+    # POSTGRES_CONN_MAX_AGE seconds
+    # pool: psycopg's connection pool, shared by the threads of a process
+    # pgbouncer: connections go through pgbouncer in transaction mode
+    mode = env.get("POSTGRES_CONNECTIONS", default_mode)
+    if mode not in CONNECTION_MODES:
+        raise ImproperlyConfigured(
+            f"POSTGRES_CONNECTIONS must be one of {', '.join(CONNECTION_MODES)}"
+        )
+    options = {"sslmode": env.get("POSTGRES_SSLMODE", "require")}
+    database = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env.get("POSTGRES_DB"),
+        "USER": env.get("POSTGRES_USER"),
+        "PASSWORD": env.get("POSTGRES_PASSWORD"),
+        "HOST": env.get("POSTGRES_HOST"),
+        "PORT": env.get("POSTGRES_DB_PORT", 5432),
+        "CONN_MAX_AGE": int(env.get("POSTGRES_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": options,
+    }
+    if mode == "pool":
+        # Django hands pooled connections back at the end of each request
+        # and refuses CONN_MAX_AGE on top of the pool
+        database["CONN_MAX_AGE"] = 0
+        options["pool"] = {
+            "min_size": int(env.get("POSTGRES_POOL_MIN_SIZE", 2)),
+            "max_size": int(env.get("POSTGRES_POOL_MAX_SIZE", 10)),
+            "timeout": float(env.get("POSTGRES_POOL_TIMEOUT", 10)),
+        }
+    elif mode == "pgbouncer":
+        # consecutive transactions may run on different server connections,
+        # and pgbouncer does not pass startup options on, so the statement
+        # timeout belongs on the role: ALTER ROLE ... SET statement_timeout
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+        return database
+    statement_timeout = int(env.get("POSTGRES_STATEMENT_TIMEOUT", 30_000))
+    if statement_timeout:
+        options["options"] = f"-c statement_timeout={statement_timeout}"
+    return database
@@ -1,5 +1,6 @@
 import os
 from .base import *
+from .database import postgres_database
 from dotenv import load_dotenv
 
 load_dotenv(BASE_DIR / ".env")
@@ -9,19 +10,12 @@ ALLOWED_HOSTS = os.environ.get("DOMAINS").split(",")
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-
+# Under ASGI each request gets its own database thread, so connections kept
+# per thread are not reused between requests; pool them instead
 DATABASES = {
-  'default': {
-    'ENGINE': 'django.db.backends.postgresql',
-    'NAME': os.getenv('POSTGRES_DB'),
-    'USER': os.getenv('POSTGRES_USER'),
-    'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
-    'HOST': os.getenv('POSTGRES_HOST'),
-    'PORT': os.getenv('POSTGRES_DB_PORT', 5432),
-    'OPTIONS': {
-      'sslmode': 'require',
-    },
-  }
+    "default": postgres_database(
+        os.environ, default_mode="pool" if ASYNC_VIEWS else "persistent"
+    ),
 }
 
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
@@ -31,6 +25,7 @@ AWS_S3_REGION_NAME = os.getenv("AWS_S3_REGION_NAME", 'eu-north-1')
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
 AWS_S3_CUSTOM_DOMAIN = f"{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com"
 MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/media/"
+DIRECT_UPLOAD_BACKEND = "tendering.direct_uploads.S3DirectUpload"
 STORAGES = {
     "default": {
         "BACKEND": "storages.backends.s3boto3.S3StaticStorage"
@@ -20,10 +20,18 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
+from tendering.views import metrics
+
+# under ASGI the read-heavy pages and the bid API are served by async views
+TENDERING_URLS = (
+    "tendering.async_urls" if settings.ASYNC_VIEWS else "tendering.urls"
+)
+
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("", include("tendering.urls", namespace="tendering")),
+    path("", include(TENDERING_URLS, namespace="tendering")),
     path("admin-soft/", include("admin_soft.urls")),
+    path("metrics", metrics, name="metrics"),
 ]
 
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
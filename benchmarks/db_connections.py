@@ -0,0 +1,100 @@
+"""
+Per-request database connection overhead against the production Postgres
+configuration.
+
+Point the POSTGRES_* variables at a server (the same ones prod settings
+read) and run:
+
+    python benchmarks/db_connections.py --requests 2000 --threads 8
+
+Each simulated request does what Django's handler does around a view:
+close_old_connections() when it starts and finishes, with --queries cheap
+queries in between. Modes:
+
+    per-request  CONN_MAX_AGE=0, a new SSL connection for every request
+    persistent   connections kept per thread with health checks
+    pool         psycopg's connection pool (needs psycopg[pool])
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _django import setup
+
+MODES = {
+    "per-request": {"POSTGRES_CONN_MAX_AGE": "0"},
+    "persistent": {"POSTGRES_CONNECTIONS": "persistent"},
+    "pool": {"POSTGRES_CONNECTIONS": "pool"},
+}
+
+
+def request(connection, queries: int) -> float:
+    started = time.perf_counter()
+    connection.close_if_unusable_or_obsolete()
+    with connection.cursor() as cursor:
+        for _ in range(queries):
+            cursor.execute("SELECT 1")
+    connection.close_if_unusable_or_obsolete()
+    return time.perf_counter() - started
+
+
+def run(mode: str, requests: int, threads: int, queries: int) -> dict:
+    from django.db.utils import ConnectionHandler
+
+    from Auction.settings.database import postgres_database
+
+    config = postgres_database(os.environ | MODES[mode])
+    # each mode gets its own alias, and so its own pool
+    handler = ConnectionHandler({mode: config})
+
+    def worker(count: int) -> list[float]:
+        connection = handler[mode]
+        try:
+            return [request(connection, queries) for _ in range(count)]
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        shares = [requests // threads] * threads
+        latencies = [
+            latency
+            for results in executor.map(worker, shares)
+            for latency in results
+        ]
+    elapsed = time.perf_counter() - started
+    if config["OPTIONS"].get("pool"):
+        handler[mode].close_pool()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "req/s": len(latencies) / elapsed,
+        "mean": statistics.mean(latencies),
+        "p50": quantiles[49],
+        "p99": quantiles[98],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=list(MODES))
+    args = parser.parse_args()
+
+    setup()
+    print(f"{'mode':<14}{'req/s':>9}{'mean':>11}{'p50':>11}{'p99':>11}")
+    for mode in args.modes:
+        result = run(mode, args.requests, args.threads, args.queries)
+        print(
+            f"{mode:<14}{result['req/s']:>9.1f}"
+            + "".join(
+                f"{result[key] * 1000:>9.2f}ms" for key in ("mean", "p50", "p99")
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Image bytes a browser fetches for one page of the active lot list, original
+uploads vs the generated thumbnail variants.
+
+    python benchmarks/image_bytes.py --lots 20 --width 3000 --height 2000
+"""
+import argparse
+import random
+import re
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from _django import setup, test_database
+
+IMAGE_SRC = re.compile(r'<(?:img src|source srcset)="([^"]+)"')
+
+
+def photo(rng: random.Random, width: int, height: int):
+    from django.core.files.base import ContentFile
+    from PIL import Image
+
+    # noise keeps the encoder honest; flat colours compress to nothing
+    pixels = rng.randbytes(width * height * 3)
+    image = Image.frombytes("RGB", (width, height), pixels)
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return ContentFile(buffer.getvalue(), name="photo.jpg")
+
+
+def seed(lots: int, width: int, height: int):
+    from django.utils import timezone
+
+    from tendering.models import Category, Lot, User
+
+    rng = random.Random(lots)
+    owner = User.objects.create_user(username="bench_owner", password="bench")
+    category = Category.objects.create(name="bench")
+    for i in range(lots):
+        Lot.objects.create(
+            name=f"bench_lot_{i}",
+            description="bench",
+            category=category,
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=Decimal(10),
+            owner=owner,
+            photo=photo(rng, width, height),
+        )
+    return owner
+
+
+def page_bytes(client, webp: bool) -> tuple[int, int]:
+    from django.conf import settings
+    from django.core.files.storage import default_storage
+    from django.urls import reverse
+
+    html = client.get(reverse("tendering:lot-list-active")).content.decode()
+    total = count = 0
+    for url in IMAGE_SRC.findall(html):
+        if not url.startswith(settings.MEDIA_URL):
+            continue
+        if url.endswith(".webp") != webp:
+            continue
+        total += default_storage.size(url.removeprefix(settings.MEDIA_URL))
+        count += 1
+    return count, total
+
+
+def run(lots: int, width: int, height: int) -> dict:
+    from django.core.cache import cache
+    from django.test import Client
+
+    from tendering.images import generate_variants
+    from tendering.models import Lot
+
+    owner = seed(lots, width, height)
+    client = Client()
+    client.force_login(owner)
+    results = {"originals": page_bytes(client, webp=False)}
+    for lot in Lot.objects.all():
+        generate_variants(lot, "photo")
+    cache.clear()
+    results["jpeg thumbnails"] = page_bytes(client, webp=False)
+    results["webp thumbnails"] = page_bytes(client, webp=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lots", type=int, default=20)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+    from django.test.utils import override_settings
+
+    with tempfile.TemporaryDirectory() as media_root:
+        with override_settings(MEDIA_ROOT=media_root), test_database():
+            results = run(args.lots, args.width, args.height)
+    baseline = results["originals"][1]
+    for label, (count, total) in results.items():
+        print(
+            f"{label:>16}: {count} images, {total / 1024:10.1f} KiB "
+            f"({baseline / max(total, 1):.0f}x smaller than originals)"
+        )
+
+
+if __name__ == "__main__":
+    main()
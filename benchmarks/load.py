@@ -0,0 +1,275 @@
+"""
+Throughput and latency of mixed browse, bid and comment traffic.
+
+Seed a database with generated users and lots, start the server and replay
+traffic against it:
+
+    python manage.py generate_auction_data --users 1000 --lots 10000
+    uvicorn Auction.asgi:application --workers 4
+    python benchmarks/load.py --users 200 --duration 60
+
+Every virtual user logs in as one of the generated accounts, then keeps
+picking a weighted action on a keep-alive connection until --duration runs
+out. Throughput and p50/p95/p99 latency are reported per endpoint.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import time
+from collections import defaultdict
+from decimal import Decimal
+from urllib.parse import urlencode
+
+LOT_LINK = re.compile(rb'href="/lots/(\d+)/"')
+CSRF_INPUT = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+SCENARIO = (
+    ("browse", 50),
+    ("detail", 25),
+    ("bid", 15),
+    ("comment", 10),
+)
+
+
+class Client:
+    def __init__(self, args) -> None:
+        self.args = args
+        self.cookies = {}
+        self.reader = None
+        self.writer = None
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(
+            self.args.host, self.args.port
+        )
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+    async def request(
+            self,
+            method: str,
+            path: str,
+            data: dict | None = None,
+            headers: dict | None = None,
+    ) -> tuple[int, bytes]:
+        if self.writer is None or self.writer.is_closing():
+            await self.connect()
+        body = urlencode(data).encode() if data is not None else b""
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.args.host}",
+            f"Content-Length: {len(body)}",
+        ]
+        if data is not None:
+            lines.append("Content-Type: application/x-www-form-urlencoded")
+        if self.cookies:
+            lines.append(
+                "Cookie: "
+                + "; ".join(f"{key}={value}" for key, value in self.cookies.items())
+            )
+        for key, value in (headers or {}).items():
+            lines.append(f"{key}: {value}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+        return await self.read_response()
+
+    async def read_response(self) -> tuple[int, bytes]:
+        status = int((await self.reader.readline()).split()[1])
+        length = None
+        chunked = False
+        close = False
+        while True:
+            line = (await self.reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            name = name.lower()
+            value = value.strip()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding" and "chunked" in value.lower():
+                chunked = True
+            elif name == "connection" and value.lower() == "close":
+                close = True
+            elif name == "set-cookie":
+                key, _, rest = value.partition("=")
+                self.cookies[key] = rest.split(";", 1)[0]
+        if chunked:
+            body = b""
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                if not size:
+                    await self.reader.readline()
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+        elif length is not None:
+            body = await self.reader.readexactly(length)
+        else:
+            body = await self.reader.read()
+            close = True
+        if close:
+            self.writer.close()
+        return status, body
+
+
+class VirtualUser:
+    def __init__(self, args, index: int, lots: list[int], results) -> None:
+        self.args = args
+        self.username = f"{args.prefix}_user_{index}"
+        self.lots = lots
+        self.results = results
+        self.client = Client(args)
+        self.rng = random.Random(index)
+        self.prices = {}
+
+    async def timed(self, endpoint: str, *args, **kwargs) -> tuple[int, bytes]:
+        started = time.perf_counter()
+        status, body = await self.client.request(*args, **kwargs)
+        self.results[endpoint].append(
+            (time.perf_counter() - started, status < 400 or status == 409)
+        )
+        return status, body
+
+    async def login(self) -> None:
+        _, body = await self.client.request("GET", "/accounts/login/")
+        match = CSRF_INPUT.search(body)
+        status, _ = await self.client.request(
+            "POST",
+            "/accounts/login/",
+            {
+                "username": self.username,
+                "password": self.args.password,
+                "csrfmiddlewaretoken": match.group(1).decode() if match else "",
+            },
+        )
+        if "sessionid" not in self.client.cookies:
+            raise RuntimeError(f"Login failed for {self.username} ({status})")
+
+    async def browse(self) -> None:
+        page = self.rng.randint(1, self.args.pages)
+        await self.timed("browse", "GET", f"/active_lots/?page={page}")
+
+    async def detail(self) -> None:
+        lot = self.rng.choice(self.lots)
+        await self.timed("detail", "GET", f"/lots/{lot}/")
+
+    async def bid(self) -> None:
+        lot = self.rng.choice(self.lots)
+        amount = self.prices.get(lot, Decimal(1)) + self.rng.randint(1, 20)
+        status, body = await self.timed(
+            "bid",
+            "POST",
+            f"/api/lots/{lot}/bid/",
+            {"amount": amount},
+            {"X-CSRFToken": self.client.cookies.get("csrftoken", "")},
+        )
+        if status in (201, 409):
+            self.prices[lot] = Decimal(json.loads(body)["current_price"])
+
+    async def comment(self) -> None:
+        lot = self.rng.choice(self.lots)
+        await self.timed(
+            "comment",
+            "POST",
+            f"/lots/{lot}/comment/",
+            {
+                "text": "load test comment",
+                "lot_id": lot,
+                "csrfmiddlewaretoken": self.client.cookies.get("csrftoken", ""),
+            },
+        )
+
+    async def run(self, deadline: float) -> None:
+        await self.login()
+        actions, weights = zip(*SCENARIO)
+        try:
+            while time.perf_counter() < deadline:
+                action = self.rng.choices(actions, weights)[0]
+                await getattr(self, action)()
+        finally:
+            await self.client.close()
+
+
+async def discover_lots(args) -> list[int]:
+    user = VirtualUser(args, 0, [], None)
+    lots = set()
+    try:
+        await user.login()
+        for page in range(1, args.pages + 1):
+            _, body = await user.client.request(
+                "GET", f"/active_lots/?page={page}"
+            )
+            lots.update(int(pk) for pk in LOT_LINK.findall(body))
+    finally:
+        await user.client.close()
+    if not lots:
+        raise RuntimeError("No active lots found; run generate_auction_data first")
+    return sorted(lots)
+
+
+async def run_load(args) -> tuple[dict, float]:
+    lots = await discover_lots(args)
+    print(f"lots: {len(lots)}, virtual users: {args.users}")
+    results = defaultdict(list)
+    started = time.perf_counter()
+    deadline = started + args.duration
+    outcomes = await asyncio.gather(
+        *(
+            VirtualUser(args, index, lots, results).run(deadline)
+            for index in range(args.users)
+        ),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+    failed = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    if failed:
+        print(f"virtual users failed: {len(failed)} (first: {failed[0]!r})")
+    return results, elapsed
+
+
+def report(results: dict, elapsed: float) -> None:
+    print(
+        f"{'endpoint':<10}{'requests':>10}{'errors':>8}{'req/s':>9}"
+        f"{'p50':>9}{'p95':>9}{'p99':>9}"
+    )
+    for endpoint, _ in SCENARIO:
+        samples = results[endpoint]
+        if len(samples) < 2:
+            continue
+        latencies = [latency for latency, _ in samples]
+        errors = sum(1 for _, ok in samples if not ok)
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{endpoint:<10}{len(samples):>10}{errors:>8}"
+            f"{len(samples) / elapsed:>9.1f}"
+            f"{quantiles[49] * 1000:>7.1f}ms"
+            f"{quantiles[94] * 1000:>7.1f}ms"
+            f"{quantiles[98] * 1000:>7.1f}ms"
+        )
+    total = sum(len(samples) for samples in results.values())
+    print(f"total: {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--prefix", default="load")
+    parser.add_argument("--password", default="password")
+
+
+async def main(args) -> None:
+    report(*await run_load(args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+"""
+Lot search latency, full-text index vs the old name__icontains scan.
+
+    python benchmarks/search.py --sizes 100000 1000000 --repeat 20
+"""
+import argparse
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from _django import setup, test_database, timer
+
+BATCH_SIZE = 10000
+WORDS = (
+    "antique", "bicycle", "camera", "desk", "engine", "guitar", "jacket",
+    "lamp", "mirror", "painting", "radio", "sofa", "table", "vase", "watch",
+)
+COLOURS = ("black", "blue", "green", "red", "silver", "white", "yellow")
+QUERIES = ("guitar", "red lamp", "silver watch", "vintage", "99999")
+
+
+def seed(size: int) -> None:
+    from django.utils import timezone
+
+    from tendering.models import Category, Lot, User
+
+    rng = random.Random(size)
+    owner = User.objects.create(username="bench_owner")
+    categories = Category.objects.bulk_create(
+        Category(name=name) for name in ("vintage", "electronics", "furniture")
+    )
+    end_date = timezone.now() + timedelta(days=1)
+    for offset in range(0, size, BATCH_SIZE):
+        Lot.objects.bulk_create(
+            Lot(
+                name=f"{rng.choice(COLOURS)} {rng.choice(WORDS)} {i}",
+                description=" ".join(rng.choices(WORDS + COLOURS, k=12)),
+                category=rng.choice(categories),
+                end_date=end_date,
+                start_price=Decimal(10),
+                owner=owner,
+            )
+            for i in range(offset, min(offset + BATCH_SIZE, size))
+        )
+
+
+def first_page(queryset) -> list:
+    return list(queryset.values_list("pk", flat=True)[:5])
+
+
+def run(size: int, repeat: int) -> dict:
+    from django.db import transaction
+
+    from tendering.models import Lot
+    from tendering.search import search_lots
+
+    results = {}
+    with transaction.atomic():
+        seed(size)
+        lots = Lot.objects.filter(is_active=True)
+        for query in QUERIES:
+            with timer(results, f"{query!r} icontains"):
+                for _ in range(repeat):
+                    first_page(lots.filter(name__icontains=query))
+            with timer(results, f"{query!r} indexed"):
+                for _ in range(repeat):
+                    first_page(search_lots(lots, query))
+        transaction.set_rollback(True)
+    return {name: seconds / repeat for name, seconds in results.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        for size in args.sizes:
+            results = run(size, args.repeat)
+            print(f"{size} lots:")
+            for name, seconds in results.items():
+                print(f"  {name}: {seconds * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Throughput of the same mixed traffic under gunicorn with sync workers and
+under uvicorn serving the async views.
+
+Seed a database first, then let the script start each server in turn on
+--port and replay the load.py scenario against it:
+
+    python manage.py generate_auction_data --users 1000 --lots 10000
+    python benchmarks/server_modes.py --workers 4 --users 500 --duration 60
+
+gunicorn runs Auction.wsgi with --threads 1 so every in-flight request holds
+a worker; uvicorn runs Auction.asgi with ASYNC_VIEWS=true.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from load import add_arguments, report, run_load
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def server_commands(args) -> dict[str, tuple[list[str], dict]]:
+    bind = f"{args.host}:{args.port}"
+    return {
+        "gunicorn-sync": (
+            [
+                "gunicorn", "Auction.wsgi",
+                "--bind", bind,
+                "--workers", str(args.workers),
+                "--threads", "1",
+            ],
+            {"ASYNC_VIEWS": "false"},
+        ),
+        "uvicorn-async": (
+            [
+                "uvicorn", "Auction.asgi:application",
+                "--host", args.host,
+                "--port", str(args.port),
+                "--workers", str(args.workers),
+            ],
+            {"ASYNC_VIEWS": "true"},
+        ),
+    }
+
+
+def wait_for_port(host: str, port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not start on {host}:{port}")
+
+
+def run_mode(args, command: list[str], env: dict) -> tuple[dict, float]:
+    server = subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env=os.environ | env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(args.host, args.port, args.startup)
+        return asyncio.run(run_load(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summary(results: dict, elapsed: float) -> tuple[float, float, int]:
+    latencies = [
+        latency for samples in results.values() for latency, _ in samples
+    ]
+    errors = sum(
+        1 for samples in results.values() for _, ok in samples if not ok
+    )
+    p95 = statistics.quantiles(latencies, n=100)[94] if len(latencies) > 1 else 0
+    return len(latencies) / elapsed, p95, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--startup", type=float, default=30)
+    parser.add_argument(
+        "--modes", nargs="+", default=["gunicorn-sync", "uvicorn-async"]
+    )
+    args = parser.parse_args()
+
+    commands = server_commands(args)
+    summaries = {}
+    for mode in args.modes:
+        command, env = commands[mode]
+        print(f"== {mode}: {' '.join(command)}")
+        results, elapsed = run_mode(args, command, env)
+        report(results, elapsed)
+        summaries[mode] = summary(results, elapsed)
+
+    print(f"\nvirtual users: {args.users}, workers: {args.workers}")
+    print(f"{'mode':<16}{'req/s':>9}{'p95':>11}{'errors':>8}")
+    for mode, (throughput, p95, errors) in summaries.items():
+        print(f"{mode:<16}{throughput:>9.1f}{p95 * 1000:>9.1f}ms{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Settlement time for N expired lots, set-based vs the old per-lot loop.
+
+    python benchmarks/settlement.py --sizes 10000 100000 --legacy-limit 10000
+"""
+import argparse
+from datetime import timedelta
+from decimal import Decimal
+
+from _django import setup, test_database, timer
+
+BIDS_PER_LOT = 3
+BATCH_SIZE = 5000
+
+
+def seed(size: int) -> None:
+    from django.utils import timezone
+
+    from tendering.models import Bid, Category, Lot, User
+
+    users = User.objects.bulk_create(
+        User(username=f"bench_user_{i}") for i in range(BIDS_PER_LOT + 1)
+    )
+    category = Category.objects.create(name="bench")
+    end_date = timezone.now() - timedelta(minutes=1)
+    for offset in range(0, size, BATCH_SIZE):
+        lots = Lot.objects.bulk_create(
+            Lot(
+                name=f"bench_lot_{i}",
+                description="bench",
+                category=category,
+                end_date=end_date,
+                start_price=Decimal(10),
+                owner=users[0],
+            )
+            for i in range(offset, min(offset + BATCH_SIZE, size))
+        )
+        Bid.objects.bulk_create(
+            Bid(lot=lot, user=users[n + 1], amount=Decimal(11 + n))
+            for lot in lots
+            for n in range(BIDS_PER_LOT)
+        )
+
+
+def legacy_close_expired_lots() -> None:
+    from django.utils import timezone
+
+    from tendering.models import Lot
+
+    expired_lots = Lot.objects.filter(
+        is_active=True, end_date__lte=timezone.now()
+    )
+    for lot in expired_lots:
+        lot.is_active = False
+        highest_bid = lot.bids.order_by("-amount").first()
+        if highest_bid:
+            lot.owner = highest_bid.user
+        lot.save()
+
+
+def run(size: int, legacy: bool) -> dict:
+    from django.db import transaction
+
+    from tendering.settlement import close_expired_lots
+
+    results = {}
+    with transaction.atomic():
+        seed(size)
+        with timer(results, "set-based"):
+            close_expired_lots()
+        transaction.set_rollback(True)
+    if legacy:
+        with transaction.atomic():
+            seed(size)
+            with timer(results, "legacy"):
+                legacy_close_expired_lots()
+            transaction.set_rollback(True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument(
+        "--legacy-limit",
+        type=int,
+        default=10000,
+        help="only time the per-lot loop up to this many lots",
+    )
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        for size in args.sizes:
+            results = run(size, legacy=size <= args.legacy_limit)
+            line = ", ".join(
+                f"{name}: {seconds:.2f}s" for name, seconds in results.items()
+            )
+            print(f"{size} expired lots -> {line}")
+
+
+if __name__ == "__main__":
+    main()
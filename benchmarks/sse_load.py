@@ -0,0 +1,100 @@
+"""
+Connections per worker and broadcast latency of the lot event stream.
+
+Start the ASGI server, log in through the browser and copy the session cookie:
+
+    uvicorn Auction.asgi:application --workers 4
+    python benchmarks/sse_load.py --lot 1 --session <sessionid> --clients 2000
+
+The script opens --clients event streams for one lot, publishes --events
+timestamped messages straight into Redis and reports how long each message
+took to reach every connected client.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from redis import asyncio as aioredis
+
+LOT_CHANNEL = "lot:{lot_id}:events"
+
+
+async def open_stream(args, connected: asyncio.Event, latencies: list) -> None:
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    writer.write(
+        (
+            f"GET /lots/{args.lot}/events/ HTTP/1.1\r\n"
+            f"Host: {args.host}\r\n"
+            f"Cookie: sessionid={args.session}\r\n"
+            "Accept: text/event-stream\r\n\r\n"
+        ).encode()
+    )
+    await writer.drain()
+    status = await reader.readline()
+    if b" 200 " not in status:
+        raise RuntimeError(f"Stream refused: {status.decode().strip()}")
+    connected.set()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.startswith(b"data: "):
+                event = json.loads(line[6:])
+                if event.get("type") == "benchmark":
+                    latencies.append(time.time() - event["sent_at"])
+    finally:
+        writer.close()
+
+
+async def main(args) -> None:
+    latencies = []
+    streams = []
+    connected = 0
+    for _ in range(args.clients):
+        ready = asyncio.Event()
+        streams.append(asyncio.create_task(open_stream(args, ready, latencies)))
+        try:
+            await asyncio.wait_for(ready.wait(), timeout=5)
+            connected += 1
+        except asyncio.TimeoutError:
+            break
+    print(f"connected streams: {connected} ({connected / args.workers:.0f} per worker)")
+
+    client = aioredis.from_url(args.redis)
+    for _ in range(args.events):
+        await client.publish(
+            LOT_CHANNEL.format(lot_id=args.lot),
+            json.dumps({"type": "benchmark", "sent_at": time.time()}),
+        )
+        await asyncio.sleep(args.interval)
+    await asyncio.sleep(2)
+    await client.aclose()
+    for stream in streams:
+        stream.cancel()
+
+    expected = connected * args.events
+    print(f"delivered: {len(latencies)}/{expected}")
+    if latencies:
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"broadcast latency p50={quantiles[49] * 1000:.1f}ms "
+            f"p95={quantiles[94] * 1000:.1f}ms "
+            f"p99={quantiles[98] * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--redis", default="redis://localhost:6379/0")
+    parser.add_argument("--lot", type=int, required=True)
+    parser.add_argument("--session", required=True)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
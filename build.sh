@@ -8,5 +8,6 @@ pip install -r requirements.txt
 # Convert static asset files
 python manage.py collectstatic --no-input
 
-# Apply any outstanding database migrations
-python manage.py migrate
\ No newline at end of file
+# Apply any outstanding database migrations; index builds and counter
+# backfills run longer than the statement timeout web requests get
+POSTGRES_STATEMENT_TIMEOUT=0 python manage.py migrate
\ No newline at end of file
@@ -6,4 +6,4 @@ class TenderingConfig(AppConfig):
     name = "tendering"
 
     def ready(self):
-        pass
+        import tendering.signals  # noqa: F401
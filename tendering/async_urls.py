@@ -0,0 +1,19 @@
+from django.urls import path
+
+from tendering import async_views
+from tendering.urls import app_name, urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    "index": async_views.index,
+    "lot-list-active": async_views.active_lot_list,
+    "lot-list-inactive": async_views.inactive_lot_list,
+    "lot-detail": async_views.lot_detail,
+    "bid-create-api": async_views.bid_create_api,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if pattern.name in ASYNC_VIEWS
+    else pattern
+    for pattern in sync_urlpatterns
+]
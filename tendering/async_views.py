@@ -0,0 +1,201 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.template.response import TemplateResponse
+from django.views.decorators.http import require_POST
+
+from tendering import caching, dashboard, price_cache
+from tendering.bidding import BidRejected, place_bid
+from tendering.forms import BidForm, CommentForm
+from tendering.listing import alot_facets
+from tendering.models import Lot
+from tendering.pagination import (
+    CountedPaginator,
+    CursorPage,
+    InvalidCursor,
+    acapped_count,
+    akeyset_page,
+)
+from tendering.tasks import schedule_dashboard_refresh
+from tendering.views import (
+    HISTORY_ORDERING,
+    HISTORY_PAGE_SIZE,
+    ActiveLotListView,
+    InactiveLotListView,
+    LotListMixin,
+    attach_lot_state,
+    bid_accepted_response,
+    bid_rejected_response,
+    latest_price,
+    live_updates,
+)
+
+
+def off_db_thread(func):
+    # Redis and cache calls do not touch the ORM, so they may run in their
+    # own thread alongside the queries queued on the database thread
+    return sync_to_async(func, thread_sensitive=False)
+
+
+@caching.anonymous_cache_page(settings.PAGE_CACHE_TIMEOUT)
+async def index(request: HttpRequest) -> HttpResponse:
+    context, is_stale = await dashboard.aget_dashboard()
+    if is_stale:
+        await off_db_thread(schedule_dashboard_refresh)()
+    return TemplateResponse(request, "pages/index.html", context=context)
+
+
+async def lot_history_context(lot: Lot) -> dict:
+    (bids, next_bids), (comments, next_comments) = await asyncio.gather(
+        akeyset_page(
+            lot.bids.select_related("user"),
+            HISTORY_ORDERING,
+            HISTORY_PAGE_SIZE
+        ),
+        akeyset_page(
+            lot.comments.select_related("owner"),
+            HISTORY_ORDERING,
+            HISTORY_PAGE_SIZE
+        ),
+    )
+    return {
+        "bids": bids,
+        "next_bids": next_bids,
+        "comments": comments,
+        "next_comments": next_comments,
+    }
+
+
+@login_required
+async def lot_detail(request: HttpRequest, pk: int) -> HttpResponse:
+    lot = await aget_object_or_404(
+        Lot.objects.select_related("category", "owner"), pk=pk
+    )
+    price, history = await asyncio.gather(
+        price_cache.aget_lot_price(lot.id),
+        lot_history_context(lot),
+    )
+    context = {
+        "object": lot,
+        "lot": lot,
+        "form": CommentForm(),
+        "bid_form": BidForm(),
+        "price": price,
+        "live_updates": live_updates(lot),
+        **history,
+    }
+    return TemplateResponse(request, "tendering/lot_detail.html", context)
+
+
+async def offset_page(
+        request: HttpRequest,
+        view: LotListMixin,
+        queryset,
+) -> tuple:
+    count, facets = await asyncio.gather(
+        queryset.acount(), alot_facets(view.facet_queryset)
+    )
+    paginator = CountedPaginator(queryset, view.paginate_by, count)
+    page_number = request.GET.get("page") or 1
+    if page_number == "last":
+        page_number = paginator.num_pages
+    try:
+        page = paginator.page(page_number)
+    except InvalidPage as error:
+        raise Http404(f"Invalid page ({page_number}): {error}")
+    page.object_list = [lot async for lot in page.object_list.aiterator()]
+    return paginator, page, facets
+
+
+async def cursor_page(
+        request: HttpRequest,
+        view: LotListMixin,
+        queryset,
+        ordering: tuple,
+) -> tuple:
+    cursor = request.GET.get("cursor") or None
+    try:
+        (items, next_cursor), count, facets = await asyncio.gather(
+            akeyset_page(queryset, ordering, view.paginate_by, cursor),
+            acapped_count(queryset, settings.LISTING_COUNT_LIMIT),
+            alot_facets(view.facet_queryset),
+        )
+    except InvalidCursor:
+        raise Http404("Invalid cursor")
+    return None, CursorPage(items, cursor, next_cursor, *count), facets
+
+
+async def lot_list(
+        request: HttpRequest,
+        view_class: type[LotListMixin],
+) -> HttpResponse:
+    view = view_class()
+    view.setup(request)
+    # building the queryset validates the search form, whose category
+    # choice is checked against the database
+    queryset, ordering = await sync_to_async(
+        lambda: (view.get_queryset(), view.get_cursor_ordering())
+    )()
+    if settings.LISTING_PAGINATION == "cursor" and ordering is not None:
+        paginator, page, facets = await cursor_page(
+            request, view, queryset, ordering
+        )
+    else:
+        paginator, page, facets = await offset_page(request, view, queryset)
+    lots = list(page.object_list)
+    lot_ids = [lot.id for lot in lots]
+    prices, versions = await asyncio.gather(
+        price_cache.aget_lot_prices(lot_ids),
+        off_db_thread(caching.lot_versions)(lot_ids),
+    )
+    attach_lot_state(lots, prices, versions)
+    context = {
+        "view": view,
+        "paginator": paginator,
+        "page_obj": page,
+        "is_paginated": page.has_other_pages(),
+        "object_list": lots,
+        view.context_object_name: lots,
+        "search_form": view.get_search_form(),
+        "facets": facets,
+        "lot_card_timeout": settings.LOT_CARD_CACHE_TIMEOUT,
+    }
+    return TemplateResponse(request, view.template_name, context)
+
+
+@login_required
+async def active_lot_list(request: HttpRequest) -> HttpResponse:
+    return await lot_list(request, ActiveLotListView)
+
+
+@login_required
+async def inactive_lot_list(request: HttpRequest) -> HttpResponse:
+    return await lot_list(request, InactiveLotListView)
+
+
+@require_POST
+async def bid_create_api(request: HttpRequest, pk: int) -> JsonResponse:
+    user = await request.auser()
+    if not user.is_authenticated:
+        raise PermissionDenied
+    lot = await aget_object_or_404(
+        Lot.objects.select_related("category", "owner"), pk=pk
+    )
+    form = BidForm(request.POST, lot=lot)
+    if await sync_to_async(form.is_valid)():
+        try:
+            bid = await sync_to_async(place_bid)(
+                lot.id, user, form.cleaned_data["amount"]
+            )
+        except BidRejected as rejection:
+            form.add_error("amount", str(rejection))
+        else:
+            return bid_accepted_response(bid)
+    current_price = await sync_to_async(latest_price)(lot.id)
+    return bid_rejected_response(form, current_price)
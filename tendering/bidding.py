@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+from django.db import OperationalError, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from tendering import events, price_cache, stats
+from tendering.models import Bid, Lot, User
+
+LOT_EXPIRED_MESSAGE = "Sorry, this lot has expired"
+LOW_BID_MESSAGE = "Your bid must be higher than current price."
+LOT_BUSY_MESSAGE = "This lot is receiving many bids, please try again."
+
+
+class BidRejected(Exception):
+    pass
+
+
+def announce_bid(bid: Bid) -> None:
+    price_cache.record_bid(bid)
+    events.publish_lot_event(
+        bid.lot_id,
+        {
+            "type": "bid",
+            "amount": bid.amount,
+            "bidder": bid.user.username,
+            "created_time": bid.created_time,
+        },
+    )
+
+
+def place_bid(lot_id: int, user: User, amount: Decimal) -> Bid:
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            # the row lock keeps this the price the conditional update below
+            # compares against, which the top bid may not match once it has
+            # been deleted or the counters backfilled
+            previous_price, has_bid = (
+                Lot.objects.select_for_update()
+                .filter(pk=lot_id)
+                .annotate(
+                    has_bid=Exists(
+                        Bid.objects.filter(lot=OuterRef("pk"), user=user)
+                    )
+                )
+                .values_list("current_price", "has_bid")
+                .first()
+            ) or (None, False)
+            updated = (
+                Lot.objects.filter(pk=lot_id, is_active=True, end_date__gt=now)
+                .filter(
+                    Q(current_price__lt=amount)
+                    | Q(current_price__isnull=True, start_price__lt=amount)
+                )
+                .update(current_price=amount, bid_count=F("bid_count") + 1)
+            )
+            if updated:
+                bid = Bid.objects.create(lot_id=lot_id, user=user, amount=amount)
+                Lot.objects.filter(pk=lot_id).update(
+                    top_bid=bid,
+                    distinct_bidder_count=(
+                        F("distinct_bidder_count") + int(not has_bid)
+                    ),
+                )
+                stats.bump(price_sum=amount - (previous_price or 0))
+                transaction.on_commit(lambda: announce_bid(bid), robust=True)
+                return bid
+            is_open = Lot.objects.filter(
+                pk=lot_id, is_active=True, end_date__gt=now
+            ).exists()
+    except OperationalError as error:
+        raise BidRejected(LOT_BUSY_MESSAGE) from error
+    raise BidRejected(LOW_BID_MESSAGE if is_open else LOT_EXPIRED_MESSAGE)
@@ -0,0 +1,103 @@
+import time
+from functools import wraps
+from typing import Iterable
+
+import redis
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.cache import cache_page
+
+from tendering.redis_client import is_unavailable, mark_unavailable
+
+
+class ResilientRedisCache(RedisCache):
+    # degrade to cache misses instead of failing requests while Redis is down
+
+    def guarded(self, method: str, default, *args, **kwargs):
+        if is_unavailable():
+            return default
+        try:
+            return getattr(super(), method)(*args, **kwargs)
+        except redis.RedisError as error:
+            mark_unavailable(error)
+            return default
+
+    def get(self, key, default=None, version=None):
+        return self.guarded("get", default, key, default, version)
+
+    def get_many(self, keys, version=None):
+        return self.guarded("get_many", {}, keys, version)
+
+    def add(self, key, value, timeout=None, version=None):
+        return self.guarded("add", False, key, value, timeout, version)
+
+    def set(self, key, value, timeout=None, version=None):
+        self.guarded("set", None, key, value, timeout, version)
+
+    def set_many(self, data, timeout=None, version=None):
+        return self.guarded("set_many", list(data), data, timeout, version)
+
+    def delete(self, key, version=None):
+        return self.guarded("delete", False, key, version)
+
+    def delete_many(self, keys, version=None):
+        self.guarded("delete_many", None, keys, version)
+
+
+def anonymous_cache_page(timeout: int):
+    def decorator(view):
+        cached_view = cache_page(timeout, key_prefix="anonymous")(view)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(
+                    request: HttpRequest, *args, **kwargs
+            ) -> HttpResponse:
+                user = await request.auser()
+                if user.is_authenticated:
+                    return await view(request, *args, **kwargs)
+                return await cached_view(request, *args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            return cached_view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def lot_version_key(lot_id: int) -> str:
+    return f"lot:{lot_id}:version"
+
+
+def new_version() -> int:
+    # nanosecond stamps never repeat a version an evicted key once had, so a
+    # fragment cached under an old version can not come back
+    return time.time_ns()
+
+
+def lot_versions(lot_ids: Iterable[int]) -> dict[int, int]:
+    keys = {lot_version_key(lot_id): lot_id for lot_id in lot_ids}
+    cached = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in cached.items()}
+    missing = {key: new_version() for key in keys if key not in cached}
+    if missing:
+        cache.set_many(missing, settings.LOT_VERSION_TIMEOUT)
+        versions.update({keys[key]: version for key, version in missing.items()})
+    return versions
+
+
+def bump_lot_versions(lot_ids: Iterable[int]) -> None:
+    version = new_version()
+    cache.set_many(
+        {lot_version_key(lot_id): version for lot_id in lot_ids},
+        settings.LOT_VERSION_TIMEOUT,
+    )
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet
+
+from tendering import stats
+from tendering.metrics import record_cache
+from tendering.models import AuctionStatistics, Bid
+
+DASHBOARD_KEY = "dashboard:index"
+DASHBOARD_FILL_LOCK = "dashboard:index:filling"
+RECENT_BIDS = 5
+
+
+def statistics_context(statistics: AuctionStatistics) -> dict:
+    return {
+        "num_categories": statistics.num_categories,
+        "num_users": statistics.num_users,
+        "num_lots": statistics.num_lots,
+        "num_active_lots": statistics.num_active_lots,
+        "num_bids": statistics.num_bids,
+        "sum_lots": statistics.price_sum,
+        "avg_bids": statistics.average_bids,
+    }
+
+
+def recent_bids() -> QuerySet:
+    return Bid.objects.select_related("lot").order_by("-created_time")[
+        :RECENT_BIDS
+    ]
+
+
+def dashboard_context(
+        statistics: AuctionStatistics,
+        bids: Iterable[Bid],
+) -> dict:
+    return {
+        **statistics_context(statistics),
+        "bids": [
+            {
+                "bid_lot": bid.lot.name,
+                "bid_id": bid.id,
+                "amount": bid.amount,
+                "percentage": int(bid.lot.get_progress_percentage()),
+                "bidders": bid.lot.distinct_bidder_count,
+            }
+            for bid in bids
+        ],
+    }
+
+
+def compute_dashboard() -> dict:
+    return dashboard_context(stats.get_statistics(), recent_bids())
+
+
+async def acompute_dashboard() -> dict:
+    async def fetch_bids() -> list[Bid]:
+        return [bid async for bid in recent_bids().aiterator()]
+
+    statistics, bids = await asyncio.gather(
+        stats.aget_statistics(), fetch_bids()
+    )
+    return dashboard_context(statistics, bids)
+
+
+def cache_entry(context: dict) -> dict:
+    return {"context": context, "computed_at": time.time()}
+
+
+def refresh_dashboard() -> dict:
+    context = compute_dashboard()
+    cache.set(DASHBOARD_KEY, cache_entry(context), settings.DASHBOARD_MAX_AGE)
+    return context
+
+
+async def arefresh_dashboard() -> dict:
+    context = await acompute_dashboard()
+    await cache.aset(
+        DASHBOARD_KEY, cache_entry(context), settings.DASHBOARD_MAX_AGE
+    )
+    return context
+
+
+def get_dashboard() -> tuple[dict, bool]:
+    entry = cache.get(DASHBOARD_KEY)
+    if entry is None:
+        # cold cache: one request fills it inline, since the worker's cache may
+        # not be the one this process reads; the rest serve the statistics
+        # row until it lands
+        record_cache(misses=1)
+        if cache.add(
+            DASHBOARD_FILL_LOCK, True, settings.DASHBOARD_REFRESH_DEBOUNCE
+        ):
+            return refresh_dashboard(), False
+        return {**statistics_context(stats.get_statistics()), "bids": []}, False
+    record_cache(hits=1)
+    age = time.time() - entry["computed_at"]
+    return entry["context"], age > settings.DASHBOARD_REFRESH_INTERVAL
+
+
+async def aget_dashboard() -> tuple[dict, bool]:
+    entry = await cache.aget(DASHBOARD_KEY)
+    if entry is None:
+        record_cache(misses=1)
+        if await cache.aadd(
+            DASHBOARD_FILL_LOCK, True, settings.DASHBOARD_REFRESH_DEBOUNCE
+        ):
+            return await arefresh_dashboard(), False
+        statistics = await stats.aget_statistics()
+        return {**statistics_context(statistics), "bids": []}, False
+    record_cache(hits=1)
+    age = time.time() - entry["computed_at"]
+    return entry["context"], age > settings.DASHBOARD_REFRESH_INTERVAL
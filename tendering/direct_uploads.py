@@ -0,0 +1,133 @@
+import mimetypes
+import posixpath
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+UPLOAD_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp"}
+FILENAME_PLACEHOLDER = "${filename}"
+POLICY_SALT = "tendering.direct_uploads"
+
+
+def user_prefix(upload_to: str, user) -> str:
+    # a signed target only allows writes below the user's own prefix, so any
+    # key under it was uploaded by that user
+    return f"{upload_to}direct/{user.pk}/"
+
+
+def owns_key(key: str, upload_to: str, user) -> bool:
+    prefix = user_prefix(upload_to, user)
+    if not key.startswith(prefix):
+        return False
+    token, _, filename = key[len(prefix):].partition("/")
+    return bool(token) and is_filename(filename)
+
+
+def is_filename(name: str) -> bool:
+    return bool(name) and "/" not in name and name not in (".", "..")
+
+
+def load_policy(policy: str) -> dict | None:
+    try:
+        return signing.loads(
+            policy, salt=POLICY_SALT, max_age=settings.DIRECT_UPLOAD_EXPIRES
+        )
+    except signing.BadSignature:
+        return None
+
+
+class LocalDirectUpload:
+    # stand-in for S3 that keeps the same form-POST protocol: the browser
+    # posts the signed fields and the file to a small view that writes
+    # straight to the default storage
+
+    def target(self, prefix: str) -> dict:
+        policy = signing.dumps(
+            {"prefix": prefix, "max_size": settings.IMAGE_UPLOAD_MAX_SIZE},
+            salt=POLICY_SALT,
+        )
+        return {
+            "url": reverse("tendering:direct-upload"),
+            "fields": {"key": prefix + FILENAME_PLACEHOLDER, "policy": policy},
+        }
+
+    def head(self, key: str) -> dict | None:
+        if not default_storage.exists(key):
+            return None
+        return {
+            "size": default_storage.size(key),
+            "content_type": mimetypes.guess_type(key)[0],
+        }
+
+    def receive(self, fields, upload: UploadedFile | None) -> str | None:
+        policy = load_policy(fields.get("policy", ""))
+        if policy is None or upload is None or upload.size > policy["max_size"]:
+            return None
+        if not fields.get("Content-Type", "").startswith("image/"):
+            return None
+        prefix = policy["prefix"]
+        key = fields.get("key", "").replace(FILENAME_PLACEHOLDER, upload.name)
+        if not key.startswith(prefix) or not is_filename(key[len(prefix):]):
+            return None
+        if default_storage.exists(key):
+            return None
+        return default_storage.save(key, upload)
+
+
+class S3DirectUpload:
+    # boto3 ships with django-storages' S3 extra and is only needed here
+
+    def __init__(self) -> None:
+        self.storage = default_storage
+        self.client = self.storage.connection.meta.client
+
+    def object_key(self, name: str) -> str:
+        return posixpath.join(self.storage.location, name)
+
+    def target(self, prefix: str) -> dict:
+        key = self.object_key(prefix)
+        return self.client.generate_presigned_post(
+            self.storage.bucket_name,
+            key + FILENAME_PLACEHOLDER,
+            Conditions=[
+                ["starts-with", "$key", key],
+                ["starts-with", "$Content-Type", "image/"],
+                ["content-length-range", 1, settings.IMAGE_UPLOAD_MAX_SIZE],
+            ],
+            ExpiresIn=settings.DIRECT_UPLOAD_EXPIRES,
+        )
+
+    def head(self, key: str) -> dict | None:
+        try:
+            response = self.client.head_object(
+                Bucket=self.storage.bucket_name, Key=self.object_key(key)
+            )
+        except self.client.exceptions.ClientError:
+            return None
+        return {
+            "size": response["ContentLength"],
+            "content_type": response.get("ContentType"),
+        }
+
+
+def get_backend():
+    return import_string(settings.DIRECT_UPLOAD_BACKEND)()
+
+
+def receives_uploads() -> bool:
+    # only the local backend needs the site to accept the file itself
+    return issubclass(
+        import_string(settings.DIRECT_UPLOAD_BACKEND), LocalDirectUpload
+    )
+
+
+def upload_target(upload_to: str, user) -> dict:
+    prefix = f"{user_prefix(upload_to, user)}{uuid.uuid4().hex}/"
+    target = get_backend().target(prefix)
+    target["prefix"] = prefix
+    return target
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from redis import asyncio as aioredis
+
+from tendering.redis_client import get_client, mark_unavailable
+
+CHANNEL_PATTERN = "lot:*:events"
+SUBSCRIBER_QUEUE_SIZE = 100
+HEARTBEAT_INTERVAL = 15
+RECONNECT_DELAY = 1
+CLIENT_RETRY_MS = 3000
+
+
+def lot_channel(lot_id: int) -> str:
+    return f"lot:{lot_id}:events"
+
+
+def publish_lot_events(events: Iterable[tuple[int, dict]]) -> None:
+    client = get_client()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for lot_id, event in events:
+            pipe.publish(
+                lot_channel(lot_id), json.dumps(event, cls=DjangoJSONEncoder)
+            )
+        pipe.execute()
+    except redis.RedisError as error:
+        mark_unavailable(error)
+
+
+def publish_lot_event(lot_id: int, event: dict) -> None:
+    publish_lot_events([(lot_id, event)])
+
+
+class LotEventHub:
+    def __init__(self) -> None:
+        self.subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self.listener: asyncio.Task | None = None
+
+    @asynccontextmanager
+    async def subscribe(self, lot_id: int) -> AsyncIterator[asyncio.Queue]:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers[lot_id].add(queue)
+        self.ensure_listening()
+        try:
+            yield queue
+        finally:
+            self.subscribers[lot_id].discard(queue)
+            if not self.subscribers[lot_id]:
+                del self.subscribers[lot_id]
+
+    def ensure_listening(self) -> None:
+        loop = asyncio.get_running_loop()
+        if (
+            self.listener is None
+            or self.listener.done()
+            or self.listener.get_loop() is not loop
+        ):
+            self.listener = loop.create_task(self.listen())
+
+    def dispatch(self, lot_id: int, data: str) -> None:
+        for queue in self.subscribers.get(lot_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(data)
+
+    async def listen(self) -> None:
+        url = getattr(settings, "REDIS_URL", None)
+        if not url:
+            return
+        while True:
+            client = aioredis.from_url(url, decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PATTERN)
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        lot_id = int(message["channel"].split(":")[1])
+                        self.dispatch(lot_id, message["data"])
+            except redis.RedisError:
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+
+hub = LotEventHub()
+
+
+async def lot_event_stream(lot_id: int) -> AsyncIterator[str]:
+    async with hub.subscribe(lot_id) as queue:
+        yield f"retry: {CLIENT_RETRY_MS}\n\n"
+        while True:
+            try:
+                data = await asyncio.wait_for(
+                    queue.get(), timeout=HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"data: {data}\n\n"
@@ -1,11 +1,113 @@
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
+from django.core.files.storage import default_storage
 from django.utils import timezone
+from PIL import Image
 
-from tendering.models import Comment, Bid, Lot, User
+from tendering import direct_uploads
+from tendering.bidding import LOT_EXPIRED_MESSAGE, LOW_BID_MESSAGE
+from tendering.images import UPLOAD_FORMATS, read_header
+from tendering.models import Category, Comment, Bid, Lot, User
 
-PHOTO_SIZE_CONSTRAINT = 5 * 1024 * 1024  # 5 MB
+
+def validate_image(file, size: int, error_messages: dict) -> Image.Image:
+    # never decodes the bitmap: size and dimensions come from the upload
+    # handler or storage and from the image header
+    if size > settings.IMAGE_UPLOAD_MAX_SIZE:
+        raise ValidationError(
+            error_messages["file_too_big"],
+            code="file_too_big",
+            params={"size": round(settings.IMAGE_UPLOAD_MAX_SIZE / 1000000)},
+        )
+    try:
+        image = read_header(file)
+        pixels = image.width * image.height
+    except Image.DecompressionBombError:
+        pixels = None
+    except Exception as exc:
+        raise ValidationError(
+            error_messages["invalid_image"], code="invalid_image"
+        ) from exc
+    # Pillow refuses to even open images far past its own bomb limit
+    if pixels is None or pixels > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise ValidationError(
+            error_messages["too_many_pixels"],
+            code="too_many_pixels",
+            params={"pixels": settings.IMAGE_UPLOAD_MAX_PIXELS // 1000000},
+        )
+    if image.format not in UPLOAD_FORMATS:
+        raise ValidationError(
+            error_messages["unsupported_format"], code="unsupported_format"
+        )
+    return image
+
+
+class ImageUploadField(forms.ImageField):
+    default_error_messages = {
+        "file_too_big": "File is too big. Max size - %(size)s MB",
+        "too_many_pixels": "Image is too large. Max %(pixels)s megapixels",
+        "unsupported_format": "Upload a JPEG, PNG or WebP image.",
+    }
+
+    def to_python(self, data):
+        upload = forms.FileField.to_python(self, data)
+        if upload is None:
+            return None
+        image = validate_image(upload, upload.size, self.error_messages)
+        upload.image = image
+        upload.content_type = Image.MIME.get(image.format)
+        return upload
+
+
+class DirectUploadForm(forms.ModelForm):
+    # the browser uploads the image straight to storage and posts back only
+    # its key; the staged object gets the same checks as a form upload
+    upload_key = forms.CharField(required=False, widget=forms.HiddenInput)
+    direct_upload_field = None
+
+    def __init__(self, *args, user: User | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.user = user
+
+    def validate_upload_key(self, key: str) -> None:
+        model = self._meta.model
+        upload_to = model._meta.get_field(self.direct_upload_field).upload_to
+        if self.user is None or not direct_uploads.owns_key(
+                key, upload_to, self.user
+        ):
+            raise ValidationError("Invalid upload.", code="invalid_upload")
+        # processing moves the staged object, so a second record of the same
+        # key would point at a file that is about to disappear
+        recorded = model.objects.filter(**{self.direct_upload_field: key})
+        if recorded.exclude(pk=self.instance.pk).exists():
+            raise ValidationError("Invalid upload.", code="invalid_upload")
+        head = direct_uploads.get_backend().head(key)
+        if head is None:
+            raise ValidationError(
+                "The upload did not finish, try again.", code="missing_upload"
+            )
+        error_messages = self.fields[self.direct_upload_field].error_messages
+        if head["content_type"] not in direct_uploads.UPLOAD_CONTENT_TYPES:
+            raise ValidationError(
+                error_messages["unsupported_format"], code="unsupported_format"
+            )
+        with default_storage.open(key, "rb") as file:
+            validate_image(file, head["size"], error_messages)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        key = cleaned_data.get("upload_key")
+        if not key:
+            return cleaned_data
+        # reported on the visible image field, the key input is hidden
+        try:
+            self.validate_upload_key(key)
+        except ValidationError as error:
+            self.add_error(self.direct_upload_field, error)
+        else:
+            cleaned_data[self.direct_upload_field] = key
+        return cleaned_data
 
 
 class CommentForm(forms.ModelForm):
@@ -23,23 +125,23 @@ class BidForm(forms.ModelForm):
         model = Bid
         fields = ["amount"]
 
+    def __init__(self, *args, lot: Lot | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.lot = lot
+
     def clean_amount(self):
         amount = self.cleaned_data.get("amount")
-        lot_id = self.data.get("lot_id")
-        lot = get_object_or_404(Lot, id=lot_id)
-        if lot.end_date <= timezone.now():
-            raise forms.ValidationError(
-                "Sorry, this lot has expired"
-            )
-        current_price = lot.current_price or lot.start_price
+        if self.lot is None:
+            return amount
+        if self.lot.end_date <= timezone.now():
+            raise forms.ValidationError(LOT_EXPIRED_MESSAGE)
+        current_price = self.lot.current_price or self.lot.start_price
         if amount <= current_price:
-            raise forms.ValidationError(
-                "Your bid must be higher than current price."
-            )
+            raise forms.ValidationError(LOW_BID_MESSAGE)
         return amount
 
 
-class LotForm(forms.ModelForm):
+class LotForm(DirectUploadForm):
     end_date = forms.DateTimeField(
         widget=forms.DateTimeInput(
             attrs={"type": "datetime-local", "class": "form-control"}
@@ -57,6 +159,9 @@ class LotForm(forms.ModelForm):
             "start_price",
             "photo"
         )
+        field_classes = {"photo": ImageUploadField}
+
+    direct_upload_field = "photo"
 
     def clean(self):
         cleaned_data = super().clean()
@@ -72,15 +177,6 @@ class LotForm(forms.ModelForm):
             )
         return cleaned_data
 
-    def clean_photo(self):
-        photo = self.cleaned_data.get("photo")
-        if photo and photo.size > PHOTO_SIZE_CONSTRAINT:
-            raise ValidationError(
-                f"File is too big. "
-                f"Max size - {round(PHOTO_SIZE_CONSTRAINT / 1000000)} MB"
-            )
-        return photo
-
 
 class LotUpdateForm(forms.ModelForm):
     end_date = forms.DateTimeField(
@@ -143,7 +239,7 @@ class UserCreateForm(forms.ModelForm):
         return user
 
 
-class UserUpdateForm(forms.ModelForm):
+class UserUpdateForm(DirectUploadForm):
     date_of_birth = forms.DateField(
         widget=forms.DateInput(
             attrs={
@@ -166,20 +262,67 @@ class UserUpdateForm(forms.ModelForm):
             "bio",
             "avatar",
         )
+        field_classes = {"avatar": ImageUploadField}
 
-    def clean_avatar(self):
-        avatar = self.cleaned_data.get("avatar")
-        if avatar and avatar.size > PHOTO_SIZE_CONSTRAINT:
-            raise ValidationError(
-                f"Max size - {round(PHOTO_SIZE_CONSTRAINT / 1000000)} MB"
-            )
-        return avatar
+    direct_upload_field = "avatar"
 
 
 class LotSearchForm(forms.Form):
+    SORT_CHOICES = (
+        ("", "newest"),
+        ("ending", "ending soonest"),
+        ("price", "lowest price"),
+        ("-price", "highest price"),
+        ("bids", "most bids"),
+    )
+    ENDING_CHOICES = (
+        ("", "ending any time"),
+        ("1", "ending within an hour"),
+        ("24", "ending within a day"),
+        ("168", "ending within a week"),
+    )
+
     name = forms.CharField(
         max_length=255,
         required=False,
         label="",
-        widget=forms.TextInput(attrs={"placeholder": "search by name"}),
+        widget=forms.TextInput(attrs={"placeholder": "search lots"}),
+    )
+    category = forms.ModelChoiceField(
+        queryset=Category.objects.all(),
+        required=False,
+        label="",
+        empty_label="all categories",
+    )
+    min_price = forms.DecimalField(
+        required=False,
+        min_value=0,
+        label="",
+        widget=forms.NumberInput(attrs={"placeholder": "min price"}),
+    )
+    max_price = forms.DecimalField(
+        required=False,
+        min_value=0,
+        label="",
+        widget=forms.NumberInput(attrs={"placeholder": "max price"}),
+    )
+    ending_within = forms.TypedChoiceField(
+        choices=ENDING_CHOICES,
+        coerce=int,
+        empty_value=None,
+        required=False,
+        label="",
+    )
+    owner = forms.CharField(
+        max_length=150,
+        required=False,
+        label="",
+        widget=forms.TextInput(attrs={"placeholder": "owner"}),
     )
+    has_bids = forms.BooleanField(required=False, label="with bids only")
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False, label="")
+
+    def __init__(self, *args, active: bool = True, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if not active:
+            del self.fields["ending_within"]
@@ -0,0 +1,164 @@
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile, File
+from django.db.models import Model
+from django.db.models.fields.files import FieldFile
+from PIL import Image, ImageOps
+
+from tendering.caching import bump_lot_versions
+from tendering.models import Lot
+
+# name: (width, height, crop); thumbnails fill avatar-sized slots, cards are
+# bounded previews that keep the aspect ratio
+IMAGE_VARIANTS = {
+    "thumb": (96, 96, True),
+    "card": (600, 600, False),
+}
+VARIANT_FORMATS = (
+    ("", "jpg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+    ("_webp", "webp", "WEBP", {"quality": 80, "method": 6}),
+)
+
+# uploads are re-encoded in their own format with metadata dropped
+UPLOAD_FORMATS = {
+    "JPEG": {"quality": 90, "optimize": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"quality": 90},
+}
+
+
+def read_header(file: File) -> Image.Image:
+    # Image.open only parses the header; pixels are decoded on first access
+    file.seek(0)
+    image = Image.open(file)
+    file.seek(0)
+    return image
+
+
+def variants_field(field_name: str) -> str:
+    return f"{field_name}_variants"
+
+
+def variant_name(name: str, variant: str, extension: str) -> str:
+    directory, filename = posixpath.split(name)
+    root = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, "variants", f"{root}_{variant}.{extension}")
+
+
+def resize(image: Image.Image, width: int, height: int, crop: bool) -> Image.Image:
+    if crop:
+        return ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    resized = image.copy()
+    resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+    return resized
+
+
+def render_variants(image_file: FieldFile) -> dict[str, str]:
+    storage = image_file.storage
+    with storage.open(image_file.name, "rb") as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image = image.convert("RGB")
+    variants = {"source": image_file.name}
+    for variant, (width, height, crop) in IMAGE_VARIANTS.items():
+        resized = resize(image, width, height, crop)
+        for suffix, extension, image_format, options in VARIANT_FORMATS:
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            variants[f"{variant}{suffix}"] = storage.save(
+                variant_name(image_file.name, variant, extension),
+                ContentFile(buffer.getvalue()),
+            )
+    return variants
+
+
+def delete_variants(storage, variants: dict[str, str]) -> None:
+    for key, name in variants.items():
+        if key not in ("source", "stripped"):
+            storage.delete(name)
+
+
+def strip_metadata(instance: Model, field_name: str) -> bool:
+    image_file = getattr(instance, field_name)
+    storage = image_file.storage
+    with storage.open(image_file.name, "rb") as source:
+        image = Image.open(source)
+        image_format = image.format
+        icc_profile = image.info.get("icc_profile")
+        image = ImageOps.exif_transpose(image)
+    if image_format == "JPEG" and image.mode not in ("RGB", "L", "CMYK"):
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        image_format,
+        icc_profile=icc_profile,
+        **UPLOAD_FORMATS.get(image_format, {}),
+    )
+    # saved under a fresh name so cached pages never mix old and new bytes,
+    # and outside any direct upload staging prefix
+    field = instance._meta.get_field(field_name)
+    name = storage.save(
+        field.generate_filename(instance, posixpath.basename(image_file.name)),
+        ContentFile(buffer.getvalue()),
+    )
+    updated = type(instance).objects.filter(
+        pk=instance.pk, **{field_name: image_file.name}
+    ).update(**{field_name: name})
+    if not updated:
+        storage.delete(name)
+        return False
+    storage.delete(image_file.name)
+    image_file.name = name
+    return True
+
+
+def needs_variants(instance: Model, field_name: str) -> bool:
+    image_file = getattr(instance, field_name)
+    variants = getattr(instance, variants_field(field_name))
+    return bool(image_file) and variants.get("source") != image_file.name
+
+
+def needs_processing(instance: Model, field_name: str) -> bool:
+    # images given variants before uploads were re-encoded still carry their
+    # metadata, so stripping is tracked on its own
+    variants = getattr(instance, variants_field(field_name))
+    return needs_variants(instance, field_name) or (
+        bool(getattr(instance, field_name)) and not variants.get("stripped")
+    )
+
+
+def generate_variants(
+        instance: Model,
+        field_name: str,
+        stripped: bool = False,
+) -> bool:
+    image_file = getattr(instance, field_name)
+    if not needs_variants(instance, field_name):
+        return False
+    previous = getattr(instance, variants_field(field_name))
+    variants = render_variants(image_file)
+    if stripped:
+        variants["stripped"] = True
+    updated = type(instance).objects.filter(
+        pk=instance.pk, **{field_name: image_file.name}
+    ).update(**{variants_field(field_name): variants})
+    if not updated:
+        # the image was replaced while we worked; a newer task owns it
+        delete_variants(image_file.storage, variants)
+        return False
+    setattr(instance, variants_field(field_name), variants)
+    if previous.get("source"):
+        delete_variants(image_file.storage, previous)
+    return True
+
+
+def process_upload(instance: Model, field_name: str) -> bool:
+    if not needs_processing(instance, field_name):
+        return False
+    if not strip_metadata(instance, field_name):
+        return False
+    generate_variants(instance, field_name, stripped=True)
+    if isinstance(instance, Lot):
+        bump_lot_versions([instance.pk])
+    return True
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.db.models import Count, F, Q, QuerySet
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tendering.search import search_lots
+
+LISTING_PRICE = Coalesce(F("current_price"), F("start_price"))
+
+LOT_SORTS = {
+    "ending": ("end_date", "pk"),
+    "price": ("listing_price", "pk"),
+    "-price": ("-listing_price", "-pk"),
+    "bids": ("-bid_count", "-start_date", "-pk"),
+}
+
+
+def filter_lots(queryset: QuerySet, filters: dict) -> QuerySet:
+    queryset = queryset.alias(listing_price=LISTING_PRICE)
+    if filters.get("category"):
+        queryset = queryset.filter(category=filters["category"])
+    if filters.get("owner"):
+        queryset = queryset.filter(owner__username=filters["owner"])
+    if filters.get("has_bids"):
+        queryset = queryset.filter(bid_count__gt=0)
+    if filters.get("ending_within"):
+        queryset = queryset.filter(
+            end_date__lte=(
+                timezone.now() + timedelta(hours=filters["ending_within"])
+            )
+        )
+    if filters.get("min_price") is not None:
+        queryset = queryset.filter(listing_price__gte=filters["min_price"])
+    if filters.get("max_price") is not None:
+        queryset = queryset.filter(listing_price__lte=filters["max_price"])
+    return search_lots(queryset, filters.get("name", ""))
+
+
+def sort_lots(queryset: QuerySet, sort: str) -> QuerySet:
+    if sort not in LOT_SORTS:
+        return queryset
+    return queryset.annotate(listing_price=LISTING_PRICE).order_by(
+        *LOT_SORTS[sort]
+    )
+
+
+def lot_facet_queryset(queryset: QuerySet) -> QuerySet:
+    return (
+        queryset.order_by()
+        .values("category", "category__name")
+        .annotate(
+            lot_count=Count("pk"),
+            with_bids=Count("pk", filter=Q(bid_count__gt=0)),
+        )
+        .order_by("-lot_count", "category__name")
+    )
+
+
+def lot_facets(queryset: QuerySet) -> list[dict]:
+    return list(lot_facet_queryset(queryset))
+
+
+async def alot_facets(queryset: QuerySet) -> list[dict]:
+    return [facet async for facet in lot_facet_queryset(queryset).aiterator()]
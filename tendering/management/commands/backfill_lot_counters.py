@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from tendering.stats import backfill_lot_counters, backfill_user_lot_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount bid_count, distinct_bidder_count and top_bid of every lot "
+        "and lot_count of every user"
+    )
+
+    def handle(self, *args, **options) -> None:
+        updated = backfill_lot_counters()
+        users = backfill_user_lot_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f"Backfilled {updated} lot(s) and {users} user(s)")
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tendering.settlement import close_expired_lots
+
+
+class Command(BaseCommand):
+    help = "Close every active lot whose end_date has passed"
+
+    def handle(self, *args, **options) -> None:
+        closed = close_expired_lots()
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed} expired lot(s)"))
@@ -0,0 +1,246 @@
+import argparse
+import random
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from tendering.models import Bid, Category, Comment, Lot, User
+from tendering.settlement import close_expired_lots
+from tendering.stats import (
+    backfill_lot_counters,
+    backfill_user_lot_counts,
+    rebuild_statistics,
+)
+
+ADJECTIVES = (
+    "antique", "vintage", "rare", "signed", "mint", "restored", "handmade",
+    "classic", "limited", "original", "boxed", "custom",
+)
+NOUNS = (
+    "watch", "guitar", "camera", "painting", "bicycle", "lamp", "record",
+    "desk", "vase", "jacket", "radio", "coin", "poster", "sofa", "mirror",
+)
+CATEGORY_NAMES = (
+    "art", "books", "cameras", "clothing", "coins", "collectibles",
+    "electronics", "furniture", "jewelry", "music", "sports", "toys",
+)
+
+
+def count(minimum: int):
+    def parse(value: str) -> int:
+        number = int(value)
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}")
+        return number
+
+    return parse
+
+
+@contextmanager
+def explicit_timestamps():
+    fields = (
+        Lot._meta.get_field("start_date"),
+        Bid._meta.get_field("created_time"),
+        Comment._meta.get_field("created_time"),
+    )
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic auction dataset for load and benchmark runs"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--users", type=count(1), default=1000)
+        parser.add_argument("--categories", type=count(1), default=20)
+        parser.add_argument("--lots", type=count(1), default=10000)
+        parser.add_argument("--bids", type=count(0), default=100000)
+        parser.add_argument("--comments", type=count(0), default=20000)
+        parser.add_argument(
+            "--active-fraction",
+            type=float,
+            default=0.5,
+            help="share of lots that are still running",
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of lot popularity; 0 spreads bids evenly",
+        )
+        parser.add_argument("--batch-size", type=count(1), default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--prefix", default="load")
+        parser.add_argument(
+            "--password",
+            default="password",
+            help="password of every generated user",
+        )
+
+    def handle(self, *args, **options) -> None:
+        self.rng = random.Random(options["seed"])
+        self.now = timezone.now()
+        self.batch_size = options["batch_size"]
+        started = time.perf_counter()
+        with explicit_timestamps(), transaction.atomic():
+            users = self.create_users(
+                options["users"], options["prefix"], options["password"]
+            )
+            categories = self.create_categories(options["categories"])
+            lots = self.create_lots(
+                options["lots"], options["active_fraction"], users, categories
+            )
+            weights = self.popularity(len(lots), options["skew"])
+            self.create_bids(options["bids"], lots, weights, users)
+            self.create_comments(options["comments"], lots, weights, users)
+        generated = Lot.objects.filter(pk__range=(lots[0].pk, lots[-1].pk))
+        backfill_lot_counters(generated)
+        generated.update(
+            current_price=Subquery(
+                Bid.objects.filter(pk=OuterRef("top_bid")).values("amount")
+            )
+        )
+        backfill_user_lot_counts(
+            User.objects.filter(pk__range=(users[0].pk, users[-1].pk))
+        )
+        closed = close_expired_lots()
+        rebuild_statistics()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {len(users)} user(s), {len(categories)} "
+                f"categor(ies), {len(lots)} lot(s) ({closed} closed), "
+                f"{options['bids']} bid(s) and {options['comments']} "
+                f"comment(s) in {time.perf_counter() - started:.1f}s"
+            )
+        )
+
+    def create_users(self, count: int, prefix: str, password: str) -> list:
+        password = make_password(password)
+        return User.objects.bulk_create(
+            (
+                User(
+                    username=f"{prefix}_user_{i}",
+                    first_name=self.rng.choice(NOUNS).title(),
+                    password=password,
+                )
+                for i in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+
+    def create_categories(self, count: int) -> list:
+        return Category.objects.bulk_create(
+            Category(name=f"{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {i}")
+            for i in range(count)
+        )
+
+    def create_lots(
+            self,
+            count: int,
+            active_fraction: float,
+            users: list,
+            categories: list,
+    ) -> list:
+        lots = []
+        for i in range(count):
+            if self.rng.random() < active_fraction:
+                end_date = self.now + timedelta(
+                    minutes=self.rng.randint(10, 7 * 24 * 60)
+                )
+            else:
+                end_date = self.now - timedelta(
+                    minutes=self.rng.randint(10, 30 * 24 * 60)
+                )
+            start_date = min(
+                end_date - timedelta(days=self.rng.randint(1, 14)),
+                self.now - timedelta(minutes=1),
+            )
+            lots.append(
+                Lot(
+                    name=f"{self.rng.choice(ADJECTIVES)} "
+                         f"{self.rng.choice(NOUNS)} {i}",
+                    description=" ".join(
+                        self.rng.choices(ADJECTIVES + NOUNS, k=20)
+                    ),
+                    category=self.rng.choice(categories),
+                    owner=self.rng.choice(users),
+                    start_date=start_date,
+                    end_date=end_date,
+                    start_price=Decimal(self.rng.randint(5, 500)),
+                )
+            )
+        return Lot.objects.bulk_create(lots, batch_size=self.batch_size)
+
+    def popularity(self, count: int, skew: float) -> list[float]:
+        ranks = list(range(1, count + 1))
+        self.rng.shuffle(ranks)
+        return list(accumulate(1 / rank ** skew for rank in ranks))
+
+    def pick_lots(self, lots: list, weights: list[float], count: int) -> dict:
+        picked = defaultdict(int)
+        total = weights[-1]
+        for _ in range(count):
+            picked[bisect_left(weights, self.rng.random() * total)] += 1
+        return {lots[index]: hits for index, hits in picked.items()}
+
+    def lot_moment(self, lot: Lot, storm: bool) -> datetime:
+        closes = min(lot.end_date, self.now)
+        span = (closes - lot.start_date).total_seconds()
+        # cubing pulls most bids into the last stretch before end_date
+        share = self.rng.random() ** 3 if storm else self.rng.random()
+        return closes - timedelta(seconds=span * share)
+
+    def create_bids(
+            self, count: int, lots: list, weights: list, users: list
+    ) -> None:
+        batch = []
+        for lot, hits in self.pick_lots(lots, weights, count).items():
+            moments = sorted(self.lot_moment(lot, storm=True) for _ in range(hits))
+            amount = lot.start_price
+            step = max(1, int(lot.start_price) // 20)
+            for moment in moments:
+                amount += self.rng.randint(1, step)
+                bidder = self.rng.choice(users)
+                while bidder.pk == lot.owner_id and len(users) > 1:
+                    bidder = self.rng.choice(users)
+                batch.append(
+                    Bid(lot=lot, user=bidder, amount=amount, created_time=moment)
+                )
+            if len(batch) >= self.batch_size:
+                Bid.objects.bulk_create(batch)
+                batch = []
+        Bid.objects.bulk_create(batch)
+
+    def create_comments(
+            self, count: int, lots: list, weights: list, users: list
+    ) -> None:
+        batch = []
+        for lot, hits in self.pick_lots(lots, weights, count).items():
+            for _ in range(hits):
+                batch.append(
+                    Comment(
+                        lot=lot,
+                        owner=self.rng.choice(users),
+                        text=" ".join(self.rng.choices(ADJECTIVES + NOUNS, k=8)),
+                        created_time=self.lot_moment(lot, storm=False),
+                    )
+                )
+            if len(batch) >= self.batch_size:
+                Comment.objects.bulk_create(batch)
+                batch = []
+        Comment.objects.bulk_create(batch)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from tendering.images import process_upload
+from tendering.models import Lot, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Strip metadata from lot photos and avatars and render their "
+        "missing thumbnail and WebP variants"
+    )
+
+    def handle(self, *args, **options) -> None:
+        processed = 0
+        for queryset, field_name in (
+            (Lot.objects.exclude(photo="").exclude(photo=None), "photo"),
+            (User.objects.exclude(avatar="").exclude(avatar=None), "avatar"),
+        ):
+            for instance in queryset.only(
+                field_name, f"{field_name}_variants"
+            ).iterator():
+                processed += process_upload(instance, field_name)
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {processed} image(s)")
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tendering.stats import rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = "Recount the dashboard statistics from scratch"
+
+    def handle(self, *args, **options) -> None:
+        statistics = rebuild_statistics()
+        self.stdout.write(self.style.SUCCESS(str(statistics)))
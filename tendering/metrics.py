@@ -0,0 +1,237 @@
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+import redis
+from django.conf import settings
+
+from tendering.redis_client import get_client, mark_unavailable
+
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+METRICS_KEY = "metrics:samples"
+METRIC_FAMILIES = (
+    ("auction_http_requests_total", "counter", "Requests served."),
+    (
+        "auction_http_request_duration_seconds",
+        "histogram",
+        "Time spent serving requests.",
+    ),
+    ("auction_db_queries_total", "counter", "Database queries executed."),
+    (
+        "auction_db_query_seconds_total",
+        "counter",
+        "Time spent in database queries.",
+    ),
+    (
+        "auction_template_render_seconds_total",
+        "counter",
+        "Time spent rendering templates.",
+    ),
+    (
+        "auction_repeated_queries_total",
+        "counter",
+        "Requests with a query shape repeated past the threshold.",
+    ),
+    ("auction_cache_hits_total", "counter", "Cache hits."),
+    ("auction_cache_misses_total", "counter", "Cache misses."),
+)
+
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST_PATTERN = re.compile(r"\bIN \((?:\s*%s\s*,?)+\)")
+
+current_request: ContextVar["RequestMetrics | None"] = ContextVar(
+    "current_request", default=None
+)
+
+
+def sql_shape(sql: str) -> str:
+    return IN_LIST_PATTERN.sub("IN (...)", LITERAL_PATTERN.sub("%s", sql))
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.shapes = Counter()
+
+    @property
+    def duration(self) -> float:
+        return time.perf_counter() - self.started
+
+    def repeated_queries(self, threshold: int) -> list[tuple[str, int]]:
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+    def server_timing(self) -> str:
+        return ", ".join((
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f"tpl;dur={self.template_time * 1000:.1f}",
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f"total;dur={self.duration * 1000:.1f}",
+        ))
+
+
+class QueryRecorder:
+    def __init__(self, metrics: RequestMetrics) -> None:
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.db_time += time.perf_counter() - started
+            self.metrics.queries += 1
+            self.metrics.shapes[sql_shape(sql)] += 1
+
+
+def record_cache(hits: int = 0, misses: int = 0) -> None:
+    metrics = current_request.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+def format_value(value: float) -> str:
+    return f"{value:.6f}".rstrip("0").rstrip(".")
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def sample_order(sample: tuple) -> tuple:
+    # histogram buckets sort by their bound, next to the series they belong to
+    name, labels = sample
+    return (
+        tuple(pair for pair in labels if pair[0] != "le"),
+        name,
+        [float(value) for key, value in labels if key == "le"],
+    )
+
+
+class Registry:
+    # each worker process keeps its own totals and adds what it observed since
+    # the last flush to one Redis hash, so any worker can serve the sum of all
+    # of them; the local totals are only served while Redis is unreachable
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.totals = Counter()
+        self.unflushed = Counter()
+        self.next_flush = 0.0
+
+    def observe(
+            self,
+            view: str,
+            method: str,
+            status: int,
+            metrics: RequestMetrics,
+            repeated: int,
+    ) -> None:
+        duration = metrics.duration
+        by_view = (("view", view),)
+        samples = Counter({
+            (
+                "auction_http_requests_total",
+                by_view + (("method", method), ("status", str(status))),
+            ): 1,
+            ("auction_http_request_duration_seconds_sum", by_view): duration,
+            ("auction_http_request_duration_seconds_count", by_view): 1,
+            ("auction_db_queries_total", by_view): metrics.queries,
+            ("auction_db_query_seconds_total", by_view): metrics.db_time,
+            (
+                "auction_template_render_seconds_total", by_view
+            ): metrics.template_time,
+            ("auction_repeated_queries_total", by_view): repeated,
+            ("auction_cache_hits_total", ()): metrics.cache_hits,
+            ("auction_cache_misses_total", ()): metrics.cache_misses,
+        })
+        first_bucket = bisect_left(DURATION_BUCKETS, duration)
+        for index, bound in enumerate((*DURATION_BUCKETS, "+Inf")):
+            bucket = by_view + (("le", str(bound)),)
+            samples[
+                "auction_http_request_duration_seconds_bucket", bucket
+            ] = int(index >= first_bucket)
+        with self.lock:
+            self.totals.update(samples)
+            self.unflushed.update(samples)
+            due = time.monotonic() >= self.next_flush
+        if due:
+            self.flush()
+
+    def flush(self) -> bool:
+        client = get_client()
+        with self.lock:
+            self.next_flush = time.monotonic() + settings.METRICS_FLUSH_INTERVAL
+            if client is None:
+                return False
+            samples, self.unflushed = self.unflushed, Counter()
+        try:
+            pipe = client.pipeline()
+            for sample, value in samples.items():
+                pipe.hincrbyfloat(METRICS_KEY, json.dumps(sample), value)
+            pipe.execute()
+        except redis.RedisError as error:
+            mark_unavailable(error)
+            with self.lock:
+                self.unflushed.update(samples)
+            return False
+        return True
+
+    def collect(self) -> tuple[Counter, bool]:
+        client = get_client()
+        if client is not None and self.flush():
+            try:
+                stored = client.hgetall(METRICS_KEY)
+            except redis.RedisError as error:
+                mark_unavailable(error)
+            else:
+                return Counter({
+                    (name, tuple(map(tuple, labels))): float(value)
+                    for (name, labels), value in (
+                        (json.loads(field), value)
+                        for field, value in stored.items()
+                    )
+                }), True
+        with self.lock:
+            return Counter(self.totals), False
+
+    def render(self) -> str:
+        samples, shared = self.collect()
+        lines = []
+        if not shared:
+            lines.append("# Redis unavailable: counters of this worker only")
+        for family, kind, help_text in METRIC_FAMILIES:
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            names = (
+                {f"{family}_bucket", f"{family}_sum", f"{family}_count"}
+                if kind == "histogram"
+                else {family}
+            )
+            for name, labels in sorted(
+                    (sample for sample in samples if sample[0] in names),
+                    key=sample_order,
+            ):
+                lines.append(
+                    f"{name}{format_labels(labels)} "
+                    f"{format_value(samples[name, labels])}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
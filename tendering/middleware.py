@@ -0,0 +1,99 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+from tendering.metrics import (
+    QueryRecorder,
+    RequestMetrics,
+    current_request,
+    registry,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def record_queries(stack: ExitStack, metrics: RequestMetrics) -> None:
+    recorder = QueryRecorder(metrics)
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        try:
+            with ExitStack() as stack:
+                record_queries(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        # connections are per thread and the async ORM runs its queries on
+        # the request's database thread, so the wrappers are installed there
+        stack = ExitStack()
+        try:
+            await sync_to_async(record_queries)(stack, metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            current_request.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    def process_template_response(
+            self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        metrics = current_request.get()
+        if metrics is None:
+            return response
+        started = time.perf_counter()
+
+        def rendered(response: HttpResponse) -> None:
+            metrics.template_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def finish(
+            self,
+            request: HttpRequest,
+            response: HttpResponse,
+            metrics: RequestMetrics,
+    ) -> None:
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        repeated = metrics.repeated_queries(settings.REPEATED_QUERY_THRESHOLD)
+        for shape, count in repeated:
+            logger.warning(
+                "Possible N+1 in %s: %d queries shaped like %s",
+                view,
+                count,
+                shape,
+            )
+        registry.observe(
+            view, request.method, response.status_code, metrics, len(repeated)
+        )
+        response["Server-Timing"] = metrics.server_timing()
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tendering', '0007_lot_photo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuctionStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('num_categories', models.PositiveIntegerField(default=0)),
+                ('num_users', models.PositiveIntegerField(default=0)),
+                ('num_lots', models.PositiveIntegerField(default=0)),
+                ('num_active_lots', models.PositiveIntegerField(default=0)),
+                ('num_bids', models.PositiveIntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'auction statistics',
+            },
+        ),
+    ]
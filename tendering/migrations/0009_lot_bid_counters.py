@@ -0,0 +1,57 @@
+# Generated by Django 5.1 on 2026-10-18 19:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_lot_counters(apps, schema_editor):
+    Bid = apps.get_model("tendering", "Bid")
+    Lot = apps.get_model("tendering", "Lot")
+    lot_bids = Bid.objects.filter(lot=OuterRef("pk")).order_by()
+    Lot.objects.update(
+        bid_count=Coalesce(
+            Subquery(
+                lot_bids.values("lot").annotate(total=Count("pk")).values("total")
+            ),
+            0,
+        ),
+        distinct_bidder_count=Coalesce(
+            Subquery(
+                lot_bids.values("lot")
+                .annotate(total=Count("user", distinct=True))
+                .values("total")
+            ),
+            0,
+        ),
+        top_bid=Subquery(
+            lot_bids.order_by("-amount", "created_time").values("pk")[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tendering', '0008_auctionstatistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lot',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='lot',
+            name='distinct_bidder_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='lot',
+            name='top_bid',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tendering.bid'),
+        ),
+        migrations.RunPython(backfill_lot_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tendering', '0009_lot_bid_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['lot', '-created_time', '-id'], name='tendering_b_lot_id_d236f1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['lot', '-created_time', '-id'], name='tendering_c_lot_id_276418_idx'),
+        ),
+    ]
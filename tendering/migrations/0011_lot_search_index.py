@@ -0,0 +1,79 @@
+import django.db.models.deletion
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+# frozen copies: the search module may change, this migration may not
+
+POSTGRES_INDEXES = [
+    GinIndex(
+        SearchVector("name", "description", config="english"),
+        name="lot_search_vector_idx",
+    ),
+    GinIndex(
+        OpClass(Lower("name"), name="gin_trgm_ops"),
+        name="lot_name_trgm_idx",
+    ),
+]
+
+SQLITE_FTS_TRIGGERS = (
+    "tendering_lot_fts_insert",
+    "tendering_lot_fts_update",
+    "tendering_lot_fts_delete",
+    "tendering_category_fts_update",
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        Lot = apps.get_model("tendering", "Lot")
+        for index in POSTGRES_INDEXES:
+            schema_editor.add_index(Lot, index)
+    elif vendor == "sqlite":
+        # the triggers that keep the table in sync are installed after
+        # migrate by tendering.signals
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS tendering_lot_fts "
+            "USING fts5(name, description, category)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        Lot = apps.get_model("tendering", "Lot")
+        for index in POSTGRES_INDEXES:
+            schema_editor.remove_index(Lot, index)
+    elif vendor == "sqlite":
+        for trigger in SQLITE_FTS_TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS tendering_lot_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tendering', '0010_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LotSearchEntry',
+            fields=[
+                ('lot', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='tendering.lot')),
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+                ('category', models.TextField(null=True)),
+                ('document', models.TextField(db_column='tendering_lot_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'tendering_lot_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
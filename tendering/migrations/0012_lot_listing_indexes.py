@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 19:34
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tendering', '0011_lot_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='lot',
+            name='tendering_l_is_acti_344aea_idx',
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(fields=['is_active', '-start_date'], name='lot_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(fields=['category', 'is_active', '-start_date'], name='lot_category_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['end_date'], name='lot_active_end_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(fields=['is_active', '-bid_count'], name='lot_bid_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('current_price', 'start_price'), name='lot_listing_price_idx'),
+        ),
+    ]
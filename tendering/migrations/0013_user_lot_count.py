@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 20:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_user_lot_counts(apps, schema_editor):
+    Lot = apps.get_model("tendering", "Lot")
+    User = apps.get_model("tendering", "User")
+    User.objects.update(
+        lot_count=Coalesce(
+            Subquery(
+                Lot.objects.filter(owner=OuterRef("pk"))
+                .order_by()
+                .values("owner")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tendering', '0012_lot_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='lot_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_user_lot_counts, migrations.RunPython.noop),
+    ]
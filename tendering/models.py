@@ -3,6 +3,7 @@ from decimal import Decimal
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils import timezone
 
@@ -26,6 +27,8 @@ class User(AbstractUser):
         upload_to="avatars/",
         blank=True, null=True
     )
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
+    lot_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ("username",)
@@ -56,6 +59,9 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ("created_time",)
+        indexes = [
+            models.Index(fields=["lot", "-created_time", "-id"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.owner}: {self.text}. Lot: {self.lot}"
@@ -93,13 +99,43 @@ class Lot(models.Model):
         upload_to="tenders/",
         blank=True, null=True
     )
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
+    bid_count = models.PositiveIntegerField(default=0)
+    distinct_bidder_count = models.PositiveIntegerField(default=0)
+    top_bid = models.ForeignKey(
+        "Bid",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
 
     class Meta:
         ordering = ("is_active", "-start_date")
         indexes = [
-            models.Index(fields=["is_active"]),
             models.Index(fields=["start_date"]),
             models.Index(fields=["end_date"]),
+            models.Index(
+                fields=["is_active", "-start_date"],
+                name="lot_listing_idx",
+            ),
+            models.Index(
+                fields=["category", "is_active", "-start_date"],
+                name="lot_category_listing_idx",
+            ),
+            models.Index(
+                fields=["end_date"],
+                condition=models.Q(is_active=True),
+                name="lot_active_end_date_idx",
+            ),
+            models.Index(
+                fields=["is_active", "-bid_count"],
+                name="lot_bid_count_idx",
+            ),
+            models.Index(
+                Coalesce("current_price", "start_price"),
+                name="lot_listing_price_idx",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -107,12 +143,10 @@ class Lot(models.Model):
         return f"Lot: {self.name}. Owner: {self.owner}. Status: {active}"
 
     def get_highest_bidder(self) -> settings.AUTH_USER_MODEL:
-        highest_bid = self.bids.order_by("-amount").first()
-        return highest_bid.user if highest_bid else None
+        return self.top_bid.user if self.top_bid else None
 
     def get_highest_bid_amount(self) -> Decimal:
-        highest_bid = self.bids.order_by("-amount").first()
-        return highest_bid.amount if highest_bid else None
+        return self.top_bid.amount if self.top_bid else None
 
     def get_absolute_url(self):
         return reverse("tendering:lot-detail", args=[str(self.id)])
@@ -147,6 +181,54 @@ class Bid(models.Model):
 
     class Meta:
         ordering = ("-amount",)
+        indexes = [
+            models.Index(fields=["lot", "-created_time", "-id"]),
+        ]
 
     def __str__(self) -> str:
         return f"User: {self.user} (lot: {self.lot.name}, amount: {self.amount})"
+
+
+class AuctionStatistics(models.Model):
+    num_categories = models.PositiveIntegerField(default=0)
+    num_users = models.PositiveIntegerField(default=0)
+    num_lots = models.PositiveIntegerField(default=0)
+    num_active_lots = models.PositiveIntegerField(default=0)
+    num_bids = models.PositiveIntegerField(default=0)
+    price_sum = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "auction statistics"
+
+    def __str__(self) -> str:
+        return f"Statistics: {self.num_lots} lots, {self.num_bids} bids"
+
+    @property
+    def average_bids(self) -> float:
+        if not self.num_lots:
+            return 0.0
+        return round(self.num_bids / self.num_lots, 2)
+
+
+class LotSearchEntry(models.Model):
+    lot = models.OneToOneField(
+        Lot,
+        primary_key=True,
+        db_column="rowid",
+        on_delete=models.DO_NOTHING,
+        related_name="search_entry",
+    )
+    name = models.TextField()
+    description = models.TextField()
+    category = models.TextField(null=True)
+    document = models.TextField(db_column="tendering_lot_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "tendering_lot_fts"
@@ -0,0 +1,164 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Field, Model, Q, QuerySet
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), cls=CursorEncoder)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def ordering_fields(queryset: QuerySet, ordering: Sequence[str]) -> list[Field]:
+    fields = []
+    for field in ordering:
+        name = field.lstrip("-")
+        if name in queryset.query.annotations:
+            fields.append(queryset.query.annotations[name].output_field)
+        elif name == "pk":
+            fields.append(queryset.model._meta.pk)
+        else:
+            fields.append(queryset.model._meta.get_field(name))
+    return fields
+
+
+def decode_cursor(cursor: str, fields: Sequence[Field]) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise InvalidCursor(cursor) from error
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor(cursor)
+    # a tampered cursor must not reach the query with values of the wrong type
+    try:
+        return [
+            None if value is None else field.to_python(value)
+            for field, value in zip(fields, values)
+        ]
+    except (ValidationError, TypeError, ValueError) as error:
+        raise InvalidCursor(cursor) from error
+
+
+def keyset_filter(ordering: Sequence[str], values: Sequence) -> Q:
+    condition = Q()
+    for position, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        step = Q(**{f"{name}__{lookup}": values[position]})
+        for previous, value in zip(ordering[:position], values):
+            step &= Q(**{previous.lstrip("-"): value})
+        condition |= step
+    return condition
+
+
+def cursor_for(obj: Model, ordering: Sequence[str]) -> str:
+    return encode_cursor(getattr(obj, field.lstrip("-")) for field in ordering)
+
+
+def keyset_queryset(
+        queryset: QuerySet,
+        ordering: Sequence[str],
+        size: int,
+        cursor: str | None = None,
+) -> QuerySet:
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, ordering_fields(queryset, ordering))
+        queryset = queryset.filter(keyset_filter(ordering, values))
+    return queryset[:size + 1]
+
+
+def split_page(
+        items: list,
+        ordering: Sequence[str],
+        size: int,
+) -> tuple[list, str | None]:
+    if len(items) <= size:
+        return items, None
+    items = items[:size]
+    return items, cursor_for(items[-1], ordering)
+
+
+def keyset_page(
+        queryset: QuerySet,
+        ordering: Sequence[str],
+        size: int,
+        cursor: str | None = None,
+) -> tuple[list, str | None]:
+    queryset = keyset_queryset(queryset, ordering, size, cursor)
+    return split_page(list(queryset), ordering, size)
+
+
+async def akeyset_page(
+        queryset: QuerySet,
+        ordering: Sequence[str],
+        size: int,
+        cursor: str | None = None,
+) -> tuple[list, str | None]:
+    queryset = keyset_queryset(queryset, ordering, size, cursor)
+    items = [item async for item in queryset.aiterator()]
+    return split_page(items, ordering, size)
+
+
+def capped_count(queryset: QuerySet, limit: int) -> tuple[int, bool]:
+    count = queryset.order_by()[:limit + 1].count()
+    return min(count, limit), count <= limit
+
+
+async def acapped_count(queryset: QuerySet, limit: int) -> tuple[int, bool]:
+    count = await queryset.order_by()[:limit + 1].acount()
+    return min(count, limit), count <= limit
+
+
+class CursorPage:
+    def __init__(
+            self,
+            object_list: list,
+            cursor: str | None,
+            next_cursor: str | None,
+            count: int,
+            count_is_exact: bool,
+    ) -> None:
+        self.object_list = object_list
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.count = count
+        self.count_is_exact = count_is_exact
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class CountedPaginator(Paginator):
+    def __init__(self, object_list, per_page: int, count: int, **kwargs) -> None:
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
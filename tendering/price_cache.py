@@ -0,0 +1,196 @@
+from decimal import Decimal
+from typing import Iterable
+
+import redis
+from asgiref.sync import sync_to_async
+from redis.commands.core import Script
+
+from tendering.metrics import record_cache
+from tendering.models import Bid, Lot
+from tendering.redis_client import get_client, mark_unavailable
+
+PRICE_CACHE_TTL = 5 * 60
+# a fill reads the database before it writes to Redis; a bid recorded while
+# the lot is not cached marks it so that an older snapshot is not stored
+FILL_GUARD_TTL = 30
+
+# a fill stores the id of the lot's latest bid with the snapshot; bids
+# committed before the fill read the database are already counted in it and
+# are skipped when their own record arrives afterwards
+RECORD_BID = Script(None, b"""
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    redis.call("SET", KEYS[2], 1, "EX", ARGV[4])
+    return 0
+end
+if tonumber(ARGV[5]) <= tonumber(redis.call("HGET", KEYS[1], "last_bid") or 0) then
+    return 0
+end
+redis.call("HINCRBY", KEYS[1], "bid_count", 1)
+if tonumber(redis.call("HGET", KEYS[1], "current_price")) < tonumber(ARGV[1]) then
+    redis.call("HSET", KEYS[1], "current_price", ARGV[1], "top_bidder", ARGV[2])
+end
+redis.call("EXPIRE", KEYS[1], ARGV[3])
+return 1
+""")
+
+FILL_PRICE = Script(None, b"""
+if redis.call("EXISTS", KEYS[1]) == 1 or redis.call("EXISTS", KEYS[2]) == 1 then
+    return 0
+end
+redis.call(
+    "HSET", KEYS[1],
+    "current_price", ARGV[1], "top_bidder", ARGV[2], "bid_count", ARGV[3],
+    "last_bid", ARGV[4]
+)
+redis.call("EXPIRE", KEYS[1], ARGV[5])
+return 1
+""")
+
+
+def lot_key(lot_id: int) -> str:
+    return f"lot:{lot_id}:price"
+
+
+def fill_guard_key(lot_id: int) -> str:
+    return f"lot:{lot_id}:price:bid"
+
+
+def load_lot_prices(lot_ids: Iterable[int]) -> dict[int, dict]:
+    lots = Lot.objects.filter(pk__in=lot_ids).values(
+        "pk",
+        "current_price",
+        "start_price",
+        "bid_count",
+        "top_bid",
+        "top_bid__user__username",
+    )
+    # every accepted bid outbids the one before it, so the top bid is also
+    # the lot's latest
+    return {
+        lot["pk"]: {
+            "current_price": lot["current_price"] or lot["start_price"],
+            "top_bidder": lot["top_bid__user__username"] or "",
+            "bid_count": lot["bid_count"],
+            "last_bid": lot["top_bid"] or 0,
+        }
+        for lot in lots
+    }
+
+
+def cached_lot_prices(lot_ids: list[int]) -> dict[int, dict] | None:
+    client = get_client()
+    if client is None:
+        return None
+    prices = {}
+    try:
+        pipe = client.pipeline(transaction=False)
+        for lot_id in lot_ids:
+            pipe.hgetall(lot_key(lot_id))
+        for lot_id, cached in zip(lot_ids, pipe.execute()):
+            if cached:
+                prices[lot_id] = {
+                    "current_price": Decimal(cached["current_price"]),
+                    "top_bidder": cached["top_bidder"],
+                    "bid_count": int(cached["bid_count"]),
+                    "last_bid": int(cached.get("last_bid", 0)),
+                }
+    except redis.RedisError as error:
+        mark_unavailable(error)
+        return None
+    return prices
+
+
+def store_lot_prices(prices: dict[int, dict]) -> None:
+    client = get_client()
+    if client is None or not prices:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for lot_id, price in prices.items():
+            FILL_PRICE(
+                keys=[lot_key(lot_id), fill_guard_key(lot_id)],
+                args=[
+                    str(price["current_price"]),
+                    price["top_bidder"],
+                    price["bid_count"],
+                    price["last_bid"],
+                    PRICE_CACHE_TTL,
+                ],
+                client=pipe,
+            )
+        pipe.execute()
+    except redis.RedisError as error:
+        mark_unavailable(error)
+
+
+def get_lot_prices(lot_ids: Iterable[int]) -> dict[int, dict]:
+    lot_ids = list(lot_ids)
+    cached = cached_lot_prices(lot_ids)
+    prices = dict(cached or {})
+    missing = [lot_id for lot_id in lot_ids if lot_id not in prices]
+    record_cache(hits=len(prices), misses=len(missing))
+    if not missing:
+        return prices
+    loaded = load_lot_prices(missing)
+    prices.update(loaded)
+    if cached is not None:
+        store_lot_prices(loaded)
+    return prices
+
+
+async def aget_lot_prices(lot_ids: Iterable[int]) -> dict[int, dict]:
+    # only the database fallback has to wait for the thread the ORM runs on;
+    # the Redis round trips run in a thread of their own
+    lot_ids = list(lot_ids)
+    cached = await sync_to_async(cached_lot_prices, thread_sensitive=False)(
+        lot_ids
+    )
+    prices = dict(cached or {})
+    missing = [lot_id for lot_id in lot_ids if lot_id not in prices]
+    record_cache(hits=len(prices), misses=len(missing))
+    if not missing:
+        return prices
+    loaded = await sync_to_async(load_lot_prices)(missing)
+    prices.update(loaded)
+    if cached is not None:
+        await sync_to_async(store_lot_prices, thread_sensitive=False)(loaded)
+    return prices
+
+
+def get_lot_price(lot_id: int) -> dict | None:
+    return get_lot_prices([lot_id]).get(lot_id)
+
+
+async def aget_lot_price(lot_id: int) -> dict | None:
+    return (await aget_lot_prices([lot_id])).get(lot_id)
+
+
+def record_bid(bid: Bid) -> None:
+    client = get_client()
+    if client is None:
+        return
+    try:
+        RECORD_BID(
+            keys=[lot_key(bid.lot_id), fill_guard_key(bid.lot_id)],
+            args=[
+                str(bid.amount),
+                bid.user.username,
+                PRICE_CACHE_TTL,
+                FILL_GUARD_TTL,
+                bid.id,
+            ],
+            client=client,
+        )
+    except redis.RedisError as error:
+        mark_unavailable(error)
+
+
+def invalidate(lot_ids: Iterable[int]) -> None:
+    lot_ids = list(lot_ids)
+    client = get_client()
+    if not lot_ids or client is None:
+        return
+    try:
+        client.delete(*(lot_key(lot_id) for lot_id in lot_ids))
+    except redis.RedisError as error:
+        mark_unavailable(error)
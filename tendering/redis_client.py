@@ -0,0 +1,37 @@
+import logging
+import time
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_AFTER = 30
+
+_client = None
+_unavailable_until = 0.0
+
+
+def get_client() -> redis.Redis | None:
+    global _client
+    url = getattr(settings, "REDIS_URL", None)
+    if not url or is_unavailable():
+        return None
+    if _client is None:
+        _client = redis.Redis.from_url(
+            url,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1,
+            decode_responses=True,
+        )
+    return _client
+
+
+def is_unavailable() -> bool:
+    return time.monotonic() < _unavailable_until
+
+
+def mark_unavailable(error: redis.RedisError) -> None:
+    global _unavailable_until
+    _unavailable_until = time.monotonic() + RETRY_AFTER
+    logger.warning("Redis unavailable: %s", error)
@@ -0,0 +1,170 @@
+import re
+
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Lookup, Q, QuerySet, Value
+from django.db.models.functions import Lower
+
+from tendering.models import Category, LotSearchEntry
+
+SEARCH_CONFIG = "english"
+
+LOT_SEARCH_VECTOR = SearchVector("name", "description", config=SEARCH_CONFIG)
+
+SQLITE_FTS_TABLE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tendering_lot_fts
+    USING fts5(name, description, category)
+"""
+
+SQLITE_FTS_TRIGGER_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS tendering_lot_fts_insert
+    AFTER INSERT ON tendering_lot BEGIN
+        INSERT INTO tendering_lot_fts(rowid, name, description, category)
+        VALUES (
+            new.id, new.name, new.description,
+            (SELECT name FROM tendering_category WHERE id = new.category_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tendering_lot_fts_update
+    AFTER UPDATE OF name, description, category_id ON tendering_lot BEGIN
+        UPDATE tendering_lot_fts SET
+            name = new.name,
+            description = new.description,
+            category = (
+                SELECT name FROM tendering_category WHERE id = new.category_id
+            )
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tendering_lot_fts_delete
+    AFTER DELETE ON tendering_lot BEGIN
+        DELETE FROM tendering_lot_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tendering_category_fts_update
+    AFTER UPDATE OF name ON tendering_category BEGIN
+        UPDATE tendering_lot_fts SET category = new.name
+        WHERE rowid IN (
+            SELECT id FROM tendering_lot WHERE category_id = new.id
+        );
+    END
+    """,
+]
+
+SQLITE_FTS_REBUILD_SQL = [
+    "DELETE FROM tendering_lot_fts",
+    """
+    INSERT INTO tendering_lot_fts(rowid, name, description, category)
+    SELECT lot.id, lot.name, lot.description, category.name
+    FROM tendering_lot lot
+    LEFT JOIN tendering_category category ON category.id = lot.category_id
+    """,
+]
+
+SQLITE_FTS_TRIGGERS = (
+    "tendering_lot_fts_insert",
+    "tendering_lot_fts_update",
+    "tendering_lot_fts_delete",
+    "tendering_category_fts_update",
+)
+
+
+def install_sqlite_fts(db_connection) -> None:
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master "
+            "WHERE type = 'trigger' AND name IN (%s, %s, %s, %s)",
+            SQLITE_FTS_TRIGGERS,
+        )
+        if cursor.fetchone()[0] == len(SQLITE_FTS_TRIGGERS):
+            return
+        cursor.execute(SQLITE_FTS_TABLE_SQL)
+        for statement in SQLITE_FTS_TRIGGER_SQL + SQLITE_FTS_REBUILD_SQL:
+            cursor.execute(statement)
+
+
+def drop_sqlite_fts_triggers(db_connection) -> None:
+    # the category trigger reads tendering_lot, which makes SQLite refuse to
+    # rebuild that table during migrations; post_migrate reinstalls them
+    with db_connection.cursor() as cursor:
+        for trigger in SQLITE_FTS_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+class IcontainsLotSearch:
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        return queryset.filter(
+            Q(name__icontains=query)
+            | Q(description__icontains=query)
+            | Q(category__name__icontains=query)
+        )
+
+
+class PostgresLotSearch:
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        search_query = SearchQuery(
+            query, config=SEARCH_CONFIG, search_type="websearch"
+        )
+        categories = Category.objects.filter(name__icontains=query).values("pk")
+        return (
+            queryset.annotate(
+                search=LOT_SEARCH_VECTOR,
+                rank=SearchRank(LOT_SEARCH_VECTOR, search_query),
+            )
+            .filter(
+                Q(search=search_query)
+                | Q(TrigramSimilar(Lower("name"), Value(query.lower())))
+                | Q(category__in=categories)
+            )
+            .order_by("-rank", *ordering_of(queryset))
+        )
+
+
+class Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+LotSearchEntry._meta.get_field("document").register_lookup(Match)
+
+
+class SqliteLotSearch:
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return queryset
+        match = " ".join(f'"{term}"*' for term in terms)
+        return (
+            queryset.filter(search_entry__document__match=match)
+            .annotate(rank=F("search_entry__rank"))
+            .order_by("rank", *ordering_of(queryset))
+        )
+
+
+def ordering_of(queryset: QuerySet) -> tuple:
+    return tuple(queryset.query.order_by) or queryset.model._meta.ordering
+
+
+def get_search_backend():
+    if connection.vendor == "postgresql":
+        return PostgresLotSearch()
+    if connection.vendor == "sqlite":
+        return SqliteLotSearch()
+    return IcontainsLotSearch()
+
+
+def search_lots(queryset: QuerySet, query: str) -> QuerySet:
+    query = query.strip()
+    if not query:
+        return queryset
+    return get_search_backend().search(queryset, query)
@@ -0,0 +1,94 @@
+from collections import Counter
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tendering import caching, events, price_cache, stats
+from tendering.models import Bid, Lot
+
+SETTLEMENT_CHUNK_SIZE = 1000
+
+
+def winning_bidder_subquery() -> Subquery:
+    return Subquery(Bid.objects.filter(pk=OuterRef("top_bid")).values("user"))
+
+
+def ownership_transfers(lots: QuerySet) -> Counter:
+    deltas = Counter()
+    transfers = (
+        lots.filter(top_bid__isnull=False)
+        .exclude(top_bid__user=F("owner"))
+        .order_by()
+        .values_list("owner", "top_bid__user")
+    )
+    for seller, winner in transfers:
+        deltas[seller] -= 1
+        deltas[winner] += 1
+    return deltas
+
+
+def lots_closed(lot_ids: list[int]) -> None:
+    price_cache.invalidate(lot_ids)
+    caching.bump_lot_versions(lot_ids)
+    events.publish_lot_events((lot_id, {"type": "closed"}) for lot_id in lot_ids)
+
+
+def close_expired_lots(
+        now: datetime | None = None,
+        chunk_size: int = SETTLEMENT_CHUNK_SIZE,
+) -> int:
+    now = now or timezone.now()
+    closed = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(
+                Lot.objects.filter(
+                    is_active=True,
+                    end_date__lte=now,
+                    pk__gt=last_pk,
+                )
+                .select_for_update(skip_locked=True, of=("self",))
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not chunk:
+                return closed
+            stats.adjust_lot_counts(
+                ownership_transfers(Lot.objects.filter(pk__in=chunk))
+            )
+            Lot.objects.filter(pk__in=chunk).update(
+                is_active=False,
+                owner=Coalesce(winning_bidder_subquery(), F("owner")),
+            )
+            stats.bump(num_active_lots=-len(chunk))
+            transaction.on_commit(
+                lambda chunk=chunk: lots_closed(chunk), robust=True
+            )
+        closed += len(chunk)
+        last_pk = chunk[-1]
+
+
+def close_lot(lot_id: int, end_date: datetime | None = None) -> bool:
+    lots = Lot.objects.filter(
+        pk=lot_id,
+        is_active=True,
+        end_date__lte=timezone.now(),
+    )
+    if end_date is not None:
+        lots = lots.filter(end_date=end_date)
+    with transaction.atomic():
+        transfers = ownership_transfers(lots)
+        closed = lots.update(
+            is_active=False,
+            owner=Coalesce(winning_bidder_subquery(), F("owner")),
+        )
+        if closed:
+            stats.adjust_lot_counts(transfers)
+    if closed:
+        stats.bump(num_active_lots=-1)
+        lots_closed([lot_id])
+    return bool(closed)
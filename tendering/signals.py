@@ -0,0 +1,131 @@
+from django.db import connections, transaction
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_migrate,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from tendering import caching, search, stats, tasks
+from tendering.models import Bid, Category, Lot, User
+
+
+@receiver(post_save, sender=Category)
+def category_created(sender, instance, created, **kwargs) -> None:
+    if created:
+        stats.bump(num_categories=1)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs) -> None:
+    stats.bump(num_categories=-1)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw, **kwargs) -> None:
+    if not raw:
+        tasks.schedule_image_processing(instance, "avatar")
+    if created:
+        stats.bump(num_users=1)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs) -> None:
+    stats.bump(num_users=-1)
+
+
+def bump_lot_version(lot_id: int) -> None:
+    # bump again on commit so a row rendered from the pre-commit state in
+    # between is not kept under the new version
+    caching.bump_lot_versions([lot_id])
+    transaction.on_commit(
+        lambda: caching.bump_lot_versions([lot_id]), robust=True
+    )
+
+
+@receiver(pre_save, sender=Lot)
+def lot_owner_changed(sender, instance, raw, **kwargs) -> None:
+    if raw or instance._state.adding:
+        return
+    previous_owner = (
+        Lot.objects.filter(pk=instance.pk)
+        .values_list("owner", flat=True)
+        .first()
+    )
+    if previous_owner is not None and previous_owner != instance.owner_id:
+        stats.adjust_lot_counts({previous_owner: -1, instance.owner_id: 1})
+
+
+@receiver(post_save, sender=Lot)
+def lot_saved(sender, instance, created, raw, **kwargs) -> None:
+    bump_lot_version(instance.pk)
+    if not raw:
+        tasks.schedule_image_processing(instance, "photo")
+    if created:
+        stats.adjust_lot_counts({instance.owner_id: 1})
+        stats.bump(
+            num_lots=1,
+            num_active_lots=int(instance.is_active),
+            price_sum=instance.current_price or 0,
+        )
+
+
+@receiver(post_delete, sender=Lot)
+def lot_deleted(sender, instance, **kwargs) -> None:
+    bump_lot_version(instance.pk)
+    stats.adjust_lot_counts({instance.owner_id: -1})
+    stats.bump(
+        num_lots=-1,
+        num_active_lots=-int(instance.is_active),
+        price_sum=-(instance.current_price or 0),
+    )
+
+
+@receiver(post_save, sender=Bid)
+def bid_saved(sender, instance, created, **kwargs) -> None:
+    bump_lot_version(instance.lot_id)
+    if created:
+        stats.bump(num_bids=1)
+        transaction.on_commit(tasks.schedule_dashboard_refresh, robust=True)
+
+
+def apply_bid_deletes(count: int, lot_ids: set[int]) -> None:
+    caching.bump_lot_versions(lot_ids)
+    stats.apply_deltas(num_bids=-count)
+    # lots deleted along with their bids no longer match
+    stats.backfill_lot_counters(Lot.objects.filter(pk__in=lot_ids))
+
+
+@receiver(post_delete, sender=Bid)
+def bid_deleted(sender, instance, origin=None, **kwargs) -> None:
+    # a delete that cascades to many bids sends post_delete once per bid with
+    # the same origin, so the bids are tallied there and applied once on
+    # commit; each lot's version is bumped the first time one of its bids goes
+    deleted = getattr(origin, "_deleted_bids", None)
+    if deleted is None:
+        deleted = {"count": 0, "lot_ids": set()}
+        if origin is not None:
+            origin._deleted_bids = deleted
+        transaction.on_commit(
+            lambda: apply_bid_deletes(**deleted), robust=True
+        )
+    deleted["count"] += 1
+    if instance.lot_id not in deleted["lot_ids"]:
+        deleted["lot_ids"].add(instance.lot_id)
+        caching.bump_lot_versions([instance.lot_id])
+
+
+@receiver(pre_migrate)
+def search_triggers_dropped(sender, using, plan=None, **kwargs) -> None:
+    connection = connections[using]
+    if sender.name == "tendering" and plan and connection.vendor == "sqlite":
+        search.drop_sqlite_fts_triggers(connection)
+
+
+@receiver(post_migrate)
+def search_index_installed(sender, using, **kwargs) -> None:
+    connection = connections[using]
+    if sender.name == "tendering" and connection.vendor == "sqlite":
+        search.install_sqlite_fts(connection)
@@ -0,0 +1,155 @@
+import asyncio
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tendering.models import AuctionStatistics, Bid, Category, Lot, User
+
+STATISTICS_PK = 1
+
+
+def rebuild_statistics() -> AuctionStatistics:
+    statistics, _ = AuctionStatistics.objects.update_or_create(
+        pk=STATISTICS_PK,
+        defaults={
+            "num_categories": Category.objects.count(),
+            "num_users": User.objects.count(),
+            "num_lots": Lot.objects.count(),
+            "num_active_lots": Lot.objects.filter(is_active=True).count(),
+            "num_bids": Bid.objects.count(),
+            "price_sum": Lot.objects.aggregate(
+                total=Sum("current_price")
+            )["total"] or 0,
+        },
+    )
+    return statistics
+
+
+def get_statistics() -> AuctionStatistics:
+    try:
+        return AuctionStatistics.objects.get(pk=STATISTICS_PK)
+    except AuctionStatistics.DoesNotExist:
+        return rebuild_statistics()
+
+
+async def arebuild_statistics() -> AuctionStatistics:
+    (
+        num_categories,
+        num_users,
+        num_lots,
+        num_active_lots,
+        num_bids,
+        price_sum,
+    ) = await asyncio.gather(
+        Category.objects.acount(),
+        User.objects.acount(),
+        Lot.objects.acount(),
+        Lot.objects.filter(is_active=True).acount(),
+        Bid.objects.acount(),
+        Lot.objects.aaggregate(total=Sum("current_price")),
+    )
+    statistics, _ = await AuctionStatistics.objects.aupdate_or_create(
+        pk=STATISTICS_PK,
+        defaults={
+            "num_categories": num_categories,
+            "num_users": num_users,
+            "num_lots": num_lots,
+            "num_active_lots": num_active_lots,
+            "num_bids": num_bids,
+            "price_sum": price_sum["total"] or 0,
+        },
+    )
+    return statistics
+
+
+async def aget_statistics() -> AuctionStatistics:
+    try:
+        return await AuctionStatistics.objects.aget(pk=STATISTICS_PK)
+    except AuctionStatistics.DoesNotExist:
+        return await arebuild_statistics()
+
+
+def apply_deltas(**deltas) -> None:
+    changes = {
+        field: F(field) + delta for field, delta in deltas.items() if delta
+    }
+    if not changes:
+        return
+    updated = AuctionStatistics.objects.filter(pk=STATISTICS_PK).update(
+        updated_at=timezone.now(), **changes
+    )
+    if not updated:
+        rebuild_statistics()
+
+
+def bump(**deltas) -> None:
+    transaction.on_commit(lambda: apply_deltas(**deltas), robust=True)
+
+
+def backfill_lot_counters(lots: QuerySet | None = None) -> int:
+    if lots is None:
+        lots = Lot.objects.all()
+    lot_bids = Bid.objects.filter(lot=OuterRef("pk")).order_by()
+    return lots.update(
+        bid_count=Coalesce(
+            Subquery(
+                lot_bids.values("lot").annotate(total=Count("pk")).values("total")
+            ),
+            0,
+        ),
+        distinct_bidder_count=Coalesce(
+            Subquery(
+                lot_bids.values("lot")
+                .annotate(total=Count("user", distinct=True))
+                .values("total")
+            ),
+            0,
+        ),
+        top_bid=Subquery(
+            lot_bids.order_by("-amount", "created_time").values("pk")[:1]
+        ),
+    )
+
+
+def backfill_user_lot_counts(users: QuerySet | None = None) -> int:
+    if users is None:
+        users = User.objects.all()
+    return users.update(
+        lot_count=Coalesce(
+            Subquery(
+                Lot.objects.filter(owner=OuterRef("pk"))
+                .order_by()
+                .values("owner")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+    )
+
+
+def adjust_lot_counts(deltas: dict[int, int]) -> None:
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    User.objects.filter(pk__in=deltas).update(
+        lot_count=F("lot_count") + Case(
+            *(
+                When(pk=user_id, then=Value(delta))
+                for user_id, delta in deltas.items()
+            ),
+            default=Value(0),
+        )
+    )
@@ -1,16 +1,142 @@
+import logging
+from datetime import datetime, timedelta
+
+import redis
 from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from kombu.exceptions import OperationalError
 
+from tendering import dashboard, images, settlement, stats
 from tendering.models import Lot
+from tendering.redis_client import get_client, mark_unavailable
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_REFRESH_LOCK = "dashboard:index:refreshing"
+
+
+@shared_task
+def close_expired_lots() -> int:
+    return settlement.close_expired_lots()
+
+
+@shared_task
+def rebuild_statistics() -> None:
+    stats.rebuild_statistics()
 
 
 @shared_task
-def close_expired_lots():
-    now = timezone.now()
-    expired_lots = Lot.objects.filter(is_active=True, end_date__lte=now)
-    for lot in expired_lots:
-        lot.is_active = False
-        highest_bid = lot.bids.order_by("-amount").first()
-        if highest_bid:
-            lot.owner = highest_bid.user
-        lot.save()
+def refresh_dashboard() -> None:
+    dashboard.refresh_dashboard()
+
+
+@shared_task
+def process_image_upload(model: str, pk: int, field_name: str) -> bool:
+    instance = apps.get_model(model).objects.filter(pk=pk).first()
+    if instance is None:
+        return False
+    return images.process_upload(instance, field_name)
+
+
+def settlement_eta(end_date: datetime) -> datetime:
+    # Redis redelivers a task a worker holds past the broker's visibility
+    # timeout, and one waiting for its ETA counts as held, so lots ending
+    # further out are reached in hops
+    return min(
+        end_date,
+        timezone.now() + timedelta(seconds=settings.SETTLEMENT_ETA_LIMIT),
+    )
+
+
+@shared_task(bind=True, max_retries=None)
+def settle_lot(self, lot_id: int, end_date: str) -> bool:
+    end_date = parse_datetime(end_date)
+    if settlement.close_lot(lot_id, end_date):
+        return True
+    is_early = end_date > timezone.now() and Lot.objects.filter(
+        pk=lot_id, is_active=True, end_date=end_date
+    ).exists()
+    if is_early:
+        raise self.retry(eta=settlement_eta(end_date))
+    return False
+
+
+def schedule_lot_settlement(lot: Lot) -> None:
+    def enqueue() -> None:
+        try:
+            settle_lot.apply_async(
+                args=[lot.pk, lot.end_date.isoformat()],
+                eta=settlement_eta(lot.end_date),
+            )
+        except OperationalError:
+            logger.warning(
+                "Could not schedule settlement of lot %s, "
+                "leaving it to the periodic sweep",
+                lot.pk,
+            )
+
+    transaction.on_commit(enqueue)
+
+
+def broker_available() -> bool:
+    # the broker is this Redis; publishing to a dead one blocks for
+    # seconds, so probe it with the short client timeout first
+    client = get_client()
+    if client is None:
+        return False
+    try:
+        return client.ping()
+    except redis.RedisError as error:
+        mark_unavailable(error)
+        return False
+
+
+def schedule_dashboard_refresh() -> None:
+    if not cache.add(
+        DASHBOARD_REFRESH_LOCK, True, settings.DASHBOARD_REFRESH_DEBOUNCE
+    ):
+        return
+    if not broker_available():
+        return
+    try:
+        refresh_dashboard.apply_async(retry=False)
+    except OperationalError:
+        logger.warning(
+            "Could not schedule a dashboard refresh, "
+            "leaving it to the periodic refresh"
+        )
+
+
+def schedule_image_processing(instance: Model, field_name: str) -> None:
+    if not images.needs_processing(instance, field_name):
+        return
+    model = instance._meta.label_lower
+
+    def enqueue() -> None:
+        if not broker_available():
+            logger.warning(
+                "Broker unavailable, %s %s keeps serving its original %s",
+                model,
+                instance.pk,
+                field_name,
+            )
+            return
+        try:
+            process_image_upload.apply_async(
+                args=[model, instance.pk, field_name], retry=False
+            )
+        except OperationalError:
+            logger.warning(
+                "Could not schedule processing of %s %s %s",
+                field_name,
+                model,
+                instance.pk,
+            )
+
+    transaction.on_commit(enqueue)
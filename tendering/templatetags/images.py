@@ -0,0 +1,37 @@
+from django import template
+from django.db.models.fields.files import FieldFile
+
+from tendering.images import variants_field
+
+register = template.Library()
+
+
+def variant(image: FieldFile, name: str) -> str | None:
+    variants = getattr(image.instance, variants_field(image.field.name), None)
+    if not variants or variants.get("source") != image.name or name not in variants:
+        return None
+    return image.storage.url(variants[name])
+
+
+@register.filter
+def variant_url(image: FieldFile, name: str) -> str:
+    if not image:
+        return ""
+    return variant(image, name) or image.url
+
+
+@register.inclusion_tag("includes/picture.html")
+def picture(
+        image: FieldFile,
+        name: str,
+        css_class: str = "",
+        alt: str = "",
+        style: str = "",
+) -> dict:
+    return {
+        "src": variant_url(image, name),
+        "webp": variant(image, f"{name}_webp") if image else None,
+        "css_class": css_class,
+        "alt": alt,
+        "style": style,
+    }
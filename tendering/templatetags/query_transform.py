@@ -2,13 +2,25 @@ from django import template
 
 register = template.Library()
 
+PAGINATION_PARAMS = ("page", "cursor")
+
 
 @register.simple_tag
 def query_transform(request, **kwargs):
     updated = request.GET.copy()
+    if any(k not in PAGINATION_PARAMS for k in kwargs):
+        for k in PAGINATION_PARAMS:
+            updated.pop(k, 0)
     for k, v in kwargs.items():
         if v is not None:
             updated[k] = v
         else:
             updated.pop(k, 0)
     return updated.urlencode()
+
+
+@register.simple_tag
+def page_query(request, param, number):
+    updated = request.GET.copy()
+    updated[param] = number
+    return updated.urlencode()
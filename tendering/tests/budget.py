@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    @contextmanager
+    def assertQueryBudget(self, queries: int, rows: int):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        executed = [query["sql"] for query in context.captured_queries]
+        self.assertEqual(
+            len(executed),
+            queries,
+            "\n".join(executed),
+        )
+        self.assertEqual(self.count_rows(executed), rows, "\n".join(executed))
+
+    def count_rows(self, statements: list[str]) -> int:
+        total = 0
+        with connection.cursor() as cursor:
+            for sql in statements:
+                if sql.lstrip().upper().startswith("SELECT"):
+                    cursor.execute(sql)
+                    total += len(cursor.fetchall())
+        return total
@@ -0,0 +1,173 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import include, path, reverse
+from django.utils import timezone
+
+from tendering import stats
+from tendering.bidding import LOW_BID_MESSAGE, BidRejected, place_bid
+from tendering.middleware import RequestMetricsMiddleware
+from tendering.models import Category, Lot
+from tendering.pagination import encode_cursor
+
+urlpatterns = [
+    path("admin/", admin.site.urls),
+    path("", include("tendering.async_urls", namespace="tendering")),
+    path("admin-soft/", include("admin_soft.urls")),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username="async_user", password="test_password"
+        )
+        self.bidder = User.objects.create_user(
+            username="async_bidder", password="test_password"
+        )
+        category = Category.objects.create(name="async")
+        self.lots = [
+            Lot.objects.create(
+                name=f"async_lot_{i}",
+                description="description",
+                category=category,
+                end_date=timezone.now() + timedelta(days=1, minutes=i),
+                start_price=10,
+                owner=self.user,
+            )
+            for i in range(7)
+        ]
+        place_bid(self.lots[0].pk, self.bidder, Decimal(20))
+
+    async def get(self, name: str, *args, **params):
+        await self.async_client.aforce_login(self.user)
+        return await self.async_client.get(reverse(name, args=args), params)
+
+    @sync_to_async
+    def sync_get(self, name: str, *args, **params):
+        self.client.force_login(self.user)
+        with self.settings(ROOT_URLCONF="Auction.urls"):
+            return self.client.get(reverse(name, args=args), params)
+
+    async def test_index_fills_a_cold_dashboard(self):
+        response = await self.async_client.get(reverse("tendering:index"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["num_bids"], 1)
+        self.assertEqual(response.context["bids"][0]["bid_lot"], "async_lot_0")
+
+    async def test_active_list_matches_sync_view(self):
+        response = await self.get("tendering:lot-list-active", page=2)
+        expected = await self.sync_get(
+            "tendering:lot-list-active", page=2
+        )
+        self.assertEqual(
+            [lot.pk for lot in response.context["active_lot_list"]],
+            [lot.pk for lot in expected.context["active_lot_list"]],
+        )
+        self.assertEqual(response.context["paginator"].count, 7)
+        self.assertEqual(
+            response.context["facets"], expected.context["facets"]
+        )
+        self.assertContains(response, "2 of 2")
+
+    @override_settings(LISTING_PAGINATION="cursor")
+    async def test_active_list_cursor_pages(self):
+        response = await self.get("tendering:lot-list-active")
+        page = response.context["page_obj"]
+        self.assertEqual(len(page), 5)
+        self.assertEqual(page.count, 7)
+        response = await self.get(
+            "tendering:lot-list-active", cursor=page.next_cursor
+        )
+        self.assertEqual(len(response.context["page_obj"]), 2)
+        response = await self.get("tendering:lot-list-active", cursor="bad")
+        self.assertEqual(response.status_code, 404)
+        response = await self.get(
+            "tendering:lot-list-active", cursor=encode_cursor(["x", "y"])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_invalid_page_is_not_found(self):
+        response = await self.get("tendering:lot-list-inactive", page=3)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_lists_require_login(self):
+        response = await self.async_client.get(
+            reverse("tendering:lot-list-active")
+        )
+        self.assertEqual(response.status_code, 302)
+
+    async def test_lot_detail(self):
+        response = await self.get("tendering:lot-detail", self.lots[0].pk)
+        self.assertEqual(response.context["lot"], self.lots[0])
+        self.assertEqual(len(response.context["bids"]), 1)
+        self.assertEqual(response.context["price"]["bid_count"], 1)
+        response = await self.get("tendering:lot-detail", 0)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_bid_api(self):
+        url = reverse("tendering:bid-create-api", args=[self.lots[1].pk])
+        response = await self.async_client.post(url, {"amount": 15})
+        self.assertEqual(response.status_code, 403)
+        await self.async_client.aforce_login(self.bidder)
+        response = await self.async_client.post(url, {"amount": 15})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Decimal(response.json()["current_price"]), 15)
+        response = await self.async_client.post(url, {"amount": 12})
+        self.assertEqual(response.status_code, 409)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 405)
+
+    async def test_bid_api_rejection_reports_the_price_that_won(self):
+        def outbid(lot_id, user, amount):
+            place_bid(lot_id, self.user, Decimal(30))
+            raise BidRejected(LOW_BID_MESSAGE)
+
+        await self.async_client.aforce_login(self.bidder)
+        with mock.patch("tendering.async_views.place_bid", side_effect=outbid):
+            response = await self.async_client.post(
+                reverse("tendering:bid-create-api", args=[self.lots[1].pk]),
+                {"amount": 15},
+            )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["current_price"], "30.00")
+
+    @override_settings(
+        MIDDLEWARE=[
+            middleware
+            for middleware in settings.MIDDLEWARE
+            if middleware != "whitenoise.middleware.WhiteNoiseMiddleware"
+        ]
+    )
+    async def test_metrics_are_recorded_without_a_sync_middleware(self):
+        response = await self.get("tendering:lot-list-active")
+        self.assertRegex(
+            response["Server-Timing"], r'db;dur=[\d.]+;desc="[1-9]\d* queries"'
+        )
+
+    def test_metrics_middleware_is_async_capable(self):
+        async def view(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(RequestMetricsMiddleware(view)))
+        self.assertFalse(
+            iscoroutinefunction(RequestMetricsMiddleware(lambda request: None))
+        )
+
+    async def test_statistics_rebuild(self):
+        statistics = await stats.arebuild_statistics()
+        self.assertEqual(
+            (statistics.num_lots, statistics.num_bids, statistics.num_users),
+            (7, 1, 2),
+        )
@@ -0,0 +1,298 @@
+import os
+import random
+import sys
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering import stats
+from tendering.bidding import (
+    BidRejected,
+    LOT_BUSY_MESSAGE,
+    LOT_EXPIRED_MESSAGE,
+    LOW_BID_MESSAGE,
+    place_bid,
+)
+from tendering.models import Bid, Category, Lot
+
+# bids/sec the hot lot stress test must sustain; machine dependent, so it
+# is only checked when set, e.g. HOT_LOT_BID_RATE_FLOOR=100
+BID_RATE_FLOOR = float(os.environ.get("HOT_LOT_BID_RATE_FLOOR", 0))
+
+
+class PlaceBidTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="bidding_user", password="test_password"
+        )
+        self.lot = Lot.objects.create(
+            name="bidding_lot",
+            description="description",
+            category=Category.objects.create(name="bidding"),
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+
+    def test_accepted_bid_moves_current_price(self):
+        bid = place_bid(self.lot.id, self.user, Decimal(15))
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.current_price, Decimal(15))
+        self.assertEqual(bid.lot_id, self.lot.id)
+
+    def test_bid_must_beat_start_price(self):
+        with self.assertRaisesMessage(BidRejected, LOW_BID_MESSAGE):
+            place_bid(self.lot.id, self.user, Decimal(10))
+        self.assertFalse(Bid.objects.exists())
+
+    def test_lower_bid_never_overwrites_current_price(self):
+        place_bid(self.lot.id, self.user, Decimal(30))
+        with self.assertRaisesMessage(BidRejected, LOW_BID_MESSAGE):
+            place_bid(self.lot.id, self.user, Decimal(20))
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.current_price, Decimal(30))
+
+    def test_expired_lot_rejects_bids(self):
+        Lot.objects.filter(pk=self.lot.pk).update(
+            end_date=timezone.now() - timedelta(seconds=1)
+        )
+        with self.assertRaisesMessage(BidRejected, LOT_EXPIRED_MESSAGE):
+            place_bid(self.lot.id, self.user, Decimal(50))
+
+    @mock.patch(
+        "tendering.views.place_bid",
+        side_effect=BidRejected(LOW_BID_MESSAGE),
+    )
+    def test_view_reports_rejection(self, place_bid_mock):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("tendering:bid-create", args=[self.lot.id]),
+            data={"amount": 20, "lot_id": self.lot.id},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(
+            response.context["bid_form"], "amount", LOW_BID_MESSAGE
+        )
+
+
+class HotLotStressTests(TransactionTestCase):
+    threads = 8
+    bids_per_thread = 50
+
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(
+                username=f"stress_user_{i}", password="test_password"
+            )
+            for i in range(self.threads)
+        ]
+        self.lot = Lot.objects.create(
+            name="hot_lot",
+            description="description",
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=1,
+            owner=self.users[0],
+        )
+
+    def bid_storm(self, user, accepted: list, busy: list, errors: list) -> None:
+        rng = random.Random(user.pk)
+        try:
+            for _ in range(self.bids_per_thread):
+                amount = Decimal(rng.randint(2, 100000))
+                try:
+                    place_bid(self.lot.id, user, amount)
+                except BidRejected as rejection:
+                    # a busy lot is lock contention, not a bid that was low
+                    if str(rejection) == LOT_BUSY_MESSAGE:
+                        busy.append(amount)
+                    continue
+                accepted.append(amount)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    def test_no_lost_updates_on_hot_lot(self):
+        accepted = []
+        busy = []
+        errors = []
+        workers = [
+            threading.Thread(
+                target=self.bid_storm, args=(user, accepted, busy, errors)
+            )
+            for user in self.users
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        attempts = self.threads * self.bids_per_thread
+        rate = attempts / elapsed
+        sys.stderr.write(
+            f"\nhot lot: {attempts} bids in {elapsed:.2f}s ({rate:.0f} bids/s), "
+            f"{len(accepted)} accepted, {len(busy)} busy\n"
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(busy, [])
+        self.assertTrue(accepted)
+        if BID_RATE_FLOOR:
+            self.assertGreater(rate, BID_RATE_FLOOR)
+        self.lot.refresh_from_db()
+        amounts = list(
+            Bid.objects.filter(lot=self.lot)
+            .order_by("id")
+            .values_list("amount", flat=True)
+        )
+        self.assertEqual(sorted(amounts), sorted(accepted))
+        self.assertEqual(amounts, sorted(amounts))
+        self.assertEqual(len(set(amounts)), len(amounts))
+        self.assertEqual(self.lot.current_price, max(amounts))
+
+
+class BidEndpointTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="endpoint_user", password="test_password"
+        )
+        self.lot = Lot.objects.create(
+            name="endpoint_lot",
+            description="description",
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+        self.api_url = reverse("tendering:bid-create-api", args=[self.lot.id])
+        self.client.force_login(self.user)
+
+    def test_bid_post_loads_lot_once(self):
+        url = reverse("tendering:bid-create", args=[self.lot.id])
+        with self.assertNumQueries(9):
+            response = self.client.post(url, data={"amount": 15})
+        self.assertRedirects(
+            response,
+            reverse("tendering:lot-detail", args=[self.lot.id]),
+            fetch_redirect_response=False,
+        )
+
+    def test_api_accepts_bid(self):
+        response = self.client.post(self.api_url, data={"amount": 15})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.json(), {"accepted": True, "current_price": "15"}
+        )
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.current_price, Decimal(15))
+
+    def test_api_rejects_low_bid(self):
+        response = self.client.post(self.api_url, data={"amount": 5})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            response.json(),
+            {
+                "accepted": False,
+                "errors": [LOW_BID_MESSAGE],
+                "current_price": "10.00",
+            },
+        )
+
+    def test_api_rejection_reports_the_price_that_won(self):
+        rival = get_user_model().objects.create_user(
+            username="endpoint_rival", password="test_password"
+        )
+
+        def outbid(lot_id, user, amount):
+            place_bid(lot_id, rival, Decimal(30))
+            raise BidRejected(LOW_BID_MESSAGE)
+
+        with mock.patch("tendering.views.place_bid", side_effect=outbid):
+            response = self.client.post(self.api_url, data={"amount": 15})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["current_price"], "30.00")
+
+    def test_api_requires_login(self):
+        self.client.logout()
+        response = self.client.post(self.api_url, data={"amount": 15})
+        self.assertEqual(response.status_code, 403)
+
+
+class LotCounterTests(TestCase):
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(
+                username=f"counter_user_{i}", password="test_password"
+            )
+            for i in range(2)
+        ]
+        self.lot = Lot.objects.create(
+            name="counter_lot",
+            description="description",
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.users[0],
+        )
+
+    def test_bids_maintain_counters_and_top_bid(self):
+        place_bid(self.lot.id, self.users[0], Decimal(11))
+        place_bid(self.lot.id, self.users[1], Decimal(12))
+        top_bid = place_bid(self.lot.id, self.users[0], Decimal(13))
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.bid_count, 3)
+        self.assertEqual(self.lot.distinct_bidder_count, 2)
+        self.assertEqual(self.lot.top_bid, top_bid)
+        self.assertEqual(self.lot.get_highest_bidder(), self.users[0])
+        self.assertEqual(self.lot.get_highest_bid_amount(), Decimal(13))
+
+    def test_rejected_bid_leaves_counters(self):
+        place_bid(self.lot.id, self.users[0], Decimal(20))
+        with self.assertRaises(BidRejected):
+            place_bid(self.lot.id, self.users[1], Decimal(15))
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.bid_count, 1)
+        self.assertEqual(self.lot.distinct_bidder_count, 1)
+
+    def test_backfill_command_recounts(self):
+        Bid.objects.create(lot=self.lot, user=self.users[0], amount=11)
+        top_bid = Bid.objects.create(lot=self.lot, user=self.users[1], amount=14)
+        Bid.objects.create(lot=self.lot, user=self.users[1], amount=12)
+        call_command("backfill_lot_counters", stdout=StringIO())
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.bid_count, 3)
+        self.assertEqual(self.lot.distinct_bidder_count, 2)
+        self.assertEqual(self.lot.top_bid, top_bid)
+
+    def test_deleting_top_bid_recounts_lot(self):
+        place_bid(self.lot.id, self.users[0], Decimal(11))
+        top_bid = place_bid(self.lot.id, self.users[1], Decimal(12))
+        with self.captureOnCommitCallbacks(execute=True):
+            top_bid.delete()
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.bid_count, 1)
+        self.assertEqual(self.lot.distinct_bidder_count, 1)
+        self.assertEqual(self.lot.get_highest_bid_amount(), Decimal(11))
+
+    def test_cascaded_bid_deletes_recount_once(self):
+        for amount in (11, 12, 13):
+            place_bid(self.lot.id, self.users[amount % 2], Decimal(amount))
+        with mock.patch(
+            "tendering.stats.backfill_lot_counters",
+            wraps=stats.backfill_lot_counters,
+        ) as backfill:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.users[1].delete()
+        backfill.assert_called_once()
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.bid_count, 1)
+        self.assertEqual(self.lot.get_highest_bid_amount(), Decimal(12))
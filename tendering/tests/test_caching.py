@@ -0,0 +1,109 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering.caching import ResilientRedisCache, lot_versions
+from tendering.models import Bid, Category, Lot
+from tendering.settlement import close_expired_lots
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="cache_user", password="test_password"
+        )
+
+    def test_anonymous_index_is_cached(self):
+        self.client.get(reverse("tendering:index"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("tendering:index"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_authenticated_index_is_not_cached(self):
+        self.client.get(reverse("tendering:index"))
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("tendering:index"))
+        self.assertContains(response, reverse("tendering:logout"))
+
+    def test_anonymous_rules_are_cached(self):
+        self.client.get(reverse("tendering:rules"))
+        with mock.patch("tendering.views.TemplateResponse") as render:
+            response = self.client.get(reverse("tendering:rules"))
+        render.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+
+
+class LotCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="card_user", password="test_password"
+        )
+        self.lot = Lot.objects.create(
+            name="card_lot",
+            description="description",
+            category=Category.objects.create(name="cards"),
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+        self.client.force_login(self.user)
+
+    def get_list(self):
+        return self.client.get(reverse("tendering:lot-list-active"))
+
+    def test_row_is_served_from_cache_until_lot_changes(self):
+        self.assertContains(self.get_list(), "card_lot")
+        Lot.objects.filter(pk=self.lot.pk).update(name="renamed_lot")
+        self.assertContains(self.get_list(), "card_lot")
+        self.lot.name = "renamed_lot"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lot.save()
+        self.assertContains(self.get_list(), "renamed_lot")
+
+    def test_bid_bumps_lot_version(self):
+        version = lot_versions([self.lot.pk])[self.lot.pk]
+        with self.captureOnCommitCallbacks(execute=True):
+            Bid.objects.create(lot=self.lot, user=self.user, amount=20)
+        self.assertNotEqual(lot_versions([self.lot.pk])[self.lot.pk], version)
+
+    def test_settlement_bumps_lot_version(self):
+        version = lot_versions([self.lot.pk])[self.lot.pk]
+        Lot.objects.filter(pk=self.lot.pk).update(
+            end_date=timezone.now() - timedelta(minutes=1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            close_expired_lots()
+        self.assertNotEqual(lot_versions([self.lot.pk])[self.lot.pk], version)
+
+
+@mock.patch("tendering.caching.mark_unavailable")
+class ResilientRedisCacheTests(TestCase):
+    def setUp(self):
+        self.cache = ResilientRedisCache(
+            "redis://127.0.0.1:1/0",
+            {"OPTIONS": {"socket_connect_timeout": 0.1}},
+        )
+
+    @mock.patch("tendering.caching.is_unavailable", return_value=False)
+    def test_unreachable_redis_reads_as_miss(
+            self, is_unavailable, mark_unavailable
+    ):
+        self.assertEqual(self.cache.get("key", "default"), "default")
+        self.assertEqual(self.cache.get_many(["key"]), {})
+        self.assertFalse(self.cache.add("key", 1))
+        self.cache.set("key", 1)
+        mark_unavailable.assert_called()
+
+    def test_open_circuit_skips_redis(self, mark_unavailable):
+        with mock.patch(
+            "tendering.caching.is_unavailable", return_value=True
+        ):
+            self.assertIsNone(self.cache.get("key"))
+        mark_unavailable.assert_not_called()
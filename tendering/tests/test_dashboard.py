@@ -0,0 +1,102 @@
+from datetime import timedelta
+from unittest import mock
+
+import redis
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from kombu.exceptions import OperationalError
+
+from tendering import dashboard
+from tendering.models import Bid, Category, Lot
+from tendering.stats import rebuild_statistics
+
+
+@mock.patch("tendering.tasks.get_client")
+@mock.patch("tendering.tasks.refresh_dashboard.apply_async")
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="dashboard_user", password="test_password"
+        )
+        self.lot = Lot.objects.create(
+            name="dashboard_lot",
+            description="description",
+            category=Category.objects.create(name="dashboard"),
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+        Bid.objects.create(lot=self.lot, user=self.user, amount=20)
+        rebuild_statistics()
+
+    def get_stale_index(self):
+        with self.settings(DASHBOARD_REFRESH_INTERVAL=-1):
+            return self.client.get(reverse("tendering:index"))
+
+    def test_cold_cache_is_filled_inline(self, apply_async, get_client):
+        response = self.client.get(reverse("tendering:index"))
+        self.assertEqual(response.context["num_bids"], 1)
+        self.assertEqual(response.context["bids"][0]["bid_lot"], "dashboard_lot")
+        self.assertIsNotNone(cache.get(dashboard.DASHBOARD_KEY))
+        apply_async.assert_not_called()
+
+    def test_concurrent_cold_requests_fill_once(self, apply_async, get_client):
+        cache.add(dashboard.DASHBOARD_FILL_LOCK, True)
+        response = self.client.get(reverse("tendering:index"))
+        self.assertEqual(response.context["num_bids"], 1)
+        self.assertEqual(response.context["bids"], [])
+        self.assertIsNone(cache.get(dashboard.DASHBOARD_KEY))
+        apply_async.assert_not_called()
+
+    def test_refreshes_are_debounced(self, apply_async, get_client):
+        dashboard.refresh_dashboard()
+        self.get_stale_index()
+        self.get_stale_index()
+        apply_async.assert_called_once()
+
+    def test_fresh_dashboard_is_served_from_cache(self, apply_async, get_client):
+        dashboard.refresh_dashboard()
+        Bid.objects.create(lot=self.lot, user=self.user, amount=30)
+        with self.assertNumQueries(0):
+            context, is_stale = dashboard.get_dashboard()
+        self.assertFalse(is_stale)
+        self.assertEqual(len(context["bids"]), 1)
+        self.assertEqual(context["bids"][0]["bid_lot"], "dashboard_lot")
+        self.client.get(reverse("tendering:index"))
+        apply_async.assert_not_called()
+
+    def test_stale_dashboard_is_served_while_refreshing(
+            self, apply_async, get_client
+    ):
+        dashboard.refresh_dashboard()
+        Bid.objects.create(lot=self.lot, user=self.user, amount=30)
+        response = self.get_stale_index()
+        self.assertEqual(len(response.context["bids"]), 1)
+        apply_async.assert_called_once_with(retry=False)
+
+    def test_new_bid_schedules_refresh(self, apply_async, get_client):
+        with self.captureOnCommitCallbacks(execute=True):
+            Bid.objects.create(lot=self.lot, user=self.user, amount=30)
+        apply_async.assert_called_once_with(retry=False)
+
+    @mock.patch("tendering.tasks.mark_unavailable")
+    def test_refresh_is_skipped_when_redis_is_down(
+            self, mark_unavailable, apply_async, get_client
+    ):
+        dashboard.refresh_dashboard()
+        get_client.return_value.ping.side_effect = redis.ConnectionError
+        response = self.get_stale_index()
+        self.assertEqual(response.status_code, 200)
+        apply_async.assert_not_called()
+        mark_unavailable.assert_called_once()
+
+    def test_unreachable_broker_is_logged(self, apply_async, get_client):
+        dashboard.refresh_dashboard()
+        apply_async.side_effect = OperationalError("broker down")
+        with self.assertLogs("tendering.tasks", "WARNING"):
+            response = self.get_stale_index()
+        self.assertEqual(response.status_code, 200)
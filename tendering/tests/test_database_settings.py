@@ -0,0 +1,48 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from Auction.settings.database import postgres_database
+
+ENV = {
+    "POSTGRES_DB": "auction",
+    "POSTGRES_USER": "auction",
+    "POSTGRES_PASSWORD": "secret",
+    "POSTGRES_HOST": "db.internal",
+}
+
+
+class PostgresDatabaseTests(SimpleTestCase):
+    def test_persistent_connections_by_default(self):
+        database = postgres_database(ENV)
+        self.assertEqual(database["CONN_MAX_AGE"], 600)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertEqual(
+            database["OPTIONS"],
+            {"sslmode": "require", "options": "-c statement_timeout=30000"},
+        )
+
+    def test_pool_disables_persistent_connections(self):
+        database = postgres_database(
+            ENV | {"POSTGRES_POOL_MAX_SIZE": "20"}, default_mode="pool"
+        )
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual(
+            database["OPTIONS"]["pool"],
+            {"min_size": 2, "max_size": 20, "timeout": 10.0},
+        )
+        self.assertIn("statement_timeout", database["OPTIONS"]["options"])
+
+    def test_pgbouncer_sends_no_startup_options(self):
+        database = postgres_database(
+            ENV | {"POSTGRES_CONNECTIONS": "pgbouncer"}, default_mode="pool"
+        )
+        self.assertTrue(database["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertEqual(database["OPTIONS"], {"sslmode": "require"})
+
+    def test_statement_timeout_can_be_disabled(self):
+        database = postgres_database(ENV | {"POSTGRES_STATEMENT_TIMEOUT": "0"})
+        self.assertNotIn("options", database["OPTIONS"])
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            postgres_database(ENV | {"POSTGRES_CONNECTIONS": "bouncer"})
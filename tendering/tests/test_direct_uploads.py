@@ -0,0 +1,200 @@
+import importlib
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from tendering import urls
+from tendering.direct_uploads import S3DirectUpload
+from tendering.images import process_upload
+from tendering.models import Category, Lot
+
+
+def png() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), "green").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class DirectUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username="direct_user", password="test_password"
+        )
+        self.other = User.objects.create_user(
+            username="direct_other", password="test_password"
+        )
+        self.category = Category.objects.create(name="direct")
+        self.client.force_login(self.user)
+
+    def get_target(self) -> dict:
+        response = self.client.get(reverse("tendering:lot-create"))
+        return response.context["direct_upload"]
+
+    def upload(
+            self,
+            target: dict,
+            name: str = "photo.png",
+            content: bytes | None = None,
+            **fields,
+    ):
+        data = target["fields"] | {"Content-Type": "image/png"} | fields
+        data["file"] = SimpleUploadedFile(name, content or png())
+        return self.client.post(target["url"], data)
+
+    def create_lot(self, upload_key: str):
+        return self.client.post(
+            reverse("tendering:lot-create"),
+            {
+                "name": "direct_lot",
+                "description": "description",
+                "category": self.category.pk,
+                "end_date": timezone.now() + timedelta(days=1),
+                "start_price": 10,
+                "upload_key": upload_key,
+            },
+        )
+
+    def test_target_is_scoped_to_the_user(self):
+        target = self.get_target()
+        self.assertTrue(
+            target["prefix"].startswith(f"tenders/direct/{self.user.pk}/")
+        )
+        self.assertEqual(target["url"], reverse("tendering:direct-upload"))
+
+    @override_settings(
+        DIRECT_UPLOAD_BACKEND="tendering.direct_uploads.S3DirectUpload"
+    )
+    def test_local_receiver_is_only_routed_for_local_backend(self):
+        self.addCleanup(importlib.reload, urls)
+        names = [pattern.name for pattern in importlib.reload(urls).urlpatterns]
+        self.assertNotIn("direct-upload", names)
+        self.assertIn("lot-create", names)
+
+    @mock.patch("tendering.tasks.get_client")
+    @mock.patch("tendering.tasks.process_image_upload.apply_async")
+    def test_uploaded_key_is_recorded(self, apply_async, get_client):
+        target = self.get_target()
+        self.assertEqual(self.upload(target).status_code, 204)
+        key = target["prefix"] + "photo.png"
+        self.assertTrue(default_storage.exists(key))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.create_lot(key)
+        self.assertEqual(response.status_code, 302)
+        lot = Lot.objects.get(name="direct_lot")
+        self.assertEqual(lot.photo.name, key)
+        apply_async.assert_called_with(
+            args=["tendering.lot", lot.pk, "photo"], retry=False
+        )
+
+    def test_processing_moves_upload_out_of_staging(self):
+        target = self.get_target()
+        self.upload(target)
+        self.create_lot(target["prefix"] + "photo.png")
+        lot = Lot.objects.get(name="direct_lot")
+        self.assertTrue(process_upload(lot, "photo"))
+        self.assertNotIn("/direct/", lot.photo.name)
+        self.assertTrue(lot.photo.name.startswith("tenders/"))
+
+    def test_upload_requires_a_valid_policy(self):
+        target = self.get_target()
+        response = self.upload(target, policy="forged")
+        self.assertEqual(response.status_code, 403)
+        response = self.upload(target, key=target["prefix"] + "../escape.png")
+        self.assertEqual(response.status_code, 403)
+        with self.settings(DIRECT_UPLOAD_EXPIRES=-1):
+            self.assertEqual(self.upload(target).status_code, 403)
+
+    def test_missing_upload_is_rejected(self):
+        response = self.create_lot(self.get_target()["prefix"] + "photo.png")
+        self.assertContains(response, "The upload did not finish")
+
+    def test_key_of_another_user_is_rejected(self):
+        self.client.force_login(self.other)
+        target = self.get_target()
+        self.upload(target)
+        self.client.force_login(self.user)
+        response = self.create_lot(target["prefix"] + "photo.png")
+        self.assertContains(response, "Invalid upload.")
+        self.assertFalse(Lot.objects.filter(name="direct_lot").exists())
+
+    def test_unsupported_type_is_rejected(self):
+        target = self.get_target()
+        self.upload(target, name="photo.gif")
+        response = self.create_lot(target["prefix"] + "photo.gif")
+        self.assertContains(response, "Upload a JPEG, PNG or WebP image.")
+
+    def test_staged_bytes_must_be_an_image(self):
+        target = self.get_target()
+        self.upload(target, content=b"not an image")
+        response = self.create_lot(target["prefix"] + "photo.png")
+        self.assertContains(response, "Upload a valid image.")
+        self.assertFalse(Lot.objects.filter(name="direct_lot").exists())
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=1000)
+    def test_staged_image_pixels_are_capped(self):
+        target = self.get_target()
+        self.upload(target)
+        response = self.create_lot(target["prefix"] + "photo.png")
+        self.assertContains(response, "Image is too large.")
+
+    def test_key_is_recorded_once(self):
+        target = self.get_target()
+        self.upload(target)
+        key = target["prefix"] + "photo.png"
+        self.assertEqual(self.create_lot(key).status_code, 302)
+        response = self.create_lot(key)
+        self.assertContains(response, "Invalid upload.")
+        self.assertEqual(Lot.objects.filter(name="direct_lot").count(), 1)
+
+
+class S3DirectUploadTests(TestCase):
+    def setUp(self):
+        storage = mock.Mock(location="media", bucket_name="bucket")
+        patcher = mock.patch("tendering.direct_uploads.default_storage", storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = storage.connection.meta.client
+        self.backend = S3DirectUpload()
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=1000)
+    def test_presigned_post_is_bounded(self):
+        self.backend.target("tenders/direct/1/token/")
+        self.client.generate_presigned_post.assert_called_once_with(
+            "bucket",
+            "media/tenders/direct/1/token/${filename}",
+            Conditions=[
+                ["starts-with", "$key", "media/tenders/direct/1/token/"],
+                ["starts-with", "$Content-Type", "image/"],
+                ["content-length-range", 1, 1000],
+            ],
+            ExpiresIn=3600,
+        )
+
+    def test_head_reads_object_metadata(self):
+        self.client.head_object.return_value = {
+            "ContentLength": 10,
+            "ContentType": "image/png",
+        }
+        self.assertEqual(
+            self.backend.head("tenders/direct/1/token/photo.png"),
+            {"size": 10, "content_type": "image/png"},
+        )
+        self.client.head_object.assert_called_once_with(
+            Bucket="bucket", Key="media/tenders/direct/1/token/photo.png"
+        )
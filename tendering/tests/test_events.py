@@ -0,0 +1,86 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering import events
+from tendering.models import Lot
+
+
+class LotEventTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="events_user", password="test_password"
+        )
+        self.lot = Lot.objects.create(
+            name="live_lot",
+            description="description",
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+        self.url = reverse("tendering:lot-events", args=[self.lot.id])
+
+    def test_publish_sends_json_to_lot_channel(self):
+        client = mock.MagicMock()
+        with mock.patch.object(events, "get_client", return_value=client):
+            events.publish_lot_event(self.lot.id, {"type": "closed"})
+        client.pipeline.return_value.publish.assert_called_once_with(
+            f"lot:{self.lot.id}:events", json.dumps({"type": "closed"})
+        )
+
+    def test_stream_requires_login(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_stream_needs_asgi(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 501)
+
+    def assertLiveUpdates(self, expected: bool) -> None:
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("tendering:lot-detail", args=[self.lot.id])
+        )
+        self.assertEqual(response.context["live_updates"], expected)
+        (self.assertContains if expected else self.assertNotContains)(
+            response, "EventSource"
+        )
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_detail_page_listens_to_open_lots(self):
+        self.assertLiveUpdates(True)
+
+    @override_settings(ASYNC_VIEWS=False)
+    def test_detail_page_does_not_listen_without_async_views(self):
+        self.assertLiveUpdates(False)
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_detail_page_does_not_listen_to_closed_lots(self):
+        Lot.objects.filter(pk=self.lot.pk).update(
+            end_date=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertLiveUpdates(False)
+
+    async def test_asgi_stream_is_event_stream(self):
+        await self.async_client.aforce_login(self.user)
+        with mock.patch("tendering.views.lot_event_stream"):
+            response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+    @override_settings(REDIS_URL=None)
+    async def test_stream_forwards_dispatched_events(self):
+        stream = events.lot_event_stream(self.lot.id)
+        self.assertEqual(await anext(stream), "retry: 3000\n\n")
+        pending = anext(stream)
+        events.hub.dispatch(self.lot.id, '{"type": "closed"}')
+        events.hub.dispatch(self.lot.id + 1, '{"type": "other"}')
+        self.assertEqual(await pending, 'data: {"type": "closed"}\n\n')
+        await stream.aclose()
+        self.assertNotIn(self.lot.id, events.hub.subscribers)
@@ -53,8 +53,8 @@ class FormsTest(TestCase):
             "user": self.user.id,
             "amount": Decimal(1),
         }
-        form = BidForm(data=form_data)
-        invalid_form = BidForm(data=form_data_invalid)
+        form = BidForm(data=form_data, lot=self.lot)
+        invalid_form = BidForm(data=form_data_invalid, lot=self.lot)
         self.assertTrue(form.is_valid())
         self.assertFalse(invalid_form.full_clean())
 
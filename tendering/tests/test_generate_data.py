@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from django.test import TestCase
+from django.utils import timezone
+
+from tendering.models import AuctionStatistics, Bid, Comment, Lot, User
+
+
+class GenerateAuctionDataTests(TestCase):
+    def generate(self, **options):
+        out = StringIO()
+        call_command(
+            "generate_auction_data",
+            users=20,
+            categories=4,
+            lots=100,
+            bids=2000,
+            comments=300,
+            batch_size=150,
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_counts(self):
+        out = self.generate()
+        self.assertIn("Generated 20 user(s)", out)
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Lot.objects.count(), 100)
+        self.assertEqual(Bid.objects.count(), 2000)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertTrue(
+            User.objects.get(username="load_user_0").check_password("password")
+        )
+
+    def test_lots_are_consistent(self):
+        self.generate()
+        now = timezone.now()
+        self.assertFalse(Lot.objects.filter(is_active=True, end_date__lte=now))
+        self.assertFalse(
+            Bid.objects.filter(lot__is_active=True, user=F("lot__owner"))
+        )
+        self.assertFalse(Bid.objects.filter(created_time__gt=F("lot__end_date")))
+        self.assertFalse(Bid.objects.filter(created_time__lt=F("lot__start_date")))
+        for lot in Lot.objects.filter(bid_count__gt=0):
+            amounts = list(
+                lot.bids.order_by("created_time").values_list("amount", flat=True)
+            )
+            self.assertEqual(lot.bid_count, len(amounts))
+            self.assertEqual(amounts, sorted(amounts))
+            self.assertEqual(lot.current_price, amounts[-1])
+
+    def test_statistics(self):
+        self.generate()
+        statistics = AuctionStatistics.objects.get()
+        self.assertEqual(statistics.num_bids, 2000)
+        self.assertEqual(
+            statistics.num_active_lots, Lot.objects.filter(is_active=True).count()
+        )
+
+    def test_popularity_is_skewed(self):
+        self.generate(skew=1.5)
+        busiest = (
+            Bid.objects.values("lot").annotate(total=Count("pk"))
+            .order_by("-total").first()
+        )
+        self.assertGreater(busiest["total"], 2000 / 100 * 5)
+
+    def test_seed_is_reproducible(self):
+        self.generate(seed=7)
+        first = list(Bid.objects.order_by("pk").values_list("amount", flat=True))
+        Lot.objects.all().delete()
+        User.objects.all().delete()
+        self.generate(seed=7, prefix="again")
+        second = list(Bid.objects.order_by("pk").values_list("amount", flat=True))
+        self.assertEqual(first, second)
+
+    def test_counts_must_be_positive(self):
+        for option in ("--users", "--categories", "--lots", "--batch-size"):
+            with self.subTest(option), self.assertRaisesMessage(
+                CommandError, "must be at least 1"
+            ):
+                call_command("generate_auction_data", option, "0")
+        with self.assertRaisesMessage(CommandError, "must be at least 0"):
+            call_command("generate_auction_data", "--bids", "-1")
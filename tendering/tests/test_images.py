@@ -0,0 +1,119 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from tendering import images
+from tendering.models import Category, Lot
+
+
+def image_file(name: str = "photo.png", size=(1200, 800)) -> ContentFile:
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "PNG")
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = get_user_model().objects.create_user(
+            username="image_user", password="test_password"
+        )
+        self.lot = Lot.objects.create(
+            name="image_lot",
+            description="description",
+            category=Category.objects.create(name="images"),
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+            photo=image_file(),
+        )
+
+    def open_variant(self, name: str) -> Image.Image:
+        self.lot.refresh_from_db()
+        with default_storage.open(self.lot.photo_variants[name]) as file:
+            image = Image.open(file)
+            image.load()
+        return image
+
+    def render_picture(self, name: str) -> str:
+        self.lot.refresh_from_db()
+        return Template(
+            "{% load images %}{% picture lot.photo name %}"
+        ).render(Context({"lot": self.lot, "name": name}))
+
+    def test_generates_sized_variants(self):
+        self.assertTrue(images.generate_variants(self.lot, "photo"))
+        thumb = self.open_variant("thumb")
+        self.assertEqual((thumb.format, thumb.size), ("JPEG", (96, 96)))
+        card = self.open_variant("card_webp")
+        self.assertEqual((card.format, card.size), ("WEBP", (600, 400)))
+        self.assertEqual(self.lot.photo_variants["source"], self.lot.photo.name)
+        self.assertFalse(images.generate_variants(self.lot, "photo"))
+
+    def test_picture_serves_variants(self):
+        images.generate_variants(self.lot, "photo")
+        html = self.render_picture("thumb")
+        self.assertIn(self.lot.photo_variants["thumb_webp"], html)
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(self.lot.photo_variants["thumb"], html)
+
+    def test_picture_falls_back_to_original(self):
+        html = self.render_picture("thumb")
+        self.assertIn(self.lot.photo.url, html)
+        self.assertNotIn("<source", html)
+
+    def test_replaced_image_ignores_stale_variants(self):
+        images.generate_variants(self.lot, "photo")
+        old_variants = self.lot.photo_variants
+        self.lot.photo = image_file("replacement.png")
+        self.lot.save()
+        self.assertIn(self.lot.photo.url, self.render_picture("thumb"))
+        images.generate_variants(self.lot, "photo")
+        self.assertFalse(default_storage.exists(old_variants["thumb"]))
+        self.assertIn("replacement", self.lot.photo_variants["thumb"])
+
+    def test_lost_race_discards_rendered_files(self):
+        stale = Lot.objects.get(pk=self.lot.pk)
+        self.lot.photo = image_file("replacement.png")
+        self.lot.save()
+        self.assertFalse(images.generate_variants(stale, "photo"))
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.photo_variants, {})
+        self.assertFalse(
+            default_storage.exists(
+                images.variant_name(stale.photo.name, "thumb", "jpg")
+            )
+        )
+
+    @mock.patch("tendering.tasks.get_client")
+    @mock.patch("tendering.tasks.process_image_upload.apply_async")
+    def test_upload_schedules_variants(self, apply_async, get_client):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lot.photo = image_file("upload.png")
+            self.lot.save()
+        apply_async.assert_called_once_with(
+            args=["tendering.lot", self.lot.pk, "photo"], retry=False
+        )
+
+    @mock.patch("tendering.tasks.get_client", return_value=None)
+    @mock.patch("tendering.tasks.process_image_upload.apply_async")
+    def test_unavailable_broker_keeps_original(self, apply_async, get_client):
+        with self.assertLogs("tendering.tasks", "WARNING"):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.lot.photo = image_file("upload.png")
+                self.lot.save()
+        apply_async.assert_not_called()
@@ -0,0 +1,271 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering.models import Bid, Category, Lot
+from tendering.pagination import encode_cursor
+from tendering.stats import backfill_lot_counters
+from tendering.tests.budget import QueryBudgetMixin
+from tendering.templatetags.query_transform import query_transform
+
+ACTIVE_LOTS_URL = reverse("tendering:lot-list-active")
+INACTIVE_LOTS_URL = reverse("tendering:lot-list-inactive")
+USER_LIST_URL = reverse("tendering:user-list")
+
+
+class LotListingFilterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="listing_user", password="test_password"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username="listing_other", password="test_password"
+        )
+        self.client.force_login(self.user)
+        self.books = Category.objects.create(name="books")
+        self.toys = Category.objects.create(name="toys")
+
+    def create_lot(self, name, category=None, owner=None, **kwargs) -> Lot:
+        kwargs.setdefault("end_date", timezone.now() + timedelta(days=3))
+        kwargs.setdefault("start_price", 10)
+        return Lot.objects.create(
+            name=name,
+            description="description",
+            category=category or self.books,
+            owner=owner or self.user,
+            **kwargs,
+        )
+
+    def get_lots(self, url=ACTIVE_LOTS_URL, **params) -> list:
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return list(response.context["object_list"])
+
+    def test_filters(self):
+        novel = self.create_lot("Novel", start_price=5)
+        atlas = self.create_lot(
+            "Atlas", current_price=50, owner=self.other_user, bid_count=2
+        )
+        robot = self.create_lot(
+            "Robot",
+            category=self.toys,
+            end_date=timezone.now() + timedelta(minutes=30),
+        )
+
+        self.assertCountEqual(
+            self.get_lots(category=self.books.pk), [novel, atlas]
+        )
+        self.assertEqual(self.get_lots(owner="listing_other"), [atlas])
+        self.assertEqual(self.get_lots(has_bids="on"), [atlas])
+        self.assertEqual(self.get_lots(ending_within=1), [robot])
+        self.assertCountEqual(self.get_lots(min_price=10), [atlas, robot])
+        self.assertEqual(self.get_lots(min_price=10, max_price=20), [robot])
+
+    def test_sorts(self):
+        cheap = self.create_lot(
+            "Cheap", start_price=5, end_date=timezone.now() + timedelta(days=2)
+        )
+        pricey = self.create_lot("Pricey", start_price=5, current_price=90)
+        busy = self.create_lot(
+            "Busy",
+            start_price=20,
+            bid_count=4,
+            end_date=timezone.now() + timedelta(hours=1),
+        )
+
+        self.assertEqual(self.get_lots(sort="price"), [cheap, busy, pricey])
+        self.assertEqual(self.get_lots(sort="-price"), [pricey, busy, cheap])
+        self.assertEqual(self.get_lots(sort="ending"), [busy, cheap, pricey])
+        self.assertEqual(self.get_lots(sort="bids")[0], busy)
+
+    def test_facets_ignore_selected_category(self):
+        self.create_lot("Novel", bid_count=1)
+        self.create_lot("Atlas")
+        self.create_lot("Robot", category=self.toys)
+        self.create_lot("Old robot", category=self.toys, is_active=False)
+
+        response = self.client.get(ACTIVE_LOTS_URL, {"category": self.toys.pk})
+
+        facets = {
+            facet["category__name"]: (facet["lot_count"], facet["with_bids"])
+            for facet in response.context["facets"]
+        }
+        self.assertEqual(facets, {"books": (2, 1), "toys": (1, 0)})
+        self.assertEqual(len(response.context["active_lot_list"]), 1)
+
+    def test_invalid_filters_fall_back_to_unfiltered_list(self):
+        lot = self.create_lot("Novel")
+        self.assertEqual(self.get_lots(min_price="cheap"), [lot])
+
+    def test_inactive_list_has_no_ending_filter(self):
+        response = self.client.get(INACTIVE_LOTS_URL)
+        self.assertNotIn("ending_within", response.context["search_form"].fields)
+
+    def test_filtered_listing_query_budget(self):
+        params = {
+            "name": "lot",
+            "category": self.books.pk,
+            "min_price": 1,
+            "has_bids": "on",
+            "sort": "bids",
+        }
+        for i in range(3):
+            self.create_lot(f"lot {i}", bid_count=1)
+        with self.assertNumQueries(10):
+            self.client.get(ACTIVE_LOTS_URL, params)
+        for i in range(30):
+            self.create_lot(f"lot {i}", bid_count=1, category=self.toys)
+        with self.assertNumQueries(10):
+            self.client.get(ACTIVE_LOTS_URL, params)
+
+
+@override_settings(LISTING_PAGINATION="cursor", LISTING_COUNT_LIMIT=10)
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="cursor_user", password="test_password"
+        )
+        self.client.force_login(self.user)
+        self.category = Category.objects.create(name="cursor")
+        Lot.objects.bulk_create(
+            Lot(
+                name=f"lot {i}",
+                description="description",
+                category=self.category,
+                owner=self.user,
+                end_date=timezone.now() + timedelta(days=1),
+                start_price=i + 1,
+            )
+            for i in range(12)
+        )
+
+    def walk(self, url, **params) -> list:
+        seen = []
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNone(response.context["paginator"])
+            seen.extend(response.context["object_list"])
+            page = response.context["page_obj"]
+            if not page.has_next():
+                return seen
+            params["cursor"] = page.next_cursor
+
+    def test_walks_every_lot_once_in_order(self):
+        lots = self.walk(ACTIVE_LOTS_URL)
+        self.assertEqual(
+            lots, list(Lot.objects.order_by("-start_date", "-pk"))
+        )
+
+    def test_walks_sorted_lots(self):
+        lots = self.walk(ACTIVE_LOTS_URL, sort="-price")
+        self.assertEqual(
+            [lot.start_price for lot in lots], list(range(12, 0, -1))
+        )
+
+    def test_walks_users(self):
+        get_user_model().objects.bulk_create(
+            get_user_model()(username=f"user_{i:02}") for i in range(10)
+        )
+        users = self.walk(USER_LIST_URL)
+        self.assertEqual(
+            users, list(get_user_model().objects.order_by("username", "pk"))
+        )
+
+    def test_count_is_capped(self):
+        response = self.client.get(ACTIVE_LOTS_URL)
+        page = response.context["page_obj"]
+        self.assertEqual((page.count, page.count_is_exact), (10, False))
+        self.assertContains(response, "10+ results")
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        first = self.client.get(ACTIVE_LOTS_URL)
+        cursor = first.context["page_obj"].next_cursor
+        with self.assertNumQueries(9):
+            self.client.get(ACTIVE_LOTS_URL)
+        with self.assertNumQueries(9):
+            self.client.get(ACTIVE_LOTS_URL, {"cursor": cursor})
+
+    def test_search_falls_back_to_offset_pages(self):
+        response = self.client.get(ACTIVE_LOTS_URL, {"name": "lot"})
+        self.assertIsNotNone(response.context["paginator"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(ACTIVE_LOTS_URL, {"cursor": "nope"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_wrongly_typed_values(self):
+        response = self.client.get(
+            ACTIVE_LOTS_URL, {"cursor": encode_cursor(["x", "y"])}
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            ACTIVE_LOTS_URL,
+            {"sort": "price", "cursor": encode_cursor([{"a": 1}, 1])},
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class QueryTransformTests(TestCase):
+    def test_changing_filters_resets_position(self):
+        request = RequestFactory().get("/", {"name": "a", "cursor": "x"})
+        self.assertEqual(
+            query_transform(request, category=1), "name=a&category=1"
+        )
+        self.assertEqual(
+            query_transform(request, cursor="y"), "name=a&cursor=y"
+        )
+
+
+class ListingBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="budget_user", password="test_password"
+        )
+        self.client.force_login(self.user)
+        category = Category.objects.create(name="budget")
+        bidders = get_user_model().objects.bulk_create(
+            get_user_model()(username=f"bidder_{i}") for i in range(3)
+        )
+        for is_active in (True, False):
+            lots = Lot.objects.bulk_create(
+                Lot(
+                    name=f"lot {i}",
+                    description="description " * 50,
+                    category=category,
+                    owner=self.user,
+                    is_active=is_active,
+                    end_date=timezone.now() + timedelta(days=1),
+                    start_price=1,
+                )
+                for i in range(8)
+            )
+            Bid.objects.bulk_create(
+                Bid(lot=lot, user=bidder, amount=n + 2)
+                for lot in lots
+                for n, bidder in enumerate(bidders)
+            )
+        backfill_lot_counters()
+
+    def test_active_list(self):
+        # session, user, count, lots, facets, 2 x permissions, categories,
+        # prices; rows: one each for session and user, 5 lots, 1 facet,
+        # 1 category, 5 prices
+        with self.assertQueryBudget(queries=9, rows=15) as context:
+            self.client.get(ACTIVE_LOTS_URL)
+        lot_query = context.captured_queries[3]["sql"]
+        self.assertNotIn("description", lot_query)
+        self.assertNotIn("tendering_bid", lot_query)
+
+    def test_inactive_list(self):
+        with self.assertQueryBudget(queries=9, rows=15):
+            self.client.get(INACTIVE_LOTS_URL)
+
+    def test_user_list(self):
+        # session, user, count, 4 users, 2 x permissions
+        with self.assertQueryBudget(queries=6, rows=7) as context:
+            self.client.get(USER_LIST_URL)
+        self.assertNotIn("tendering_lot", context.captured_queries[3]["sql"])
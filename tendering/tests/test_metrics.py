@@ -0,0 +1,156 @@
+from datetime import timedelta
+from unittest import mock
+
+import fakeredis
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering import metrics
+from tendering.metrics import Registry, RequestMetrics, registry, sql_shape
+from tendering.middleware import RequestMetricsMiddleware
+from tendering.models import Category, Lot
+
+ACTIVE_LOTS_URL = reverse("tendering:lot-list-active")
+METRICS_URL = reverse("metrics")
+
+
+class SqlShapeTests(TestCase):
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            sql_shape("SELECT * FROM t WHERE id = 12 AND name = 'it''s'"),
+            "SELECT * FROM t WHERE id = %s AND name = %s",
+        )
+        self.assertEqual(
+            sql_shape("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+            sql_shape("SELECT * FROM t WHERE id IN (%s)"),
+        )
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="metrics_user", password="test_password"
+        )
+        self.client.force_login(self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get(ACTIVE_LOTS_URL)
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="7 queries"')
+        self.assertRegex(timing, r"tpl;dur=[\d.]+")
+        self.assertIn('cache;desc="0 hits, 0 misses"', timing)
+
+    def test_cache_misses_are_counted(self):
+        category = Category.objects.create(name="metrics")
+        Lot.objects.create(
+            name="lot",
+            description="description",
+            category=category,
+            owner=self.user,
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=1,
+        )
+        response = self.client.get(ACTIVE_LOTS_URL)
+        self.assertIn('cache;desc="0 hits, 1 misses"', response["Server-Timing"])
+
+    @override_settings(DEBUG=True)
+    def test_metrics_endpoint(self):
+        self.client.get(ACTIVE_LOTS_URL)
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn(
+            'auction_http_requests_total{view="tendering:lot-list-active",'
+            'method="GET",status="200"}',
+            body,
+        )
+        self.assertIn(
+            'auction_http_request_duration_seconds_bucket'
+            '{view="tendering:lot-list-active",le="+Inf"}',
+            body,
+        )
+        self.assertIn(
+            'auction_db_queries_total{view="tendering:lot-list-active"}', body
+        )
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_metrics_need_a_token_outside_debug(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+        response = self.client.get(
+            METRICS_URL, headers={"Authorization": "Bearer secret"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(REPEATED_QUERY_THRESHOLD=2)
+    def test_repeated_queries_are_logged(self):
+        def view(request):
+            for pk in range(3):
+                list(Lot.objects.filter(pk=pk))
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(view)
+        with self.assertLogs("tendering.middleware", "WARNING") as logs:
+            middleware(RequestFactory().get("/"))
+        self.assertIn("Possible N+1 in unresolved: 3 queries", logs.output[0])
+
+
+class RequestMetricsTests(TestCase):
+    def test_repeated_queries(self):
+        metrics = RequestMetrics()
+        metrics.shapes.update(["a"] * 3 + ["b"])
+        self.assertEqual(metrics.repeated_queries(2), [("a", 3)])
+
+    def test_histogram_is_cumulative(self):
+        metrics = RequestMetrics()
+        metrics.started -= 0.2
+        registry.observe("histogram-test", "GET", 200, metrics, 0)
+        body = registry.render()
+        self.assertIn(
+            'auction_http_request_duration_seconds_bucket'
+            '{view="histogram-test",le="0.1"} 0',
+            body,
+        )
+        self.assertIn(
+            'auction_http_request_duration_seconds_bucket'
+            '{view="histogram-test",le="0.25"} 1',
+            body,
+        )
+
+    def test_workers_share_counters_through_redis(self):
+        server = fakeredis.FakeServer()
+        workers = [Registry(), Registry()]
+        with mock.patch.object(
+            metrics,
+            "get_client",
+            side_effect=lambda: fakeredis.FakeRedis(
+                server=server, decode_responses=True
+            ),
+        ):
+            for worker in workers:
+                worker.observe("shared-test", "GET", 200, RequestMetrics(), 0)
+            body = workers[0].render()
+        self.assertNotIn("Redis unavailable", body)
+        self.assertIn(
+            'auction_http_requests_total{view="shared-test",'
+            'method="GET",status="200"} 2',
+            body,
+        )
+
+    def test_local_counters_without_redis(self):
+        worker = Registry()
+        with mock.patch.object(metrics, "get_client", return_value=None):
+            worker.observe("local-test", "GET", 200, RequestMetrics(), 0)
+            body = worker.render()
+        self.assertIn("Redis unavailable", body)
+        self.assertIn(
+            'auction_http_request_duration_seconds_count{view="local-test"} 1',
+            body,
+        )
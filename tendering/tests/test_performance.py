@@ -0,0 +1,196 @@
+import os
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, tag
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering.dashboard import refresh_dashboard
+from tendering.models import Bid, Category, Comment, Lot
+from tendering.stats import (
+    backfill_lot_counters,
+    backfill_user_lot_counts,
+    rebuild_statistics,
+)
+
+NUM_USERS = 1000
+NUM_CATEGORIES = 20
+NUM_LOTS = 3000
+BIDS_PER_LOT = 5
+COMMENTS_PER_LOT = 2
+HOT_LOT_BIDS = 500
+# generous per-request ceiling; scale it for slow machines with
+# PERFORMANCE_TIME_SCALE, or set it to 0 to skip the timing checks
+RESPONSE_TIME_CEILING = 1.0 * float(
+    os.environ.get("PERFORMANCE_TIME_SCALE", 1)
+)
+
+
+@tag("performance")
+class ViewBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(
+            username="perf_user", password="test_password"
+        )
+        users = User.objects.bulk_create(
+            User(username=f"perf_bidder_{i:04}") for i in range(NUM_USERS)
+        )
+        categories = Category.objects.bulk_create(
+            Category(name=f"category {i}") for i in range(NUM_CATEGORIES)
+        )
+        now = timezone.now()
+        lots = Lot.objects.bulk_create(
+            Lot(
+                name=f"lot {i}",
+                description="description " * 20,
+                category=categories[i % NUM_CATEGORIES],
+                owner=cls.user if i % 10 == 0 else users[i % NUM_USERS],
+                is_active=i % 2 == 0,
+                end_date=now + timedelta(days=1 if i % 2 == 0 else -1),
+                start_price=Decimal(10),
+            )
+            for i in range(NUM_LOTS)
+        )
+        cls.lot = lots[0]
+        Bid.objects.bulk_create(
+            Bid(
+                lot=lot,
+                user=cls.user if n == 0 else users[(i + n) % NUM_USERS],
+                amount=Decimal(11 + n),
+            )
+            for i, lot in enumerate(lots)
+            for n in range(BIDS_PER_LOT)
+        )
+        Bid.objects.bulk_create(
+            Bid(lot=cls.lot, user=users[n], amount=Decimal(100 + n))
+            for n in range(HOT_LOT_BIDS)
+        )
+        Comment.objects.bulk_create(
+            Comment(lot=lot, owner=users[(i + n) % NUM_USERS], text="comment")
+            for i, lot in enumerate(lots)
+            for n in range(COMMENTS_PER_LOT)
+        )
+        Lot.objects.filter(pk=cls.lot.pk).update(
+            current_price=Decimal(100 + HOT_LOT_BIDS)
+        )
+        backfill_lot_counters()
+        backfill_user_lot_counts()
+        rebuild_statistics()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assertBudget(self, url, queries, method="get", data=None, status=200):
+        started = time.perf_counter()
+        with self.assertNumQueries(queries):
+            response = getattr(self.client, method)(url, data)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(response.status_code, status)
+        if RESPONSE_TIME_CEILING:
+            self.assertLess(elapsed, RESPONSE_TIME_CEILING, url)
+        return response
+
+    def lot_url(self, name, lot=None):
+        return reverse(f"tendering:{name}", args=[(lot or self.lot).pk])
+
+    def user_url(self, name):
+        return reverse(f"tendering:{name}", args=[self.user.pk])
+
+    def test_index(self):
+        refresh_dashboard()
+        self.assertBudget(reverse("tendering:index"), 4)
+
+    def test_rules(self):
+        self.assertBudget(reverse("tendering:rules"), 4)
+
+    def test_active_lots(self):
+        self.assertBudget(reverse("tendering:lot-list-active"), 9)
+
+    def test_inactive_lots(self):
+        self.assertBudget(reverse("tendering:lot-list-inactive"), 9)
+
+    def test_filtered_lots(self):
+        self.assertBudget(
+            reverse("tendering:lot-list-active"),
+            9,
+            data={"name": "lot", "has_bids": "on", "sort": "bids", "page": 20},
+        )
+
+    def test_users(self):
+        self.assertBudget(reverse("tendering:user-list"), 6)
+
+    def test_user_detail(self):
+        self.assertBudget(self.user_url("user-detail"), 8)
+
+    def test_user_update(self):
+        self.assertBudget(self.user_url("user-update"), 5)
+
+    def test_user_delete(self):
+        self.assertBudget(self.user_url("user-delete"), 5)
+
+    def test_user_create(self):
+        self.assertBudget(reverse("tendering:user-create"), 4)
+
+    def test_lot_detail(self):
+        self.assertBudget(self.lot_url("lot-detail"), 8)
+
+    def test_lot_history(self):
+        self.assertBudget(self.lot_url("lot-bids"), 3)
+        self.assertBudget(self.lot_url("lot-comments"), 3)
+
+    def test_lot_create(self):
+        self.assertBudget(reverse("tendering:lot-create"), 5)
+
+    def test_lot_update(self):
+        self.assertBudget(self.lot_url("lot-update"), 5)
+
+    def test_lot_delete(self):
+        self.assertBudget(self.lot_url("lot-delete"), 6)
+
+    def test_comment(self):
+        self.assertBudget(
+            self.lot_url("comment-create"),
+            4,
+            method="post",
+            data={"text": "hello", "lot_id": self.lot.pk},
+            status=302,
+        )
+
+    def test_bid(self):
+        self.assertBudget(
+            self.lot_url("bid-create"),
+            9,
+            method="post",
+            data={"amount": 10000},
+            status=302,
+        )
+
+    def test_rejected_bid(self):
+        self.assertBudget(
+            self.lot_url("bid-create"),
+            7,
+            method="post",
+            data={"amount": 1},
+        )
+
+    def test_bid_api(self):
+        self.assertBudget(
+            self.lot_url("bid-create-api"),
+            9,
+            method="post",
+            data={"amount": 10000},
+            status=201,
+        )
+
+    def test_register(self):
+        self.client.logout()
+        self.assertBudget(reverse("tendering:register"), 0)
+
+    def test_login(self):
+        self.client.logout()
+        self.assertBudget(reverse("tendering:login"), 0)
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+import fakeredis
+import redis
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering import price_cache
+from tendering.bidding import place_bid
+from tendering.models import Bid, Lot
+from tendering.stats import backfill_lot_counters
+
+
+class LotPriceCacheTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="cache_user", password="test_password"
+        )
+        self.lot = Lot.objects.create(
+            name="cached_lot",
+            description="description",
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+        Bid.objects.create(lot=self.lot, user=self.user, amount=12)
+        Lot.objects.filter(pk=self.lot.pk).update(current_price=12)
+        backfill_lot_counters()
+        self.client_mock = mock.MagicMock()
+        self.pipeline = self.client_mock.pipeline.return_value
+
+    @override_settings(REDIS_URL=None)
+    def test_reads_database_without_cache(self):
+        self.assertEqual(
+            price_cache.get_lot_price(self.lot.id),
+            {
+                "current_price": Decimal(12),
+                "top_bidder": self.user.username,
+                "bid_count": 1,
+                "last_bid": Bid.objects.get(lot=self.lot).id,
+            },
+        )
+
+    def test_cache_hit_skips_database(self):
+        self.pipeline.execute.return_value = [
+            {"current_price": "40.00", "top_bidder": "other", "bid_count": "3"}
+        ]
+        with mock.patch.object(
+            price_cache, "get_client", return_value=self.client_mock
+        ):
+            with self.assertNumQueries(0):
+                price = price_cache.get_lot_price(self.lot.id)
+        self.assertEqual(price["current_price"], Decimal(40))
+        self.assertEqual(price["bid_count"], 3)
+
+    def test_falls_back_to_database_when_redis_is_down(self):
+        self.pipeline.execute.side_effect = redis.ConnectionError("down")
+        with mock.patch.object(
+            price_cache, "get_client", return_value=self.client_mock
+        ), mock.patch.object(price_cache, "mark_unavailable") as unavailable:
+            price = price_cache.get_lot_price(self.lot.id)
+        self.assertEqual(price["current_price"], Decimal(12))
+        unavailable.assert_called_once()
+
+    def test_detail_page_shows_cached_price(self):
+        self.client.force_login(self.user)
+        with mock.patch.object(
+            price_cache,
+            "get_lot_prices",
+            return_value={
+                self.lot.id: {
+                    "current_price": Decimal(55),
+                    "top_bidder": "leader",
+                    "bid_count": 4,
+                }
+            },
+        ):
+            response = self.client.get(
+                reverse("tendering:lot-detail", args=[self.lot.id])
+            )
+        self.assertContains(response, "Current price: 55.00")
+        self.assertContains(response, "Leading bidder: leader (4 bids)")
+
+
+class LotPriceScriptTests(TestCase):
+    # runs the Lua scripts against fakeredis' implementation of EVALSHA
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="script_user", password="test_password"
+        )
+        self.lot = Lot.objects.create(
+            name="script_lot",
+            description="description",
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        patcher = mock.patch.object(
+            price_cache, "get_client", return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cached(self) -> dict:
+        return self.redis.hgetall(price_cache.lot_key(self.lot.id))
+
+    def test_cache_miss_is_filled_from_database(self):
+        place_bid(self.lot.id, self.user, Decimal(12))
+        price = price_cache.get_lot_price(self.lot.id)
+        self.assertEqual(price["current_price"], Decimal(12))
+        self.assertEqual(self.cached()["bid_count"], "1")
+        with self.assertNumQueries(0):
+            self.assertEqual(price_cache.get_lot_price(self.lot.id), price)
+
+    def test_bids_after_fill_are_recorded(self):
+        price_cache.get_lot_price(self.lot.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(self.lot.id, self.user, Decimal(15))
+        self.assertEqual(self.cached()["current_price"], "15")
+        self.assertEqual(self.cached()["bid_count"], "1")
+
+    def test_bid_read_by_the_fill_is_not_counted_twice(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            place_bid(self.lot.id, self.user, Decimal(15))
+        # the fill reads the committed bid before its record arrives
+        price_cache.get_lot_price(self.lot.id)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.cached()["bid_count"], "1")
+        self.assertEqual(self.cached()["current_price"], "15.00")
+
+    def test_bid_on_uncached_lot_guards_the_next_fill(self):
+        stale = price_cache.load_lot_prices([self.lot.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(self.lot.id, self.user, Decimal(15))
+        # a fill that read the database before the bid must not be stored
+        price_cache.store_lot_prices(stale)
+        self.assertEqual(self.cached(), {})
+        self.assertTrue(
+            self.redis.exists(price_cache.fill_guard_key(self.lot.id))
+        )
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering.models import Bid, Category, Lot
+from tendering.settlement import close_expired_lots, close_lot
+from tendering.stats import backfill_user_lot_counts
+
+
+class LotCountTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(
+            username="count_owner", password="test_password"
+        )
+        self.bidder = User.objects.create_user(
+            username="count_bidder", password="test_password"
+        )
+        self.category = Category.objects.create(name="counts")
+
+    def create_lot(self, end_date=None) -> Lot:
+        return Lot.objects.create(
+            name="count_lot",
+            description="description",
+            category=self.category,
+            end_date=end_date or timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.owner,
+        )
+
+    def assertLotCounts(self, owner: int, bidder: int) -> None:
+        self.owner.refresh_from_db()
+        self.bidder.refresh_from_db()
+        self.assertEqual(self.owner.lot_count, owner)
+        self.assertEqual(self.bidder.lot_count, bidder)
+
+    def test_create_and_delete(self):
+        lot = self.create_lot()
+        self.create_lot()
+        self.assertLotCounts(2, 0)
+        lot.delete()
+        self.assertLotCounts(1, 0)
+
+    def test_owner_change(self):
+        lot = self.create_lot()
+        lot.owner = self.bidder
+        lot.save()
+        self.assertLotCounts(0, 1)
+
+    def test_settlement_transfers_lot(self):
+        lot = self.create_lot(timezone.now() - timedelta(minutes=1))
+        self.create_lot(timezone.now() - timedelta(minutes=1))
+        bid = Bid.objects.create(lot=lot, user=self.bidder, amount=20)
+        Lot.objects.filter(pk=lot.pk).update(top_bid=bid)
+        close_expired_lots()
+        self.assertLotCounts(1, 1)
+        close_expired_lots()
+        self.assertLotCounts(1, 1)
+
+    def test_single_lot_settlement_transfers_lot(self):
+        lot = self.create_lot(timezone.now() - timedelta(minutes=1))
+        bid = Bid.objects.create(lot=lot, user=self.bidder, amount=20)
+        Lot.objects.filter(pk=lot.pk).update(top_bid=bid)
+        self.assertTrue(close_lot(lot.pk))
+        self.assertFalse(close_lot(lot.pk))
+        self.assertLotCounts(0, 1)
+
+    def test_backfill(self):
+        self.create_lot()
+        get_user_model().objects.update(lot_count=5)
+        backfill_user_lot_counts()
+        self.assertLotCounts(1, 0)
+
+
+class ProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.owner = User.objects.create_user(
+            username="profile_owner", password="test_password"
+        )
+        self.bidder = User.objects.create_user(
+            username="profile_bidder", password="test_password"
+        )
+        category = Category.objects.create(name="profile")
+        self.lots = [
+            Lot.objects.create(
+                name=f"profile_lot_{i}",
+                description="description",
+                category=category,
+                end_date=timezone.now() + timedelta(days=1, minutes=i),
+                start_price=10,
+                owner=self.owner,
+            )
+            for i in range(10)
+        ]
+        self.client.force_login(self.bidder)
+
+    def get_profile(self, user, **params):
+        return self.client.get(
+            reverse("tendering:user-detail", args=[user.pk]), params
+        )
+
+    def test_my_lots_are_paginated(self):
+        response = self.get_profile(self.owner)
+        self.assertEqual(response.context["lots_num"], 10)
+        self.assertEqual(len(response.context["my_lots"]), 8)
+        response = self.get_profile(self.owner, lots_page=2)
+        self.assertEqual(len(response.context["my_lots"]), 2)
+        self.assertContains(response, "2 of 2")
+
+    def test_participating_lots_are_paginated(self):
+        for lot in self.lots:
+            Bid.objects.create(lot=lot, user=self.bidder, amount=20)
+        response = self.get_profile(self.bidder, bidding_page=2)
+        self.assertEqual(len(response.context["participating_lots"]), 5)
+        self.assertEqual(
+            response.context["participating_lots"][0].name, "profile_lot_5"
+        )
+
+    def test_leader_card_follows_top_bid(self):
+        lot = self.lots[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            bid = Bid.objects.create(lot=lot, user=self.bidder, amount=20)
+        Lot.objects.filter(pk=lot.pk).update(top_bid=bid)
+        self.assertContains(self.get_profile(self.bidder), "I am the leader now!")
+        with self.captureOnCommitCallbacks(execute=True):
+            bid = Bid.objects.create(lot=lot, user=self.owner, amount=30)
+        Lot.objects.filter(pk=lot.pk).update(top_bid=bid)
+        self.assertContains(
+            self.get_profile(self.bidder), "I am not the leader now."
+        )
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering.models import Category, Lot
+from tendering.search import search_lots
+
+
+class LotSearchTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="search_user", password="test_password"
+        )
+        self.category = Category.objects.create(name="instruments")
+        self.other_category = Category.objects.create(name="furniture")
+
+    def create_lot(self, name, description="", category=None) -> Lot:
+        return Lot.objects.create(
+            name=name,
+            description=description,
+            category=category or self.category,
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+
+    def search(self, query) -> list:
+        return list(search_lots(Lot.objects.all(), query))
+
+    def test_matches_name_description_and_category(self):
+        by_name = self.create_lot("Acoustic guitar", category=self.other_category)
+        by_description = self.create_lot(
+            "Old case", "fits any guitar", category=self.other_category
+        )
+        by_category = self.create_lot("Violin")
+        self.create_lot("Oak table", "solid wood", category=self.other_category)
+
+        self.assertCountEqual(self.search("guitar"), [by_name, by_description])
+        self.assertEqual(self.search("instruments"), [by_category])
+
+    def test_prefix_and_multiple_terms(self):
+        red_lamp = self.create_lot("Red lamp", "brass desk lamp")
+        self.create_lot("Blue lamp")
+
+        self.assertEqual(self.search("red lam"), [red_lamp])
+
+    def test_ranks_better_matches_first(self):
+        weak = self.create_lot("Camera bag", "leather strap for a camera")
+        strong = self.create_lot("Camera", "camera camera with camera lens")
+
+        self.assertEqual(self.search("camera"), [strong, weak])
+
+    def test_index_follows_updates_and_deletes(self):
+        lot = self.create_lot("Radio")
+        lot.name = "Record player"
+        lot.save()
+        self.assertEqual(self.search("radio"), [])
+        self.assertEqual(self.search("record"), [lot])
+
+        self.category.name = "audio"
+        self.category.save()
+        self.assertEqual(self.search("audio"), [lot])
+
+        lot.delete()
+        self.assertEqual(self.search("record"), [])
+
+    def test_blank_or_symbol_only_query_returns_everything(self):
+        self.create_lot("Radio")
+        self.assertEqual(len(self.search("  ")), 1)
+        self.assertEqual(len(self.search("***")), 1)
+
+    def test_list_view_uses_search(self):
+        self.client.force_login(self.user)
+        match = self.create_lot("Vintage radio", "works fine")
+        self.create_lot("Table")
+
+        response = self.client.get(
+            reverse("tendering:lot-list-active"), {"name": "vintage"}
+        )
+
+        self.assertEqual(list(response.context["active_lot_list"]), [match])
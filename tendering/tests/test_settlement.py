@@ -0,0 +1,250 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering.models import Lot, Category, Bid
+from tendering.settlement import close_expired_lots, close_lot
+from tendering.stats import backfill_lot_counters
+from tendering.tasks import schedule_lot_settlement, settle_lot
+
+ACTIVE_LOTS_URL = reverse("tendering:lot-list-active")
+
+
+class SettlementTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(
+            username="settlement_owner", password="test_password"
+        )
+        self.bidder = get_user_model().objects.create_user(
+            username="settlement_bidder", password="test_password"
+        )
+        self.category = Category.objects.create(name="settlement")
+
+    def create_lot(self, end_date, **kwargs) -> Lot:
+        lot = Lot.objects.create(
+            name=kwargs.pop("name", "settlement_lot"),
+            description="description",
+            category=self.category,
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.owner,
+            **kwargs,
+        )
+        Lot.objects.filter(pk=lot.pk).update(end_date=end_date)
+        lot.refresh_from_db()
+        return lot
+
+    def test_expired_lot_goes_to_highest_bidder(self):
+        lot = self.create_lot(timezone.now() - timedelta(minutes=1))
+        Bid.objects.create(lot=lot, user=self.owner, amount=11)
+        Bid.objects.create(lot=lot, user=self.bidder, amount=15)
+        backfill_lot_counters()
+        self.assertEqual(close_expired_lots(), 1)
+        lot.refresh_from_db()
+        self.assertFalse(lot.is_active)
+        self.assertEqual(lot.owner, self.bidder)
+
+    def test_expired_lot_without_bids_keeps_owner(self):
+        lot = self.create_lot(timezone.now() - timedelta(minutes=1))
+        close_expired_lots()
+        lot.refresh_from_db()
+        self.assertFalse(lot.is_active)
+        self.assertEqual(lot.owner, self.owner)
+
+    def test_running_lot_is_not_closed(self):
+        lot = self.create_lot(timezone.now() + timedelta(hours=1))
+        self.assertEqual(close_expired_lots(), 0)
+        lot.refresh_from_db()
+        self.assertTrue(lot.is_active)
+
+    def test_lots_are_settled_in_chunks(self):
+        lots = [
+            self.create_lot(
+                timezone.now() - timedelta(minutes=1), name=f"chunk{i}"
+            )
+            for i in range(5)
+        ]
+        Bid.objects.create(lot=lots[3], user=self.bidder, amount=20)
+        backfill_lot_counters()
+        self.assertEqual(close_expired_lots(chunk_size=2), 5)
+        self.assertFalse(Lot.objects.filter(is_active=True).exists())
+        self.assertEqual(
+            Lot.objects.filter(owner=self.bidder).get(), lots[3]
+        )
+
+    def test_settlement_query_count_does_not_grow_with_lots(self):
+        for i in range(20):
+            lot = self.create_lot(
+                timezone.now() - timedelta(minutes=1), name=f"bulk{i}"
+            )
+            Bid.objects.create(lot=lot, user=self.bidder, amount=20)
+        backfill_lot_counters()
+        with self.assertNumQueries(9):
+            close_expired_lots()
+
+    def test_management_command(self):
+        self.create_lot(timezone.now() - timedelta(minutes=1))
+        out = StringIO()
+        call_command("close_expired_lots", stdout=out)
+        self.assertIn("Closed 1 expired lot(s)", out.getvalue())
+        self.assertFalse(Lot.objects.filter(is_active=True).exists())
+
+    def test_active_list_does_not_settle(self):
+        self.client.force_login(self.owner)
+        expired = self.create_lot(
+            timezone.now() - timedelta(minutes=1), name="expired"
+        )
+        running = self.create_lot(
+            timezone.now() + timedelta(hours=1), name="running"
+        )
+        response = self.client.get(ACTIVE_LOTS_URL)
+        self.assertEqual(list(response.context["active_lot_list"]), [running])
+        expired.refresh_from_db()
+        self.assertTrue(expired.is_active)
+
+    def test_active_list_query_count_is_bounded(self):
+        self.client.force_login(self.owner)
+        for i in range(10):
+            self.create_lot(
+                timezone.now() - timedelta(minutes=1), name=f"expired{i}"
+            )
+        self.create_lot(timezone.now() + timedelta(hours=1))
+        with self.assertNumQueries(9):
+            self.client.get(ACTIVE_LOTS_URL)
+
+
+class LotSettlementSchedulingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="scheduling_owner", password="test_password"
+        )
+        self.category = Category.objects.create(name="scheduling")
+        self.client.force_login(self.user)
+
+    @mock.patch("tendering.tasks.settle_lot.apply_async")
+    def test_lot_create_schedules_settlement(self, apply_async):
+        end_date = timezone.now() + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("tendering:lot-create"),
+                data={
+                    "name": "scheduled",
+                    "description": "description",
+                    "category": self.category.id,
+                    "end_date": end_date,
+                    "start_price": 10,
+                },
+            )
+        lot = Lot.objects.get(name="scheduled")
+        apply_async.assert_called_once()
+        self.assertEqual(
+            apply_async.call_args.kwargs["args"],
+            [lot.pk, lot.end_date.isoformat()],
+        )
+        self.assertLessEqual(
+            apply_async.call_args.kwargs["eta"],
+            timezone.now() + timedelta(seconds=settings.SETTLEMENT_ETA_LIMIT),
+        )
+
+    @mock.patch("tendering.tasks.settle_lot.apply_async")
+    def test_lot_update_reschedules_only_on_end_date_change(self, apply_async):
+        end_date = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+        lot = Lot.objects.create(
+            name="rescheduled",
+            description="description",
+            category=self.category,
+            end_date=end_date,
+            start_price=10,
+            owner=self.user,
+        )
+        url = reverse("tendering:lot-update", args=[lot.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                url, data={"description": "new", "end_date": end_date}
+            )
+        apply_async.assert_not_called()
+        new_end_date = end_date + timedelta(hours=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                url, data={"description": "new", "end_date": new_end_date}
+            )
+        apply_async.assert_called_once()
+        self.assertEqual(
+            apply_async.call_args.kwargs["args"],
+            [lot.pk, new_end_date.isoformat()],
+        )
+
+    @override_settings(SETTLEMENT_ETA_LIMIT=24 * 60 * 60)
+    @mock.patch("tendering.tasks.settle_lot.apply_async")
+    def test_near_end_date_is_used_as_eta(self, apply_async):
+        lot = Lot.objects.create(
+            name="soon",
+            description="description",
+            category=self.category,
+            end_date=timezone.now() + timedelta(minutes=5),
+            start_price=10,
+            owner=self.user,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_lot_settlement(lot)
+        apply_async.assert_called_once_with(
+            args=[lot.pk, lot.end_date.isoformat()], eta=lot.end_date
+        )
+
+    def test_early_settlement_hops_towards_end_date(self):
+        lot = Lot.objects.create(
+            name="early",
+            description="description",
+            category=self.category,
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+        with mock.patch.object(
+            settle_lot, "retry", return_value=Retry()
+        ) as retry, self.assertRaises(Retry):
+            settle_lot.run(lot.pk, lot.end_date.isoformat())
+        eta = retry.call_args.kwargs["eta"]
+        self.assertLess(eta, lot.end_date)
+        self.assertLessEqual(
+            eta,
+            timezone.now() + timedelta(seconds=settings.SETTLEMENT_ETA_LIMIT),
+        )
+
+    def test_stale_settlement_is_ignored(self):
+        lot = Lot.objects.create(
+            name="stale",
+            description="description",
+            category=self.category,
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+        stale_end_date = timezone.now() - timedelta(minutes=1)
+        self.assertFalse(close_lot(lot.pk, stale_end_date))
+        lot.refresh_from_db()
+        self.assertTrue(lot.is_active)
+
+    def test_settlement_is_idempotent(self):
+        lot = Lot.objects.create(
+            name="due",
+            description="description",
+            category=self.category,
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=self.user,
+        )
+        end_date = timezone.now() - timedelta(seconds=1)
+        Lot.objects.filter(pk=lot.pk).update(end_date=end_date)
+        self.assertTrue(settle_lot.run(lot.pk, end_date.isoformat()))
+        self.assertFalse(settle_lot.run(lot.pk, end_date.isoformat()))
+        lot.refresh_from_db()
+        self.assertFalse(lot.is_active)
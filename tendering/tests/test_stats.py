@@ -0,0 +1,125 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tendering.bidding import place_bid
+from tendering.models import AuctionStatistics, Bid, Category, Lot
+from tendering.settlement import close_expired_lots
+from tendering.stats import get_statistics, rebuild_statistics
+
+
+class StatisticsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="stats_user", password="test_password"
+        )
+        self.category = Category.objects.create(name="stats")
+        rebuild_statistics()
+
+    def create_lot(self, **kwargs) -> Lot:
+        with self.captureOnCommitCallbacks(execute=True):
+            return Lot.objects.create(
+                name="stats_lot",
+                description="description",
+                category=self.category,
+                end_date=timezone.now() + timedelta(days=1),
+                start_price=10,
+                owner=self.user,
+                **kwargs,
+            )
+
+    def assertMatchesRebuild(self) -> None:
+        statistics = AuctionStatistics.objects.get()
+        rebuilt = rebuild_statistics()
+        for field in (
+            "num_categories",
+            "num_users",
+            "num_lots",
+            "num_active_lots",
+            "num_bids",
+            "price_sum",
+        ):
+            self.assertEqual(
+                getattr(statistics, field), getattr(rebuilt, field), field
+            )
+
+    def test_counters_follow_creates_and_deletes(self):
+        lot = self.create_lot()
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(lot.id, self.user, Decimal(15))
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(lot.id, self.user, Decimal(20))
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="another")
+        self.assertMatchesRebuild()
+        self.assertEqual(AuctionStatistics.objects.get().price_sum, 20)
+
+        lot.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            lot.delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(AuctionStatistics.objects.get().num_bids, 0)
+
+    def test_price_sum_follows_current_price_after_top_bid_delete(self):
+        lot = self.create_lot()
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(lot.id, self.user, Decimal(15))
+        with self.captureOnCommitCallbacks(execute=True):
+            top_bid = place_bid(lot.id, self.user, Decimal(20))
+        with self.captureOnCommitCallbacks(execute=True):
+            top_bid.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(lot.id, self.user, Decimal(25))
+        self.assertEqual(AuctionStatistics.objects.get().price_sum, 25)
+        self.assertMatchesRebuild()
+
+    def test_cascaded_bid_deletes_are_applied_once(self):
+        lot = self.create_lot()
+        bidders = get_user_model().objects.bulk_create(
+            get_user_model()(username=f"stats_bidder_{i}") for i in range(20)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            for i, bidder in enumerate(bidders):
+                place_bid(lot.id, bidder, Decimal(11 + i))
+        with mock.patch("tendering.stats.apply_deltas") as apply_deltas:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                Bid.objects.filter(lot=lot).delete()
+        self.assertLess(len(callbacks), 5)
+        apply_deltas.assert_called_once_with(num_bids=-20)
+
+    def test_settlement_updates_active_lots(self):
+        lot = self.create_lot()
+        Lot.objects.filter(pk=lot.pk).update(
+            end_date=timezone.now() - timedelta(seconds=1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            close_expired_lots()
+        self.assertEqual(AuctionStatistics.objects.get().num_active_lots, 0)
+        self.assertMatchesRebuild()
+
+    def test_missing_row_is_rebuilt(self):
+        AuctionStatistics.objects.all().delete()
+        self.create_lot()
+        self.assertEqual(get_statistics().num_lots, 1)
+
+    def test_index_reads_statistics_row(self):
+        lot = self.create_lot()
+        Bid.objects.create(lot=lot, user=self.user, amount=30)
+        Lot.objects.filter(pk=lot.pk).update(current_price=30)
+        rebuild_statistics()
+        cache.clear()
+        response = self.client.get(reverse("tendering:index"))
+        self.assertEqual(response.context["num_lots"], 1)
+        self.assertEqual(response.context["num_bids"], 1)
+        self.assertEqual(
+            response.context["sum_lots"],
+            Lot.objects.aggregate(total=Sum("current_price"))["total"],
+        )
+        self.assertEqual(response.context["avg_bids"], 1.0)
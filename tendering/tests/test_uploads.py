@@ -0,0 +1,159 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from tendering import images
+from tendering.forms import UserUpdateForm
+from tendering.models import Category, Lot
+from tendering.uploads import LimitedTemporaryFileUploadHandler
+
+
+def encode(image_format: str, size=(120, 80), **options) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, "blue").save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def avatar_form(content: bytes, name: str = "avatar.png") -> UserUpdateForm:
+    return UserUpdateForm(
+        data={},
+        files={"avatar": SimpleUploadedFile(name, content)},
+    )
+
+
+class ImageUploadFieldTests(TestCase):
+    def assertAvatarError(self, form: UserUpdateForm, code: str) -> None:
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors.as_data()["avatar"][0].code, code)
+
+    def test_accepts_supported_image(self):
+        form = avatar_form(encode("WEBP"), "avatar.webp")
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["avatar"].content_type, "image/webp")
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=100)
+    def test_rejects_large_file(self):
+        form = avatar_form(encode("PNG"))
+        self.assertAvatarError(form, "file_too_big")
+
+    def test_rejects_non_image(self):
+        self.assertAvatarError(avatar_form(b"not an image"), "invalid_image")
+
+    def test_rejects_unsupported_format(self):
+        form = avatar_form(encode("GIF"), "avatar.gif")
+        self.assertAvatarError(form, "unsupported_format")
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=1000)
+    def test_rejects_large_dimensions_without_decoding(self):
+        form = avatar_form(encode("PNG"))
+        with mock.patch("PIL.ImageFile.ImageFile.load") as load:
+            self.assertAvatarError(form, "too_many_pixels")
+        load.assert_not_called()
+
+    def test_rejects_decompression_bomb(self):
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 1000):
+            self.assertAvatarError(avatar_form(encode("PNG")), "too_many_pixels")
+
+
+@override_settings(IMAGE_UPLOAD_MAX_SIZE=1000)
+class LimitedUploadHandlerTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="upload_user", password="test_password"
+        )
+        self.client.force_login(self.user)
+
+    def test_oversized_file_aborts_the_upload(self):
+        handler = LimitedTemporaryFileUploadHandler(RequestFactory().post("/"))
+        handler.new_file("avatar", "avatar.png", "image/png", None)
+        handler.receive_data_chunk(b"x" * 500, 0)
+        with self.assertRaises(StopUpload) as raised:
+            handler.receive_data_chunk(b"x" * 500, 500)
+            handler.receive_data_chunk(b"x" * 500, 1000)
+        self.assertTrue(raised.exception.connection_reset)
+        self.assertTrue(handler.file.closed)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_oversized_upload_is_refused(self):
+        response = self.client.post(
+            reverse("tendering:user-update", args=[self.user.pk]),
+            {"avatar": SimpleUploadedFile("avatar.png", b"x" * 2000)},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.avatar)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_body_larger_than_the_cap_is_read(self):
+        response = self.client.post(
+            reverse("tendering:user-update", args=[self.user.pk]),
+            {
+                "avatar": SimpleUploadedFile("avatar.png", b"x" * 800),
+                "padding": "x" * 2000,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(
+            response.context["form"],
+            "avatar",
+            "Upload a valid image. The file you uploaded was either not an "
+            "image or a corrupted image.",
+        )
+
+
+class StripMetadataTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90 degrees clockwise
+        exif[0x010F] = "camera maker"
+        self.lot = Lot.objects.create(
+            name="exif_lot",
+            description="description",
+            category=Category.objects.create(name="exif"),
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=10,
+            owner=get_user_model().objects.create_user(
+                username="exif_user", password="test_password"
+            ),
+            photo=ContentFile(encode("JPEG", exif=exif), name="exif.jpg"),
+        )
+
+    def test_upload_is_reencoded_without_metadata(self):
+        original = self.lot.photo.name
+        self.assertTrue(images.process_upload(self.lot, "photo"))
+        self.lot.refresh_from_db()
+        self.assertNotEqual(self.lot.photo.name, original)
+        self.assertFalse(default_storage.exists(original))
+        self.assertEqual(self.lot.photo_variants["source"], self.lot.photo.name)
+        with default_storage.open(self.lot.photo.name) as file:
+            image = Image.open(file)
+            self.assertEqual(image.size, (80, 120))
+            self.assertEqual(dict(image.getexif()), {})
+        self.assertTrue(self.lot.photo_variants["stripped"])
+        self.assertFalse(images.process_upload(self.lot, "photo"))
+
+    def test_backfilled_variants_are_still_stripped(self):
+        images.generate_variants(self.lot, "photo")
+        original = self.lot.photo.name
+        self.assertTrue(images.process_upload(self.lot, "photo"))
+        self.assertFalse(default_storage.exists(original))
+        with default_storage.open(self.lot.photo.name) as file:
+            self.assertEqual(dict(Image.open(file).getexif()), {})
+        self.assertEqual(self.lot.photo_variants["source"], self.lot.photo.name)
@@ -4,7 +4,9 @@ from django.urls import reverse
 from django.utils import timezone
 from django.utils.timezone import timedelta
 
-from tendering.models import Lot, Category, User
+from tendering.models import Lot, Category, User, Bid, Comment
+from tendering.pagination import encode_cursor
+from tendering.views import HISTORY_PAGE_SIZE
 
 ACTIVE_LOTS_URL = reverse("tendering:lot-list-active")
 INACTIVE_LOTS_URL = reverse("tendering:lot-list-inactive")
@@ -173,3 +175,90 @@ class PrivateUserView(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context["user"], user)
         self.assertTemplateUsed(response, "pages/profile.html")
+
+
+class LotHistoryViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="history_user", password="test_password"
+        )
+        self.client.force_login(self.user)
+        self.lot = Lot.objects.create(
+            name="history_lot",
+            description="description",
+            end_date=timezone.now() + timedelta(days=1),
+            start_price=1,
+            owner=self.user,
+        )
+        Bid.objects.bulk_create(
+            Bid(lot=self.lot, user=self.user, amount=i + 2) for i in range(45)
+        )
+        Comment.objects.bulk_create(
+            Comment(lot=self.lot, owner=self.user, text=f"comment {i}")
+            for i in range(25)
+        )
+
+    def test_detail_page_caps_history(self):
+        response = self.client.get(
+            reverse("tendering:lot-detail", args=[self.lot.id])
+        )
+        self.assertEqual(len(response.context["bids"]), HISTORY_PAGE_SIZE)
+        self.assertEqual(len(response.context["comments"]), HISTORY_PAGE_SIZE)
+        self.assertIsNotNone(response.context["next_bids"])
+        self.assertIsNotNone(response.context["next_comments"])
+
+    def test_detail_query_count_does_not_grow_with_history(self):
+        url = reverse("tendering:lot-detail", args=[self.lot.id])
+        with self.assertNumQueries(8):
+            self.client.get(url)
+        Bid.objects.bulk_create(
+            Bid(lot=self.lot, user=self.user, amount=i + 100) for i in range(50)
+        )
+        with self.assertNumQueries(8):
+            self.client.get(url)
+
+    def test_bid_history_walks_every_bid_once(self):
+        url = reverse("tendering:lot-bids", args=[self.lot.id])
+        seen = []
+        cursor = None
+        while True:
+            response = self.client.get(url, {"cursor": cursor} if cursor else {})
+            page = response.json()
+            seen.extend(bid["id"] for bid in page["results"])
+            cursor = page["next"]
+            if cursor is None:
+                break
+        self.assertEqual(
+            seen,
+            list(
+                Bid.objects.filter(lot=self.lot)
+                .order_by("-created_time", "-id")
+                .values_list("id", flat=True)
+            ),
+        )
+
+    def test_comment_history_continues_after_first_page(self):
+        detail = self.client.get(
+            reverse("tendering:lot-detail", args=[self.lot.id])
+        )
+        response = self.client.get(
+            reverse("tendering:lot-comments", args=[self.lot.id]),
+            {"cursor": detail.context["next_comments"]},
+        )
+        page = response.json()
+        self.assertEqual(len(page["results"]), 5)
+        self.assertIsNone(page["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse("tendering:lot-bids", args=[self.lot.id]),
+            {"cursor": "not-a-cursor"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_with_wrongly_typed_values(self):
+        response = self.client.get(
+            reverse("tendering:lot-bids", args=[self.lot.id]),
+            {"cursor": encode_cursor(["x", "y"])},
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    # once a file passes the size cap the upload is aborted: the spooled part
+    # is dropped, the rest of the body is left unread and the request fails
+    # instead of reaching the view with the file missing
+
+    def new_file(self, *args, **kwargs) -> None:
+        super().new_file(*args, **kwargs)
+        self.aborted = False
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> bytes | None:
+        if start + len(raw_data) > settings.IMAGE_UPLOAD_MAX_SIZE:
+            self.aborted = True
+            self.file.close()
+            raise StopUpload(connection_reset=True)
+        return super().receive_data_chunk(raw_data, start)
+
+    def upload_complete(self) -> None:
+        if getattr(self, "aborted", False):
+            raise RequestDataTooBig(
+                "Uploaded file exceeded settings.IMAGE_UPLOAD_MAX_SIZE."
+            )
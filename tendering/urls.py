@@ -3,17 +3,23 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path
 
+from tendering import direct_uploads
 from tendering.views import (
     index,
     register,
     rules,
+    lot_events,
+    direct_upload,
     InactiveLotListView,
     ActiveLotListView,
     UserListView,
     UserDetailView,
     LotDetailView,
+    LotBidHistoryView,
+    LotCommentHistoryView,
     CommentCreateView,
     BidCreateView,
+    BidApiView,
     LotCreateView,
     LotUpdateView,
     LotDeleteView,
@@ -34,6 +40,10 @@ urlpatterns = [
     path("lots/<int:pk>/", LotDetailView.as_view(), name="lot-detail"),
     path("lots/<int:pk>/comment/", CommentCreateView.as_view(), name="comment-create"),
     path("lots/<int:pk>/bid/", BidCreateView.as_view(), name="bid-create"),
+    path("lots/<int:pk>/events/", lot_events, name="lot-events"),
+    path("lots/<int:pk>/bids/", LotBidHistoryView.as_view(), name="lot-bids"),
+    path("lots/<int:pk>/comments/", LotCommentHistoryView.as_view(), name="lot-comments"),
+    path("api/lots/<int:pk>/bid/", BidApiView.as_view(), name="bid-create-api"),
     path("lots/create/", LotCreateView.as_view(), name="lot-create"),
     path("lots/<int:pk>/update/", LotUpdateView.as_view(), name="lot-update"),
     path("lots/<int:pk>/delete/", LotDeleteView.as_view(), name="lot-delete"),
@@ -46,5 +56,10 @@ urlpatterns = [
 
 app_name = "tendering"
 
+if direct_uploads.receives_uploads():
+    urlpatterns.append(
+        path("uploads/direct/", direct_upload, name="direct-upload")
+    )
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,16 +1,36 @@
+from collections.abc import Callable
+from decimal import Decimal
 from http.client import HTTPResponse
+from itertools import chain
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import transaction
-from django.db.models import Sum, Avg, Count, Max, QuerySet
-from django.http import HttpRequest, HttpResponseForbidden, HttpResponseRedirect
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, QuerySet
+from django.db.models.functions import Now
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
 from django.utils import timezone
 from django.views import generic
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
+from tendering import caching, dashboard, direct_uploads, price_cache
+from tendering.bidding import BidRejected, place_bid
+from tendering.events import lot_event_stream
 from tendering.forms import (
     CommentForm,
     BidForm,
@@ -21,52 +41,34 @@ from tendering.forms import (
     LotSearchForm,
 )
 from tendering.models import (
-    Category,
     User,
     Lot,
     Comment,
     Bid
 )
+from tendering.listing import LOT_SORTS, filter_lots, lot_facets, sort_lots
+from tendering.metrics import registry
+from tendering.pagination import (
+    CountedPaginator,
+    CursorPage,
+    InvalidCursor,
+    capped_count,
+    keyset_page,
+)
+from tendering.tasks import schedule_dashboard_refresh, schedule_lot_settlement
 
+HISTORY_ORDERING = ("-created_time", "-id")
+HISTORY_PAGE_SIZE = 20
+LOT_CURSOR_ORDERING = ("-start_date", "-pk")
+USER_CURSOR_ORDERING = ("username", "pk")
 
-def index(request: HttpRequest) -> HTTPResponse:
-    num_categories = Category.objects.count()
-    num_users = User.objects.count()
-    num_lots = Lot.objects.count()
-    num_active_lots = Lot.objects.filter(is_active=True).count()
-    num_bids = Bid.objects.count()
-    sum_lots = Lot.objects.aggregate(total=Sum("current_price"))["total"] or 0
-    avg_bids = Lot.objects.annotate(
-        participant_count=Count("participant")
-    ).aggregate(
-        avg=Avg("participant_count")
-    )["avg"]
-
-    recent_bids = Bid.objects.select_related("lot", "user").order_by("-created_time")[:5]
-
-    bid_data = [
-        {
-            "bid_lot": bid.lot.name,
-            "bid_id": bid.id,
-            "amount": bid.amount,
-            "percentage": int(bid.lot.get_progress_percentage()),
-            "bidders": bid.lot.participant.count(),
-        }
-        for bid in recent_bids
-    ]
-
-    context = {
-        "num_categories": num_categories,
-        "num_users": num_users,
-        "num_lots": num_lots,
-        "num_active_lots": num_active_lots,
-        "num_bids": num_bids,
-        "sum_lots": sum_lots,
-        "avg_bids": round(avg_bids, 2),
-        "bids": bid_data,
-    }
 
-    return render(request, "pages/index.html", context=context)
+@caching.anonymous_cache_page(settings.PAGE_CACHE_TIMEOUT)
+def index(request: HttpRequest) -> HTTPResponse:
+    context, is_stale = dashboard.get_dashboard()
+    if is_stale:
+        schedule_dashboard_refresh()
+    return TemplateResponse(request, "pages/index.html", context=context)
 
 
 def register(request: HttpRequest) -> HTTPResponse:
@@ -86,84 +88,144 @@ def register(request: HttpRequest) -> HTTPResponse:
     )
 
 
-class InactiveLotListView(LoginRequiredMixin, generic.ListView):
-    model = Lot
-    paginate_by = 5
-    context_object_name = "inactive_lot_list"
-    template_name = "tendering/inactive_list.html"
+class CursorPaginationMixin:
+    cursor_ordering = None
 
-    def get_context_data(self, *, object_list=None, **kwargs) -> dict:
-        context = super(
-            InactiveLotListView,
-            self
-        ).get_context_data(**kwargs)
-        name = self.request.GET.get("name", "")
-        context["search_form"] = LotSearchForm(initial={"name": name})
-        return context
+    def get_cursor_ordering(self) -> tuple | None:
+        return self.cursor_ordering
 
-    def get_queryset(self) -> QuerySet:
-        queryset = (
-            Lot.objects.filter(is_active=False)
-            .select_related("category", "owner")
-            .prefetch_related("bids__user")
-            .order_by("-start_date")
-        )
-        form = LotSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(
-                name__icontains=form.cleaned_data["name"]
+    def paginate_queryset(self, queryset: QuerySet, page_size: int) -> tuple:
+        ordering = self.get_cursor_ordering()
+        if settings.LISTING_PAGINATION != "cursor" or ordering is None:
+            return super().paginate_queryset(queryset, page_size)
+        cursor = self.request.GET.get("cursor") or None
+        try:
+            items, next_cursor = keyset_page(
+                queryset, ordering, page_size, cursor
             )
-        return queryset
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        page = CursorPage(
+            items,
+            cursor,
+            next_cursor,
+            *capped_count(queryset, settings.LISTING_COUNT_LIMIT),
+        )
+        return None, page, items, page.has_other_pages()
 
 
-def close_expired_lots() -> None:
-    now = timezone.now()
-    expired_lots = Lot.objects.filter(is_active=True, end_date__lte=now)
-    for lot in expired_lots:
-        lot.is_active = False
-        highest_bid = lot.bids.order_by("-amount").first()
-        if highest_bid:
-            lot.owner = highest_bid.user
-        lot.save()
+def attach_lot_state(lots, prices: dict, versions: dict) -> None:
+    for lot in lots:
+        lot.price = prices.get(lot.id)
+        lot.version = versions[lot.id]
 
 
-class ActiveLotListView(LoginRequiredMixin, generic.ListView):
+class LotListMixin(CursorPaginationMixin, LoginRequiredMixin):
     model = Lot
     paginate_by = 5
-    context_object_name = "active_lot_list"
-    template_name = "tendering/active_list.html"
+    active = True
+    lot_filter: Q
+    lot_ordering: tuple = ()
+    list_related = ("category", "owner")
+    list_fields = (
+        "name",
+        "photo",
+        "photo_variants",
+        "start_date",
+        "end_date",
+        "bid_count",
+        "category__name",
+        "owner__username",
+        "owner__first_name",
+        "owner__last_name",
+    )
+
+    def get_search_form(self) -> LotSearchForm:
+        if not hasattr(self, "search_form"):
+            self.search_form = LotSearchForm(
+                self.request.GET, active=self.active
+            )
+        return self.search_form
+
+    def get_listing_queryset(self) -> QuerySet:
+        queryset = Lot.objects.filter(self.lot_filter)
+        if self.lot_ordering:
+            queryset = queryset.order_by(*self.lot_ordering)
+        return queryset.select_related(*self.list_related).only(
+            *self.list_related, *self.list_fields
+        )
+
+    def get_cursor_ordering(self) -> tuple | None:
+        form = self.get_search_form()
+        if not form.is_valid():
+            return LOT_CURSOR_ORDERING
+        if form.cleaned_data["sort"] in LOT_SORTS:
+            return LOT_SORTS[form.cleaned_data["sort"]]
+        if form.cleaned_data["name"].strip():
+            return None
+        return LOT_CURSOR_ORDERING
 
     def get_context_data(self, *, object_list=None, **kwargs) -> dict:
-        context = super(
-            ActiveLotListView,
-            self
-        ).get_context_data(**kwargs)
-        name = self.request.GET.get("name", "")
-        context["search_form"] = LotSearchForm(initial={"name": name})
+        context = super().get_context_data(**kwargs)
+        context["search_form"] = self.get_search_form()
+        context["facets"] = lot_facets(self.facet_queryset)
+        lots = context[self.context_object_name]
+        attach_lot_state(
+            lots,
+            price_cache.get_lot_prices(lot.id for lot in lots),
+            caching.lot_versions(lot.id for lot in lots),
+        )
+        context["lot_card_timeout"] = settings.LOT_CARD_CACHE_TIMEOUT
         return context
 
     def get_queryset(self) -> QuerySet:
-        close_expired_lots()
-        queryset = (
-            Lot.objects.filter(is_active=True)
-            .select_related("category", "owner")
-            .prefetch_related("bids__user")
+        queryset = self.get_listing_queryset()
+        form = self.get_search_form()
+        if not form.is_valid():
+            self.facet_queryset = queryset
+            return queryset
+        filters = form.cleaned_data
+        self.facet_queryset = filter_lots(
+            queryset, {**filters, "category": None}
         )
-        form = LotSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(
-                name__icontains=form.cleaned_data["name"]
-            )
-        return queryset
+        return sort_lots(filter_lots(queryset, filters), filters["sort"])
+
+
+class InactiveLotListView(LotListMixin, generic.ListView):
+    active = False
+    lot_filter = Q(is_active=False)
+    lot_ordering = ("-start_date",)
+    context_object_name = "inactive_lot_list"
+    template_name = "tendering/inactive_list.html"
+
 
+class ActiveLotListView(LotListMixin, generic.ListView):
+    lot_filter = Q(is_active=True, end_date__gt=Now())
+    context_object_name = "active_lot_list"
+    template_name = "tendering/active_list.html"
 
-class UserListView(LoginRequiredMixin, generic.ListView):
+
+class UserListView(
+    CursorPaginationMixin,
+    LoginRequiredMixin,
+    generic.ListView,
+):
     model = User
     template_name = "tendering/tables.html"
     paginate_by = 8
+    cursor_ordering = USER_CURSOR_ORDERING
+    list_fields = (
+        "username",
+        "first_name",
+        "last_name",
+        "avatar",
+        "avatar_variants",
+    )
 
     def get_queryset(self) -> QuerySet:
-        queryset = User.objects.prefetch_related("lots")
+        queryset = User.objects.only(*self.list_fields).order_by(
+            *USER_CURSOR_ORDERING
+        )
         queryset = queryset.annotate(
             bids_count=Count("bids")
         )
@@ -176,38 +238,170 @@ class UserListView(LoginRequiredMixin, generic.ListView):
 class UserDetailView(LoginRequiredMixin, generic.DetailView):
     model = User
     template_name = "pages/profile.html"
+    lots_per_page = 8
+    participating_per_page = 5
 
     def get_context_data(self, **kwargs) -> dict:
         context = super().get_context_data(**kwargs)
         user = self.object
         lots = (
             Lot.objects.filter(owner=user)
-            .select_related("category", "owner")
-            .prefetch_related("bids__user")
-            .order_by("is_active", "-start_date")
+            .select_related("category")
+            .only(
+                "name",
+                "description",
+                "photo",
+                "photo_variants",
+                "category__name",
+            )
+            .order_by("is_active", "-start_date", "-pk")
         )
         participating_lots = (
-            Lot.objects.filter(bids__user=user, is_active=True)
-            .select_related("owner", "category")
-            .prefetch_related("bids__user")
+            Lot.objects.filter(
+                Exists(Bid.objects.filter(lot=OuterRef("pk"), user=user)),
+                is_active=True,
+            )
+            .annotate(leader_id=F("top_bid__user"))
+            .only("name", "photo", "photo_variants", "current_price", "top_bid")
+            .order_by("end_date", "pk")
         )
-        lots_num = lots.count()
-        context["my_lots"] = lots
+        my_lots = CountedPaginator(
+            lots, self.lots_per_page, user.lot_count
+        ).get_page(self.request.GET.get("lots_page"))
+        participating_lots = Paginator(
+            participating_lots, self.participating_per_page
+        ).get_page(self.request.GET.get("bidding_page"))
+        versions = caching.lot_versions(
+            lot.pk for lot in chain(my_lots, participating_lots)
+        )
+        for lot in chain(my_lots, participating_lots):
+            lot.version = versions[lot.pk]
+        context["my_lots"] = my_lots
         context["participating_lots"] = participating_lots
-        context["lots_num"] = lots_num
+        context["lots_num"] = user.lot_count
+        context["lot_card_timeout"] = settings.LOT_CARD_CACHE_TIMEOUT
         return context
 
 
+def live_updates(lot: Lot) -> bool:
+    # the event stream is only served by the async views, and a closed lot
+    # gets no further events to wait for
+    return (
+        settings.ASYNC_VIEWS
+        and lot.is_active
+        and lot.end_date > timezone.now()
+    )
+
+
+def lot_history_context(lot: Lot) -> dict:
+    bids, next_bids = keyset_page(
+        lot.bids.select_related("user"),
+        HISTORY_ORDERING,
+        HISTORY_PAGE_SIZE
+    )
+    comments, next_comments = keyset_page(
+        lot.comments.select_related("owner"),
+        HISTORY_ORDERING,
+        HISTORY_PAGE_SIZE
+    )
+    return {
+        "bids": bids,
+        "next_bids": next_bids,
+        "comments": comments,
+        "next_comments": next_comments,
+    }
+
+
 class LotDetailView(LoginRequiredMixin, generic.DetailView):
     model = Lot
 
+    def get_queryset(self) -> QuerySet:
+        return Lot.objects.select_related("category", "owner")
+
     def get_context_data(self, **kwargs) -> dict:
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
         context["bid_form"] = BidForm()
+        context["price"] = price_cache.get_lot_price(self.object.id)
+        context["live_updates"] = live_updates(self.object)
+        context.update(lot_history_context(self.object))
         return context
 
 
+def serialize_bid(bid: Bid) -> dict:
+    return {
+        "id": bid.id,
+        "bidder": bid.user.username,
+        "amount": bid.amount,
+        "created_time": bid.created_time,
+    }
+
+
+def serialize_comment(comment: Comment) -> dict:
+    return {
+        "id": comment.id,
+        "owner": str(comment.owner),
+        "text": comment.text,
+        "created_time": comment.created_time,
+    }
+
+
+class LotHistoryView(LoginRequiredMixin, generic.View):
+    raise_exception = True
+    queryset: QuerySet
+    serializer: Callable[[Bid | Comment], dict]
+
+    def get_queryset(self) -> QuerySet:
+        return self.queryset.filter(lot_id=self.kwargs["pk"])
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        try:
+            items, next_cursor = keyset_page(
+                self.get_queryset(),
+                HISTORY_ORDERING,
+                HISTORY_PAGE_SIZE,
+                request.GET.get("cursor")
+            )
+        except InvalidCursor:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+        return JsonResponse(
+            {
+                "results": [self.serializer(item) for item in items],
+                "next": next_cursor,
+            }
+        )
+
+
+class LotBidHistoryView(LotHistoryView):
+    queryset = Bid.objects.select_related("user")
+    serializer = staticmethod(serialize_bid)
+
+
+class LotCommentHistoryView(LotHistoryView):
+    queryset = Comment.objects.select_related("owner")
+    serializer = staticmethod(serialize_comment)
+
+
+async def lot_events(request: HttpRequest, pk: int) -> HttpResponse:
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponseForbidden()
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(
+            "Live updates need the ASGI server",
+            status=501
+        )
+    if not await Lot.objects.filter(pk=pk).aexists():
+        raise Http404("No lot found matching the query")
+    response = StreamingHttpResponse(
+        lot_event_stream(pk),
+        content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 class CommentCreateView(LoginRequiredMixin, generic.CreateView):
     model = Comment
     form_class = CommentForm
@@ -226,24 +420,41 @@ class BidCreateView(LoginRequiredMixin, generic.CreateView):
     model = Bid
     form_class = BidForm
 
-    def form_valid(self, form: BidForm) -> HttpResponseRedirect:
-        lot_id = self.request.POST.get("lot_id")
-        lot = get_object_or_404(Lot, id=lot_id)
-        bid = form.save(commit=False)
-        bid.lot = lot
-        bid.user = self.request.user
-        with transaction.atomic():
-            bid.save()
-            lot.current_price = bid.amount
-            lot.save()
-        return redirect("tendering:lot-detail", pk=lot.id)
+    def get_lot(self) -> Lot:
+        if not hasattr(self, "lot"):
+            self.lot = get_object_or_404(
+                Lot.objects.select_related("category", "owner"),
+                pk=self.kwargs["pk"]
+            )
+        return self.lot
+
+    def get_form_kwargs(self) -> dict:
+        kwargs = super().get_form_kwargs()
+        kwargs["lot"] = self.get_lot()
+        return kwargs
+
+    def form_valid(self, form: BidForm) -> HttpResponse:
+        try:
+            self.object = place_bid(
+                self.get_lot().id,
+                self.request.user,
+                form.cleaned_data["amount"]
+            )
+        except BidRejected as rejection:
+            form.add_error("amount", str(rejection))
+            return self.form_invalid(form)
+        return self.bid_accepted()
+
+    def bid_accepted(self) -> HttpResponse:
+        return redirect("tendering:lot-detail", pk=self.get_lot().id)
 
     def form_invalid(self, form: BidForm) -> HTTPResponse:
-        lot_id = self.kwargs.get("pk")
-        lot = get_object_or_404(Lot, id=lot_id)
         context = {
-            "lot": lot,
+            "lot": self.get_lot(),
             "bid_form": form,
+            "form": CommentForm(),
+            "live_updates": live_updates(self.get_lot()),
+            **lot_history_context(self.get_lot()),
         }
         return render(
             self.request,
@@ -252,7 +463,78 @@ class BidCreateView(LoginRequiredMixin, generic.CreateView):
         )
 
 
-class LotCreateView(LoginRequiredMixin, generic.CreateView):
+class BidApiView(BidCreateView):
+    http_method_names = ["post"]
+    raise_exception = True
+
+    def bid_accepted(self) -> JsonResponse:
+        return bid_accepted_response(self.object)
+
+    def form_invalid(self, form: BidForm) -> JsonResponse:
+        return bid_rejected_response(form, latest_price(self.get_lot().id))
+
+
+def bid_accepted_response(bid: Bid) -> JsonResponse:
+    return JsonResponse(
+        {
+            "accepted": True,
+            "current_price": bid.amount,
+        },
+        status=201
+    )
+
+
+def latest_price(lot_id: int) -> Decimal:
+    # the lot was loaded before the bid was tried, and a rejected bid most
+    # likely lost to one that moved the price since, so it is read again
+    current_price, start_price = Lot.objects.values_list(
+        "current_price", "start_price"
+    ).get(pk=lot_id)
+    return current_price or start_price
+
+
+def bid_rejected_response(
+        form: BidForm, current_price: Decimal
+) -> JsonResponse:
+    return JsonResponse(
+        {
+            "accepted": False,
+            "errors": form.errors.get("amount", []),
+            "current_price": current_price,
+        },
+        status=409
+    )
+
+
+class DirectUploadMixin:
+    def get_form_kwargs(self) -> dict:
+        kwargs = super().get_form_kwargs()
+        kwargs["user"] = self.request.user
+        return kwargs
+
+    def get_context_data(self, **kwargs) -> dict:
+        context = super().get_context_data(**kwargs)
+        field = self.model._meta.get_field(self.form_class.direct_upload_field)
+        context["direct_upload"] = direct_uploads.upload_target(
+            field.upload_to, self.request.user
+        )
+        return context
+
+
+@csrf_exempt
+@require_POST
+def direct_upload(request: HttpRequest) -> HttpResponse:
+    # local stand-in for the S3 form POST endpoint; the signed policy
+    # replaces the CSRF token just as it does for S3
+    key = direct_uploads.LocalDirectUpload().receive(
+        request.POST, request.FILES.get("file")
+    )
+    if key is None:
+        return HttpResponseForbidden()
+    return HttpResponse(status=204)
+
+
+class LotCreateView(LoginRequiredMixin, DirectUploadMixin, generic.CreateView):
     model = Lot
     template_name = "tendering/lot_form.html"
     form_class = LotForm
@@ -263,6 +545,7 @@ class LotCreateView(LoginRequiredMixin, generic.CreateView):
         lot.current_price = None
         lot.owner = self.request.user
         lot.save()
+        schedule_lot_settlement(lot)
         return super().form_valid(form)
 
 
@@ -277,8 +560,19 @@ class LotUpdateView(LoginRequiredMixin, generic.UpdateView):
             kwargs={"pk": self.object.id}
         )
 
+    def form_valid(self, form: LotUpdateForm) -> HttpResponseRedirect:
+        response = super().form_valid(form)
+        if "end_date" in form.changed_data:
+            schedule_lot_settlement(self.object)
+        return response
+
+    def get_object(self, queryset=None) -> Lot:
+        if not hasattr(self, "lot"):
+            self.lot = super().get_object(queryset)
+        return self.lot
+
     def dispatch(self, request, *args, **kwargs) -> None:
-        if self.get_object().owner.pk != request.user.pk and not request.user.is_superuser:
+        if self.get_object().owner_id != request.user.pk and not request.user.is_superuser:
             messages.info(request, "This is not your lot")
             return redirect("tendering:index")
         return super().dispatch(request, *args, **kwargs)
@@ -313,13 +607,13 @@ class UserCreateView(generic.CreateView):
     form_class = UserCreateForm
 
 
-class UserUpdateView(LoginRequiredMixin, generic.UpdateView):
+class UserUpdateView(LoginRequiredMixin, DirectUploadMixin, generic.UpdateView):
     model = User
     template_name = "tendering/user_update.html"
     form_class = UserUpdateForm
 
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().pk != request.user.pk and not request.user.is_superuser:
+        if self.kwargs["pk"] != request.user.pk and not request.user.is_superuser:
             messages.info(request, "This is not your profile")
             return redirect("tendering:index")
         return super().dispatch(request, *args, **kwargs)
@@ -350,5 +644,21 @@ class UserDeleteView(LoginRequiredMixin, generic.DeleteView):
         return request.user == obj or request.user.is_superuser
 
 
+@caching.anonymous_cache_page(settings.PAGE_CACHE_TIMEOUT)
 def rules(request: HttpRequest) -> HTTPResponse:
-    return render(request, "tendering/rules.html")
+    return TemplateResponse(request, "tendering/rules.html")
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    token = settings.METRICS_TOKEN
+    # per-view latency and query counts stay private unless a scraper token
+    # is configured, or the site runs in debug mode
+    if token:
+        if request.headers.get("Authorization") != f"Bearer {token}":
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )